@@ -0,0 +1,240 @@
+# Banc d'essai commun à tous les modèles du projet.
+# Chaque cas (sac à dos, portefeuille, diaporama, unit commitment) construit une instance
+# synthétique d'une taille donnée avec le constructeur de modèle du script correspondant, puis la
+# résout. Chaque mesure tourne dans un processus neuf (spawn) : le pic de mémoire (RSS) est celui
+# du cas seul. Les résultats sont écrits en JSON et comparés à une référence enregistrée pour
+# signaler les régressions. Avec une licence limitée en taille, les modèles trop gros sont
+# construits et mesurés mais pas résolus (statut "size_limited").
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_SIZES = {
+    "knapsack": [100, 1000, 10000],
+    "portfolio": [10, 50, 200],
+    "slideshow": [20, 100, 500],
+    "uc": ["3x24", "10x168", "100x8760"],
+}
+METRICS = ("build_time", "solve_time", "peak_rss_mb")
+SIZE_FIELDS = ("num_vars", "num_constrs", "num_qconstrs", "num_gen_constrs", "num_nz")
+
+
+def _knapsack(env, size, seed):
+    from Knapsack import build_knapsack_model, generate_knapsack
+    values, weights, capacity = generate_knapsack(size, seed)
+    start = time.perf_counter()
+    model, _ = build_knapsack_model(values, weights, capacity, env)
+    return model, time.perf_counter() - start, None
+
+
+def _portfolio(env, size, seed):
+    from Portfolio import build_portfolio_model
+    rng = np.random.default_rng(seed)
+    # Covariance à quelques facteurs plus un risque spécifique, toujours définie positive
+    loadings = rng.normal(0, 0.1, (size, 3))
+    sigma = loadings @ loadings.T + np.diag(rng.uniform(0.001, 0.01, size))
+    mu = rng.uniform(0.01, 0.1, size)
+    start = time.perf_counter()
+    model, _, _ = build_portfolio_model(sigma, mu, np.median(mu), max(2, size // 5), env)
+    return model, time.perf_counter() - start, None
+
+
+def _slideshow(env, size, seed):
+    from SlideshowSequencing import build_sequencing_model, subtour_callback
+    from TagEngine import build_engine
+    rng = np.random.default_rng(seed)
+    num_tags = max(10, size // 2)
+    photos = [(i, "H" if rng.random() < 0.6 else "V",
+               [f"t{t}" for t in rng.choice(num_tags, rng.integers(3, 10), replace=False)])
+              for i in range(size)]
+    start = time.perf_counter()
+    model, _, _ = build_sequencing_model(build_engine(photos), env, top_k=10, vertical_k=5)
+    # Les sous-tours sont éliminés par contraintes paresseuses : le callback est indispensable
+    return model, time.perf_counter() - start, subtour_callback
+
+
+def _uc(env, size, seed):
+    from UnitCommitmentBenchmark import synthetic_fleet, synthetic_series
+    from UnitCommitmentProblemMatrixAPI import build_uc_model
+    units, periods = map(int, str(size).split("x"))
+    fleet = synthetic_fleet(units, seed)
+    load, solar = synthetic_series(periods, fleet, seed)
+    start = time.perf_counter()
+    model, _, _ = build_uc_model(
+        env, fleet["a"], fleet["b"], fleet["c"], fleet["sup_cost"], fleet["sdn_cost"],
+        fleet["pmin"], fleet["pmax"], fleet["init_status"], load, solar,
+    )
+    return model, time.perf_counter() - start, None
+
+
+# Chaque cas renvoie (modèle, temps de construction, callback de résolution ou None)
+CASES = {"knapsack": _knapsack, "portfolio": _portfolio, "slideshow": _slideshow, "uc": _uc}
+
+
+def _peak_rss_mb():
+    # ru_maxrss est en kio sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, size, seed=0, solve=True, time_limit=60):
+    """
+    Construit (et résout) une instance ; à appeler dans un processus dédié.
+
+    :return: Dictionnaire des mesures : temps de construction et de résolution, pic de RSS,
+        taille du modèle, statut et objectif.
+    """
+    import gurobipy as gp
+
+    row = {"case": case, "size": str(size), "seed": seed}
+    with gp.Env(params={"OutputFlag": 0, "TimeLimit": time_limit}) as env:
+        # Le premier appel à l'API matricielle paie une initialisation (~0,1 s) qui fausserait
+        # les petits cas : un modèle jetable l'absorbe
+        with gp.Model(env=env) as warmup:
+            v = warmup.addMVar(2)
+            warmup.addMConstr(np.ones((1, 2)), v, "<", np.ones(1))
+            warmup.addConstr(np.ones(2) @ v <= 1)
+            warmup.update()
+        model, build_time, callback = CASES[case](env, size, seed)
+        with model:
+            start = time.perf_counter()
+            model.update()
+            row["build_time"] = build_time + time.perf_counter() - start
+            row.update(num_vars=model.NumVars, num_constrs=model.NumConstrs,
+                       num_qconstrs=model.NumQConstrs, num_gen_constrs=model.NumGenConstrs,
+                       num_nz=model.NumNZs)
+            row.update(solve_time=None, status=None, objective=None)
+            if solve:
+                try:
+                    model.optimize(callback)
+                    row.update(solve_time=model.Runtime, status=model.Status,
+                               objective=model.ObjVal if model.SolCount else None)
+                except gp.GurobiError as error:
+                    if error.errno != gp.GRB.Error.SIZE_LIMIT_EXCEEDED:
+                        raise
+                    row["status"] = "size_limited"
+    row["peak_rss_mb"] = _peak_rss_mb()
+    return row
+
+
+def run_suite(sizes=None, seed=0, solve=True, time_limit=60, verbose=True):
+    """
+    Lance chaque (cas, taille) dans un processus neuf.
+
+    :param sizes: Dictionnaire cas -> liste de tailles (DEFAULT_SIZES par défaut).
+    :return: Liste des mesures.
+    """
+    sizes = sizes or DEFAULT_SIZES
+    rows = []
+    context = mp.get_context("spawn")
+    for case, case_sizes in sizes.items():
+        for size in case_sizes:
+            # Un processus par mesure : le pic de RSS n'inclut pas les cas précédents
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                row = pool.submit(run_case, case, size, seed, solve, time_limit).result()
+            rows.append(row)
+            if verbose:
+                solve_time = f"{row['solve_time']:.3f}s" if row["solve_time"] is not None else row["status"]
+                print(f"{case:>10} {row['size']:>10}  build {row['build_time']:.3f}s  "
+                      f"solve {solve_time}  rss {row['peak_rss_mb']:.0f} Mo  "
+                      f"vars {row['num_vars']}  constrs {row['num_constrs']}  nz {row['num_nz']}")
+    return rows
+
+
+def _key(row):
+    return f"{row['case']}:{row['size']}"
+
+
+def compare(rows, baseline, tolerance=0.25, min_delta=0.05):
+    """
+    Compare des mesures à une référence.
+
+    Une mesure est une régression si elle dépasse la référence de plus de ``tolerance`` (en
+    relatif) et de plus de ``min_delta`` (en absolu, pour ignorer le bruit des petits temps).
+    Un changement de taille du modèle est signalé à part.
+
+    :param baseline: Résultats de référence (liste de mesures).
+    :return: Liste de dictionnaires (cas, taille, mesure, référence, valeur, type).
+    """
+    reference = {_key(row): row for row in baseline}
+    findings = []
+    for row in rows:
+        base = reference.get(_key(row))
+        if base is None:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), row.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                findings.append({"key": _key(row), "metric": metric, "baseline": old, "value": new,
+                                 "kind": "regression"})
+        for field in SIZE_FIELDS:
+            if base.get(field) != row.get(field):
+                findings.append({"key": _key(row), "metric": field, "baseline": base.get(field),
+                                 "value": row.get(field), "kind": "model_changed"})
+    return findings
+
+
+def save_results(rows, path):
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": rows,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=1)
+
+
+def load_results(path):
+    with open(path, "r") as f:
+        return json.load(f)["results"]
+
+
+def _parse_sizes(values):
+    # "knapsack=100,1000" "uc=3x24"
+    sizes = {}
+    for value in values:
+        case, _, listed = value.partition("=")
+        if case not in CASES:
+            raise argparse.ArgumentTypeError(f"Cas inconnu : {case}")
+        sizes[case] = [int(s) if s.isdigit() else s for s in listed.split(",")] if listed else DEFAULT_SIZES[case]
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai des modèles")
+    parser.add_argument("cases", nargs="*", default=list(CASES),
+                        help="Cas à lancer, éventuellement avec des tailles : knapsack=100,1000 uc=3x24")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", default=None, help="Résultats de référence à comparer")
+    parser.add_argument("--save-baseline", default=None, help="Enregistre aussi les résultats ici")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--no-solve", action="store_true")
+    parser.add_argument("--time-limit", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = run_suite(_parse_sizes(args.cases), args.seed, not args.no_solve, args.time_limit)
+    save_results(rows, args.output)
+    if args.save_baseline:
+        save_results(rows, args.save_baseline)
+    if args.baseline:
+        findings = compare(rows, load_results(args.baseline), args.tolerance)
+        for finding in findings:
+            print(f"{finding['kind']:>14} {finding['key']:>20} {finding['metric']:>12}: "
+                  f"{finding['baseline']} -> {finding['value']}")
+        if any(finding["kind"] == "regression" for finding in findings):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
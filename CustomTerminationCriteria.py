@@ -1,68 +1,60 @@
-from functools import partial
+import argparse
 import gurobipy as gp
 from gurobipy import GRB
-import time
 
-class CallbackData:
-    def __init__(self):
-        self.last_gap_change_time = -GRB.INFINITY  # Temps du dernier changement significatif de gap
-        self.last_gap = GRB.INFINITY  # Dernier MIPGap enregistré
-
-def callback(model, where, *, cbdata):
-    if where == GRB.Callback.MIP:
-        # Nombre de solutions trouvées
-        solution_count = model.cbGet(GRB.Callback.MIP_SOLCNT)
-        if solution_count == 0:
-            return  # Pas encore de solution, rien à faire
-
-        # Temps écoulé depuis le début
-        runtime = model.cbGet(GRB.Callback.RUNTIME)
-
-        # Obtenir le MIPGap courant
-        best_obj = model.cbGet(GRB.Callback.MIP_OBJBST)  # Meilleure solution trouvée
-        bound_obj = model.cbGet(GRB.Callback.MIP_OBJBND)  # Meilleure borne
-        if abs(best_obj) > 1e-6:  # Évite la division par zéro
-            current_gap = abs(bound_obj - best_obj) / abs(best_obj)
+from ModelRacing import race
+from TerminationCriteria import (GapStagnation, NodeThroughput, ObjectiveImprovementRate,
+                                 TerminationPolicy, TimeBudget)
+
+def main():
+    parser = argparse.ArgumentParser(description="Résolution avec critères d'arrêt")
+    parser.add_argument("model", nargs="?", default="data/mkp.mps.bz2")
+    # Temps d'attente maximal après la dernière amélioration
+    parser.add_argument("--time-from-best", type=float, default=50)
+    # Seuil pour considérer un changement de gap significatif
+    parser.add_argument("--epsilon", type=float, default=1e-4)
+    parser.add_argument("--min-improvement", type=float, default=None,
+                        help="Amélioration relative minimale de l'objectif par fenêtre")
+    parser.add_argument("--min-node-rate", type=float, default=None,
+                        help="Nombre minimal de nœuds par seconde")
+    parser.add_argument("--budget", type=float, default=None, help="Temps maximal (secondes)")
+    parser.add_argument("--race", type=int, default=None,
+                        help="Nombre de configurations lancées en parallèle (voir ModelRacing)")
+    parser.add_argument("--gap", type=float, default=1e-4, help="Gap visé par la course")
+    args = parser.parse_args()
+
+    criteria = [GapStagnation(args.time_from_best, args.epsilon)]
+    if args.min_improvement is not None:
+        criteria.append(ObjectiveImprovementRate(args.time_from_best, args.min_improvement))
+    if args.min_node_rate is not None:
+        criteria.append(NodeThroughput(args.min_node_rate))
+    if args.budget is not None:
+        criteria.append(TimeBudget(args.budget))
+
+    if args.race:
+        # Chaque concurrent applique les mêmes critères d'arrêt
+        result = race(args.model, target_gap=args.gap, criteria=criteria, workers=args.race)
+        for row in result["results"]:
+            print(row)
+        print(f"Gagnant : {result['winner']}, objectif {result['objective']}, {result['wall_time']:.2f}s")
+        return
+
+    policy = TerminationPolicy(criteria, verbose=True)
+
+    # Charger le modèle et lancer l'optimisation avec le callback
+    with gp.read(args.model) as model:
+        model.optimize(policy)
+
+        # Afficher les résultats si l'optimisation est terminée
+        if model.status == GRB.OPTIMAL:
+            print("Optimization complete. Solution found.")
+        elif model.status == GRB.TIME_LIMIT:
+            print("Time limit reached.")
+        elif model.status == GRB.INTERRUPTED:
+            print("Optimization was terminated by the callback.")
         else:
-            current_gap = float('inf')  # Si aucune solution n'a été trouvée
-
-        # Si c'est la première solution trouvée, initialiser le temps
-        if cbdata.last_gap == GRB.INFINITY:
-            cbdata.last_gap_change_time = runtime
-            cbdata.last_gap = current_gap
-            return
-
-        # Vérifier si le MIPGap a changé significativement
-        gap_change = abs(cbdata.last_gap - current_gap)
-        if gap_change > epsilon_to_compare_gap:
-            # Mettre à jour les informations sur le dernier changement significatif
-            cbdata.last_gap_change_time = runtime
-            cbdata.last_gap = current_gap
-        else:
-            # Vérifier si le temps écoulé depuis le dernier changement dépasse la limite
-            if runtime - cbdata.last_gap_change_time > time_from_best:
-                print(f"Terminating: No significant gap improvement in {time_from_best} seconds.")
-                model.terminate()  # Arrêter l'optimisation
-
-# Charger le modèle
-with gp.read("data/mkp.mps.bz2") as model:
-    # Paramètres pour le callback
-    time_from_best = 50  # Temps d'attente maximal après la dernière amélioration
-    epsilon_to_compare_gap = 1e-4  # Seuil pour considérer un changement de gap significatif
-
-    # Initialiser les données pour le callback
-    callback_data = CallbackData()
-    callback_func = partial(callback, cbdata=callback_data)
-
-    # Lancer l'optimisation avec le callback
-    model.optimize(callback_func)
+            print(f"Optimization ended with status {model.status}.")
+        print(policy.report(model))
 
-    # Afficher les résultats si l'optimisation est terminée
-    if model.status == GRB.OPTIMAL:
-        print("Optimization complete. Solution found.")
-    elif model.status == GRB.TIME_LIMIT:
-        print("Time limit reached.")
-    elif model.status == GRB.INTERRUPTED:
-        print("Optimization was terminated by the callback.")
-    else:
-        print(f"Optimization ended with status {model.status}.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
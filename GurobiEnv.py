@@ -0,0 +1,95 @@
+# Environnements Gurobi partagés.
+# Ouvrir un gp.Env coûte un démarrage complet (lecture et vérification de la licence) : une
+# boucle de petites résolutions qui ouvre un Env par appel passe l'essentiel de son temps là.
+# shared_env() ouvre un seul Env par processus et par jeu de paramètres, le réutilise pour
+# tous les modèles et le ferme à la sortie du processus. Après un fork, le processus enfant
+# ouvre le sien (un Env ne se partage pas entre processus).
+#
+#     model = new_model("knapsack", {"OutputFlag": 0})
+#     print(measure_startup())
+import atexit
+import os
+import time
+
+_envs = {}
+_pid = None
+
+
+def _key(params):
+    return tuple(sorted((params or {}).items()))
+
+
+def shared_env(params=None):
+    """
+    Environnement Gurobi du processus courant pour ces paramètres, ouvert au premier appel.
+
+    :param params: Paramètres de l'environnement (OutputFlag, Threads...).
+    :return: gp.Env, à ne pas fermer par l'appelant.
+    """
+    global _pid
+    if _pid != os.getpid():
+        # Processus neuf ou enfant d'un fork : les Env du parent ne sont pas utilisables
+        _envs.clear()
+        _pid = os.getpid()
+    key = _key(params)
+    env = _envs.get(key)
+    if env is None:
+        import gurobipy as gp
+        env = _envs[key] = gp.Env(params=dict(key))
+    return env
+
+
+def new_model(name="", params=None):
+    """
+    Nouveau modèle dans l'environnement partagé correspondant à ``params``.
+    """
+    import gurobipy as gp
+    return gp.Model(name, env=shared_env(params))
+
+
+@atexit.register
+def close_all():
+    """
+    Ferme les environnements partagés de ce processus.
+    """
+    if _pid == os.getpid():
+        for env in _envs.values():
+            env.dispose()
+    _envs.clear()
+
+
+def measure_startup(repeat=5, params=None):
+    """
+    Compare le coût d'une petite résolution avec un Env ouvert à chaque fois et avec l'Env
+    partagé (modèle vide, comme easy.py).
+
+    :return: Dictionnaire (secondes) : import de gurobipy, premier Env du processus, moyenne
+        par résolution avec un nouvel Env, moyenne par résolution avec l'Env partagé.
+    """
+    params = {"OutputFlag": 0, **(params or {})}
+    start = time.perf_counter()
+    import gurobipy as gp
+    import_time = time.perf_counter() - start
+
+    def solve(env):
+        with gp.Model(env=env) as model:
+            model.optimize()
+
+    start = time.perf_counter()
+    with gp.Env(params=params) as env:
+        solve(env)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with gp.Env(params=params) as env:
+            solve(env)
+    fresh = (time.perf_counter() - start) / repeat
+
+    env = shared_env(params)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        solve(env)
+    shared = (time.perf_counter() - start) / repeat
+
+    return {"import": import_time, "first_env": first, "fresh_env": fresh, "shared_env": shared}
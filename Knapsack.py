@@ -1,49 +1,107 @@
+import time
+
 import numpy as np
 import gurobipy as gp
 from gurobipy import GRB
 
-def generate_knapsack(num_items):
+from GurobiEnv import shared_env
+from SolverTelemetry import chain_callbacks
+
+def generate_knapsack(num_items, seed=0, capacity_ratio=0.7):
     # Fixer une graine pour la reproductibilité
-    rng = np.random.default_rng(seed=0)
+    rng = np.random.default_rng(seed=seed)
     # Valeurs et poids des objets
     values = rng.uniform(low=1, high=25, size=num_items)
     weights = rng.uniform(low=5, high=100, size=num_items)
     # Capacité du sac à dos
-    capacity = 0.7 * weights.sum()
+    capacity = capacity_ratio * weights.sum()
 
     return values, weights, capacity
 
-def solve_knapsack_model(values, weights, capacity):
-    num_items = len(values)
+def build_knapsack_model(values, weights, capacity, env):
+    # Construction directe depuis les tableaux numpy avec l'API matricielle (aucune copie en dictionnaire)
+    model = gp.Model(name="knapsack", env=env)
+
+    # Définir les variables de décision (0 ou 1)
+    x = model.addMVar(len(values), vtype=GRB.BINARY, name="x")
+
+    # Définir la fonction objectif (maximiser la valeur totale)
+    model.setObjective(values @ x, GRB.MAXIMIZE)
+
+    # Ajouter la contrainte de capacité (une seule ligne dense de n coefficients)
+    model.addMConstr(weights.reshape(1, -1), x, GRB.LESS_EQUAL, np.array([capacity]), name="capacity")
+
+    model.update()
+    return model, x
+
+class PresolveTimer:
+    # Le presolve se termine au premier callback d'un algorithme de résolution (simplexe, MIP ou
+    # barrière) ; MESSAGE et POLLING arrivent aussi pendant le presolve et sont ignorés
+    SOLVING = (GRB.Callback.SIMPLEX, GRB.Callback.MIP, GRB.Callback.BARRIER)
+
+    def __init__(self):
+        self.presolve_end = None
+
+    def __call__(self, model, where):
+        if self.presolve_end is None and where in self.SOLVING:
+            self.presolve_end = model.cbGet(GRB.Callback.RUNTIME)
+
+def solve_knapsack_model(values, weights, capacity, env=None, verbose=True, callback=None):
+    """
+    Construit et résout le sac à dos.
 
-    # Conversion des tableaux numpy en dictionnaires pour Gurobi
-    values_dict = {i: values[i] for i in range(num_items)}
-    weights_dict = {i: weights[i] for i in range(num_items)}
+    :param values: Tableau numpy des valeurs.
+    :param weights: Tableau numpy des poids.
+    :param capacity: Capacité du sac.
+    :param env: Environnement Gurobi (par défaut l'environnement partagé du processus, voir GurobiEnv).
+    :param verbose: Affiche la valeur optimale et les temps.
+    :param callback: Callback supplémentaire (par exemple SolverTelemetry.TelemetryRecorder).
+    :return: Dictionnaire (objectif, statut, temps de construction, presolve et résolution).
+    """
+    if env is None:
+        # Environnement partagé : les appels successifs ne repaient pas le démarrage
+        env = shared_env()
 
-    # Création de l'environnement et du modèle
-    with gp.Env() as env:
-        with gp.Model(name="knapsack", env=env) as model:
-            # Définir les variables de décision (0 ou 1)
-            x = model.addVars(num_items, vtype=GRB.BINARY, name="x")
+    start = time.perf_counter()
+    model, x = build_knapsack_model(values, weights, capacity, env)
+    build_time = time.perf_counter() - start
 
-            # Définir la fonction objectif (maximiser la valeur totale)
-            model.setObjective(gp.quicksum(values_dict[i] * x[i] for i in range(num_items)), GRB.MAXIMIZE)
+    with model:
+        # Optimiser le modèle
+        timer = PresolveTimer()
+        model.optimize(chain_callbacks(timer, callback))
+        runtime = model.Runtime
+        presolve_time = timer.presolve_end if timer.presolve_end is not None else runtime
 
-            # Ajouter la contrainte de capacité
-            model.addConstr(gp.quicksum(weights_dict[i] * x[i] for i in range(num_items)) <= capacity, name="capacity")
+        result = {
+            "objective": model.ObjVal if model.SolCount > 0 else None,
+            "status": model.Status,
+            "gap": model.MIPGap if model.SolCount > 0 else None,
+            "runtime": runtime,
+            "build_time": build_time,
+            "presolve_time": presolve_time,
+            "solve_time": runtime - presolve_time,
+            "node_count": model.NodeCount,
+            "num_vars": model.NumVars,
+            "num_nz": model.NumNZs,
+        }
 
-            # Optimiser le modèle
-            model.optimize()
+        # Afficher les résultats
+        if verbose and model.status == GRB.OPTIMAL:
+            print("Valeur optimale:", model.objVal)
+            #print("Objets sélectionnés:", np.flatnonzero(x.X > 0.5))
+    return result
 
-            # Afficher les résultats
-            if model.status == GRB.OPTIMAL:
-                print("Valeur optimale:", model.objVal)
-                #print("Objets sélectionnés:")
-                #for i in range(num_items):
-                    #if x[i].X > 0.5:  # Vérifie si l'objet est sélectionné
-                        #print(f"  Objet {i}: valeur = {values_dict[i]}, poids = {weights_dict[i]}")
+def print_timings(timings):
+    for step in ("generation_time", "build_time", "presolve_time", "solve_time"):
+        print(f"{step:>16}: {timings[step]:.4f}s")
 
-# Générer les données pour 10 000 objets
-data = generate_knapsack(10000)
-# Résoudre le problème
-solve_knapsack_model(*data)
+if __name__ == "__main__":
+    # Générer les données pour 10 000 objets
+    start = time.perf_counter()
+    data = generate_knapsack(10000)
+    generation_time = time.perf_counter() - start
+    # Résoudre le problème
+    result = solve_knapsack_model(*data)
+    result["generation_time"] = generation_time
+    print_timings(result)
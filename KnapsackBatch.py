@@ -0,0 +1,110 @@
+# Résolution en lot de nombreuses instances de sac à dos (graine, taille, ratio de capacité).
+# Chaque processus du pool ouvre un seul environnement Gurobi, réutilisé pour toutes ses
+# instances, avec un nombre de threads Gurobi fixé par processus. Les résultats sont écrits
+# dans un fichier CSV au fur et à mesure, puis renvoyés sous forme de table en colonnes.
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from GurobiEnv import shared_env
+from Knapsack import generate_knapsack, solve_knapsack_model
+
+COLUMNS = [
+    "seed", "num_items", "capacity_ratio", "objective", "gap", "runtime", "status",
+    "generation_time", "build_time", "presolve_time", "solve_time", "worker",
+]
+
+# Environnement Gurobi du processus courant (un par worker)
+_env = None
+
+
+def _init_worker(threads, params):
+    global _env
+    env_params = {"OutputFlag": 0, "Threads": threads}
+    env_params.update(params or {})
+    _env = shared_env(env_params)
+
+
+def _solve_instance(instance):
+    seed, num_items, capacity_ratio = instance
+    start = time.perf_counter()
+    values, weights, capacity = generate_knapsack(num_items, seed=seed, capacity_ratio=capacity_ratio)
+    generation_time = time.perf_counter() - start
+
+    result = solve_knapsack_model(values, weights, capacity, env=_env, verbose=False)
+    result.update(seed=seed, num_items=num_items, capacity_ratio=capacity_ratio,
+                  generation_time=generation_time, worker=os.getpid())
+    return {column: result[column] for column in COLUMNS}
+
+
+def solve_batch(instances, workers=None, threads=1, output_file=None, params=None):
+    """
+    Résout un lot d'instances en parallèle.
+
+    :param instances: Itérable de tuples (graine, nombre d'objets, ratio de capacité).
+    :param workers: Nombre de processus (None : nombre de cœurs divisé par ``threads`` ;
+        0 : résolution séquentielle dans le processus courant).
+    :param threads: Valeur du paramètre Gurobi ``Threads`` pour chaque processus.
+    :param output_file: Fichier CSV où chaque résultat est ajouté dès qu'il est disponible.
+    :param params: Paramètres Gurobi supplémentaires communs à toutes les résolutions.
+    :return: DataFrame avec une ligne par instance (dans l'ordre de fin de résolution).
+    """
+    instances = list(instances)
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // threads)
+
+    columns = {column: [] for column in COLUMNS}
+    out = open(output_file, "w", newline="") if output_file else None
+    writer = csv.DictWriter(out, fieldnames=COLUMNS) if out else None
+    if writer:
+        writer.writeheader()
+
+    def record(row):
+        for column in COLUMNS:
+            columns[column].append(row[column])
+        if writer:
+            writer.writerow(row)
+            out.flush()
+
+    try:
+        if workers == 0:
+            _init_worker(threads, params)
+            for instance in instances:
+                record(_solve_instance(instance))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(threads, params)) as pool:
+                futures = [pool.submit(_solve_instance, instance) for instance in instances]
+                for future in as_completed(futures):
+                    record(future.result())
+    finally:
+        if out:
+            out.close()
+
+    import pandas as pd
+    return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résolution en lot d'instances de sac à dos")
+    parser.add_argument("--seeds", type=int, default=8, help="Nombre de graines (0..seeds-1)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000])
+    parser.add_argument("--ratios", type=float, nargs="+", default=[0.7])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--output", default="knapsack_batch.csv")
+    args = parser.parse_args()
+
+    instances = [(seed, size, ratio) for seed in range(args.seeds)
+                 for size in args.sizes for ratio in args.ratios]
+    start = time.perf_counter()
+    table = solve_batch(instances, args.workers, args.threads, args.output)
+    elapsed = time.perf_counter() - start
+    print(table.sort_values(["num_items", "capacity_ratio", "seed"]).to_string(index=False))
+    print(f"{len(instances)} instances en {elapsed:.2f}s ({len(instances) / elapsed:.2f} instances/s)")
+
+
+if __name__ == "__main__":
+    main()
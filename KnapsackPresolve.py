@@ -0,0 +1,212 @@
+# Pré-traitement combinatoire du sac à dos 0/1 avant Gurobi :
+# - tri des objets par densité valeur/poids (argsort vectorisé) ;
+# - solution gloutonne (borne inférieure) et borne de Dantzig (relaxation linéaire) ;
+# - fixation des objets dont la borne obtenue en forçant la valeur opposée (Dembo-Hammer :
+#   U_LP - |v_j - r w_j|, r étant la densité de l'objet critique) est inférieure à la solution
+#   gloutonne : il ne reste qu'un petit « cœur » d'objets libres ;
+# - résolution du cœur par Gurobi (avec la solution gloutonne comme MIP start) ou par une
+#   programmation dynamique sur les états non dominés.
+import time
+
+import numpy as np
+import gurobipy as gp
+
+from Knapsack import build_knapsack_model, generate_knapsack, solve_knapsack_model
+
+
+class KnapsackReduction:
+    """
+    Résultat du pré-traitement.
+
+    - ``order`` : indices des objets par densité décroissante ;
+    - ``greedy`` : solution gloutonne (tableau booléen) et ``lower_bound`` sa valeur ;
+    - ``upper_bound`` : borne de Dantzig ;
+    - ``fixed_in`` / ``fixed_out`` : objets fixés à 1 / à 0 ;
+    - ``core`` : objets restant libres.
+    """
+
+    def __init__(self, order, greedy, lower_bound, upper_bound, fixed_in, fixed_out, core):
+        self.order = order
+        self.greedy = greedy
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self.fixed_in = fixed_in
+        self.fixed_out = fixed_out
+        self.core = core
+
+
+def greedy_solution(values, weights, capacity, order):
+    """
+    Solution gloutonne : les objets sont pris par densité décroissante tant qu'ils tiennent,
+    puis on complète avec les objets suivants qui tiennent encore.
+
+    :return: Tuple (solution booléenne, indice de l'objet critique dans ``order``).
+    """
+    cumulative = np.cumsum(weights[order])
+    critical = int(np.searchsorted(cumulative, capacity, side="right"))
+    x = np.zeros(len(values), dtype=bool)
+    x[order[:critical]] = True
+
+    residual = capacity - (cumulative[critical - 1] if critical > 0 else 0.0)
+    rest = order[critical:]
+    # Le reste est parcouru seulement tant que le plus léger des objets restants peut encore tenir
+    lightest = np.minimum.accumulate(weights[rest][::-1])[::-1] if len(rest) else rest
+    for k, item in enumerate(rest):
+        if residual < lightest[k]:
+            break
+        if weights[item] <= residual:
+            x[item] = True
+            residual -= weights[item]
+    return x, critical
+
+
+def reduce_knapsack(values, weights, capacity, tolerance=1e-9):
+    """
+    Calcule les bornes et fixe les objets dont la valeur est prouvée.
+
+    :param values: Tableau numpy des valeurs.
+    :param weights: Tableau numpy des poids.
+    :param capacity: Capacité du sac.
+    :param tolerance: Marge pour comparer bornes et solution gloutonne.
+    :return: KnapsackReduction.
+    """
+    density = values / weights
+    order = np.argsort(-density, kind="stable")
+    greedy, critical = greedy_solution(values, weights, capacity, order)
+    lower_bound = float(values[greedy].sum())
+
+    if critical >= len(values):
+        # Tous les objets tiennent : rien à optimiser
+        everything = np.arange(len(values))
+        return KnapsackReduction(order, greedy, lower_bound, lower_bound,
+                                 everything, everything[:0], everything[:0])
+
+    # Borne de Dantzig : objets avant l'objet critique, plus une fraction de celui-ci
+    taken = order[:critical]
+    residual = capacity - weights[taken].sum()
+    ratio = density[order[critical]]
+    upper_bound = float(values[taken].sum() + residual * ratio)
+
+    # Coûts réduits et bornes avec la variable forcée à la valeur opposée à la relaxation
+    reduced = values - ratio * weights
+    forced_bound = upper_bound - np.abs(reduced)
+    fixable = forced_bound < lower_bound - tolerance
+    in_lp = np.zeros(len(values), dtype=bool)
+    in_lp[taken] = True
+
+    fixed_in = np.flatnonzero(fixable & in_lp)
+    fixed_out = np.flatnonzero(fixable & ~in_lp)
+    core = np.flatnonzero(~fixable)
+    return KnapsackReduction(order, greedy, lower_bound, upper_bound, fixed_in, fixed_out, core)
+
+
+def dp_core(values, weights, capacity, max_states=1_000_000):
+    """
+    Programmation dynamique sur les états (poids, valeur) non dominés, adaptée aux poids réels.
+
+    :param values: Valeurs des objets du cœur.
+    :param weights: Poids des objets du cœur.
+    :param capacity: Capacité résiduelle.
+    :param max_states: Abandonne (renvoie None) si le nombre d'états dépasse cette limite.
+    :return: Tuple (solution booléenne, valeur) ou None.
+    """
+    state_w = np.zeros(1)
+    state_v = np.zeros(1)
+    history = []
+    for k in range(len(values)):
+        keep = state_w + weights[k] <= capacity
+        all_w = np.concatenate([state_w, state_w[keep] + weights[k]])
+        all_v = np.concatenate([state_v, state_v[keep] + values[k]])
+        parent = np.concatenate([np.arange(len(state_w)), np.flatnonzero(keep)])
+        took = np.concatenate([np.zeros(len(state_w), dtype=bool), np.ones(keep.sum(), dtype=bool)])
+
+        # Garder les états non dominés : poids croissant, valeur strictement croissante
+        idx = np.lexsort((-all_v, all_w))
+        best_before = np.maximum.accumulate(all_v[idx])
+        dominant = np.ones(len(idx), dtype=bool)
+        dominant[1:] = all_v[idx][1:] > best_before[:-1]
+        idx = idx[dominant]
+
+        state_w, state_v = all_w[idx], all_v[idx]
+        history.append((parent[idx], took[idx]))
+        if len(state_w) > max_states:
+            return None
+
+    # Retrouver la solution en remontant les parents
+    x = np.zeros(len(values), dtype=bool)
+    state = int(np.argmax(state_v))
+    for k in range(len(values) - 1, -1, -1):
+        parent, took = history[k]
+        x[k] = took[state]
+        state = parent[state]
+    return x, float(state_v.max())
+
+
+def solve_reduced(values, weights, capacity, env, use_dp=False, verbose=True):
+    """
+    Pré-traitement puis résolution du cœur (Gurobi avec MIP start glouton, ou DP).
+
+    :return: Dictionnaire (objectif, temps, taille du cœur, nœuds explorés, bornes).
+    """
+    start = time.perf_counter()
+    reduction = reduce_knapsack(values, weights, capacity)
+    presolve_time = time.perf_counter() - start
+
+    core = reduction.core
+    fixed_value = float(values[reduction.fixed_in].sum())
+    core_capacity = capacity - weights[reduction.fixed_in].sum()
+    result = {
+        "lower_bound": reduction.lower_bound,
+        "upper_bound": reduction.upper_bound,
+        "num_fixed": len(values) - len(core),
+        "core_size": len(core),
+        "reduction_time": presolve_time,
+        "node_count": 0,
+    }
+
+    start = time.perf_counter()
+    solved = dp_core(values[core], weights[core], core_capacity) if use_dp else None
+    if solved is not None:
+        core_x, core_value = solved
+        result.update(method="dp", objective=fixed_value + core_value, runtime=time.perf_counter() - start)
+    elif len(core) == 0:
+        result.update(method="none", objective=fixed_value, runtime=0.0)
+    else:
+        model, x = build_knapsack_model(values[core], weights[core], core_capacity, env)
+        with model:
+            # Solution gloutonne restreinte au cœur comme point de départ
+            x.Start = reduction.greedy[core].astype(float)
+            model.optimize()
+            # Sans solution (limite de temps atteinte avant la première), pas d'objectif
+            result.update(method="gurobi", objective=fixed_value + model.ObjVal if model.SolCount > 0 else None,
+                          runtime=model.Runtime, node_count=model.NodeCount)
+
+    if verbose:
+        print(f"Glouton : {result['lower_bound']:.4f}, borne de Dantzig : {result['upper_bound']:.4f}")
+        print(f"Objets fixés : {result['num_fixed']}, cœur : {result['core_size']} "
+              f"(pré-traitement en {presolve_time:.4f}s)")
+        print(f"Valeur optimale ({result['method']}) : {result['objective']}")
+    return result
+
+
+def compare(num_items=10000, seed=0, use_dp=False):
+    """
+    Compare la résolution directe et la résolution après pré-traitement :
+    temps Gurobi et nombre de nœuds.
+    """
+    values, weights, capacity = generate_knapsack(num_items, seed=seed)
+    with gp.Env(params={"OutputFlag": 0}) as env:
+        plain = solve_knapsack_model(values, weights, capacity, env, verbose=False)
+        reduced = solve_reduced(values, weights, capacity, env, use_dp=use_dp, verbose=False)
+
+    print(f"{'':>10} {'objectif':>14} {'temps (s)':>10} {'nœuds':>8} {'variables':>10}")
+    print(f"{'direct':>10} {plain['objective']:>14.4f} {plain['runtime']:>10.4f} "
+          f"{plain['node_count']:>8.0f} {num_items:>10}")
+    print(f"{'réduit':>10} {reduced['objective']:>14.4f} "
+          f"{reduced['reduction_time'] + reduced['runtime']:>10.4f} "
+          f"{reduced['node_count']:>8.0f} {reduced['core_size']:>10}")
+    return plain, reduced
+
+
+if __name__ == "__main__":
+    compare()
@@ -0,0 +1,268 @@
+# Décomposition lagrangienne pour les sacs à dos multidimensionnels (MKP) lus en MPS.
+# max c x  s.c.  A x <= b,  x binaire,  A >= 0.
+# En relâchant les m contraintes avec des multiplicateurs lambda >= 0, le sous-problème se
+# sépare par objet : x_j = 1 si le coût réduit c_j - lambda A_j est positif. Les multiplicateurs
+# sont mis à jour par sous-gradient (pas de Polyak), entièrement en numpy. À intervalles
+# réguliers, la solution relâchée est réparée (retrait des objets de plus faible rapport
+# valeur / poids pondéré par lambda, puis ajout glouton) pour obtenir des solutions réalisables ;
+# la meilleure est ensuite améliorée par échanges 1-1.
+# Gurobi reçoit ensuite la meilleure solution comme MIP start, une borne de coupure, et les
+# variables fixées par les coûts réduits : si forcer x_j à l'autre valeur fait passer la borne
+# lagrangienne sous la meilleure solution connue, x_j garde sa valeur dans toute solution
+# meilleure.
+import argparse
+import time
+
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+
+
+def extract_mkp(model):
+    """
+    Reconnaît un sac à dos multidimensionnel dans un modèle Gurobi.
+
+    :return: Tuple (valeurs c, matrice A creuse CSR, capacités b, sens, constante) où le sens
+        vaut 1 pour une maximisation et -1 pour une minimisation de -c : l'objectif du modèle
+        vaut ``sens * c x + constante``.
+    :raises ValueError: Si le modèle n'a pas cette structure.
+    """
+    model.update()
+    variables, constraints = model.getVars(), model.getConstrs()
+    if model.NumQConstrs or model.NumGenConstrs or model.NumSOS or model.IsQP:
+        raise ValueError("Modèle non linéaire")
+    vtypes = np.array(model.getAttr("VType", variables))
+    lb = np.array(model.getAttr("LB", variables))
+    ub = np.array(model.getAttr("UB", variables))
+    binary = (vtypes == GRB.BINARY) | ((vtypes == GRB.INTEGER) & (lb == 0) & (ub == 1))
+    if not binary.all():
+        raise ValueError("Toutes les variables doivent être binaires")
+
+    senses = np.array(model.getAttr("Sense", constraints))
+    if (senses != GRB.LESS_EQUAL).any():
+        raise ValueError("Toutes les contraintes doivent être de type <=")
+    matrix = model.getA().tocsr()
+    capacities = np.array(model.getAttr("RHS", constraints))
+    if (matrix.data < 0).any() or (capacities < 0).any():
+        raise ValueError("Poids et capacités doivent être positifs")
+
+    sense = -model.ModelSense  # GRB.MAXIMIZE vaut -1
+    values = sense * np.array(model.getAttr("Obj", variables))
+    return values, matrix, capacities, sense, model.ObjCon
+
+
+def repair(x, values, weights, capacities, multipliers):
+    """
+    Rend une solution réalisable puis la complète gloutonnement.
+
+    Les objets sont classés par rapport valeur / poids pondéré (poids rapportés aux capacités,
+    plus les multiplicateurs) ; les moins bons sont retirés tant qu'une contrainte est violée,
+    puis les meilleurs objets restants sont ajoutés s'ils tiennent.
+
+    :param weights: Matrice des poids dense (m x n).
+    :return: Tuple (solution booléenne, valeur).
+    """
+    x = x.copy()
+    scale = 1 / np.maximum(capacities, 1e-12) + multipliers
+    ratio = values / np.maximum(scale @ weights, 1e-12)
+    order = np.argsort(ratio)
+    load = weights @ x
+    # Retrait des objets de plus faible rapport
+    for j in order:
+        if (load <= capacities + 1e-9).all():
+            break
+        if x[j]:
+            x[j] = False
+            load -= weights[:, j]
+    # Ajout glouton des meilleurs objets qui tiennent encore
+    slack = capacities - load
+    for j in order[::-1]:
+        if not x[j] and values[j] > 0 and (weights[:, j] <= slack + 1e-9).all():
+            x[j] = True
+            slack -= weights[:, j]
+    return x, float(values @ x)
+
+
+def swap_search(x, values, weights, capacities, max_rounds=1000, chunk_size=1 << 22):
+    """
+    Amélioration par échanges 1-1 : à chaque tour, l'échange (objet retiré, objet ajouté)
+    réalisable de meilleur gain est appliqué, puis les objets qui tiennent encore sont ajoutés.
+    Les échanges sont évalués en bloc (objets pris x objets libres x contraintes), par tranches
+    d'objets pris d'au plus ``chunk_size`` éléments.
+
+    :return: Tuple (solution booléenne, valeur).
+    """
+    x = x.copy()
+    for _ in range(max_rounds):
+        slack = capacities - weights @ x
+        inside, outside = np.flatnonzero(x), np.flatnonzero(~x)
+        # Ajout direct d'un objet qui tient
+        fits = outside[(weights[:, outside] <= slack[:, None] + 1e-9).all(axis=0) & (values[outside] > 0)]
+        if len(fits):
+            x[fits[np.argmax(values[fits])]] = True
+            continue
+        if len(inside) == 0 or len(outside) == 0:
+            break
+        added = weights[:, outside].T[None, :, :] - slack[None, None, :]
+        step = max(1, chunk_size // (len(outside) * len(capacities)))
+        best_gain, best_pair = 1e-9, None
+        for first in range(0, len(inside), step):
+            chunk = inside[first:first + step]
+            feasible = (weights[:, chunk].T[:, None, :] >= added - 1e-9).all(axis=2)
+            gain = np.where(feasible, values[outside][None, :] - values[chunk][:, None], -np.inf)
+            i, j = np.unravel_index(np.argmax(gain), gain.shape)
+            if gain[i, j] > best_gain:
+                best_gain, best_pair = gain[i, j], (chunk[i], outside[j])
+        if best_pair is None:
+            break
+        x[best_pair[0]], x[best_pair[1]] = False, True
+    return x, float(values @ x)
+
+
+def lagrangian(values, weights, capacities, iterations=2000, repair_every=20, theta=2.0,
+               patience=50, time_limit=None):
+    """
+    Relaxation lagrangienne des contraintes de capacité par sous-gradient.
+
+    :param weights: Matrice des poids dense (m x n).
+    :param theta: Coefficient initial du pas de Polyak, divisé par deux après ``patience``
+        itérations sans amélioration de la borne.
+    :return: Dictionnaire : borne supérieure, meilleure solution et sa valeur, multiplicateurs
+        et coûts réduits de la meilleure borne, nombre d'itérations.
+    """
+    start = time.perf_counter()
+    multipliers = np.zeros(len(capacities))
+    best_bound, best_multipliers = np.inf, multipliers
+    best_x, best_value = repair(np.zeros(len(values), dtype=bool), values, weights, capacities, multipliers)
+    stall = 0
+    iteration = 0
+    for iteration in range(1, iterations + 1):
+        reduced = values - multipliers @ weights
+        x = reduced > 0
+        bound = reduced[x].sum() + multipliers @ capacities
+        if bound < best_bound - 1e-9:
+            best_bound, best_multipliers, stall = bound, multipliers, 0
+        else:
+            stall += 1
+            if stall >= patience:
+                theta, stall = theta / 2, 0
+
+        if iteration % repair_every == 0:
+            candidate, value = repair(x, values, weights, capacities, multipliers)
+            if value > best_value:
+                best_x, best_value = candidate, value
+
+        subgradient = capacities - weights @ x
+        norm = subgradient @ subgradient
+        if norm < 1e-12 or best_bound - best_value < 1e-9 or theta < 1e-6:
+            break
+        step = theta * (bound - best_value) / norm
+        multipliers = np.maximum(0.0, multipliers - step * subgradient)
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            break
+
+    best_x, best_value = swap_search(best_x, values, weights, capacities)
+    return {
+        "bound": float(best_bound),
+        "x": best_x,
+        "value": best_value,
+        "multipliers": best_multipliers,
+        "reduced_costs": values - best_multipliers @ weights,
+        "iterations": iteration,
+        "time": time.perf_counter() - start,
+    }
+
+
+def reduced_cost_fixing(relaxation):
+    """
+    Variables fixées par les coûts réduits.
+
+    Forcer x_j à l'opposé de sa valeur dans la relaxation diminue la borne de |coût réduit| :
+    si la borne devient inférieure à la meilleure solution connue, x_j est fixé.
+
+    :return: Tuple (indices fixés à 0, indices fixés à 1).
+    """
+    reduced = relaxation["reduced_costs"]
+    removable = relaxation["bound"] - np.abs(reduced) < relaxation["value"] - 1e-9
+    return np.flatnonzero(removable & (reduced <= 0)), np.flatnonzero(removable & (reduced > 0))
+
+
+def solve_decomposed(model, iterations=2000, lagrangian_time=None, fix=True, verbose=True):
+    """
+    Résout un MKP : relaxation lagrangienne, puis Gurobi avec MIP start, coupure et fixations.
+
+    :param model: Modèle Gurobi (modifié : bornes des variables fixées, Start, Cutoff).
+    :return: Dictionnaire des bornes, du nombre de variables fixées et des temps.
+    """
+    start = time.perf_counter()
+    values, matrix, capacities, sense, constant = extract_mkp(model)
+    relaxation = lagrangian(values, matrix.toarray(), capacities, iterations, time_limit=lagrangian_time)
+
+    variables = model.getVars()
+    model.setAttr("Start", variables, relaxation["x"].astype(float).tolist())
+    # Coupure juste sous la solution heuristique : le MIP start reste admissible
+    model.Params.Cutoff = sense * (relaxation["value"] - 1e-6 * max(1.0, abs(relaxation["value"]))) + constant
+    zeros, ones = reduced_cost_fixing(relaxation) if fix else ((), ())
+    for j in zeros:
+        variables[j].UB = 0
+    for j in ones:
+        variables[j].LB = 1
+    prepare_time = time.perf_counter() - start
+    # Bornes et valeurs rapportées dans le sens et avec la constante de l'objectif du modèle
+    to_model = lambda value: sense * value + constant
+    if verbose:
+        print(f"Lagrangien : borne {to_model(relaxation['bound']):.4f}, "
+              f"solution {to_model(relaxation['value']):.4f} "
+              f"({relaxation['iterations']} itérations, {relaxation['time']:.3f}s), "
+              f"{len(zeros)} variables fixées à 0, {len(ones)} à 1")
+
+    model.optimize()
+    return {
+        "lagrangian_bound": to_model(relaxation["bound"]),
+        "heuristic_value": to_model(relaxation["value"]),
+        "fixed": len(zeros) + len(ones),
+        "objective": model.ObjVal if model.SolCount else None,
+        "bound": to_model(min(sense * (model.ObjBound - constant), relaxation["bound"]))
+        if model.SolCount else None,
+        "status": model.Status,
+        "prepare_time": prepare_time,
+        "solve_time": model.Runtime,
+        "total_time": time.perf_counter() - start,
+    }
+
+
+def compare(model_path, target_gap=1e-3, time_limit=120, iterations=2000):
+    """
+    Temps pour atteindre ``target_gap`` : résolution directe et après décomposition.
+    """
+    rows = {}
+    with gp.Env(params={"OutputFlag": 0, "MIPGap": target_gap, "TimeLimit": time_limit}) as env:
+        with gp.read(model_path, env=env) as model:
+            start = time.perf_counter()
+            model.optimize()
+            rows["direct"] = {"objective": model.ObjVal if model.SolCount else None,
+                              "status": model.Status, "gap": model.MIPGap if model.SolCount else None,
+                              "time": time.perf_counter() - start}
+        with gp.read(model_path, env=env) as model:
+            result = solve_decomposed(model, iterations, verbose=False)
+            rows["decomposed"] = {"objective": result["objective"], "status": result["status"],
+                                  "gap": model.MIPGap if model.SolCount else None,
+                                  "time": result["total_time"], "fixed": result["fixed"],
+                                  "lagrangian_bound": result["lagrangian_bound"]}
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Décomposition lagrangienne d'un sac à dos multidimensionnel")
+    parser.add_argument("model", nargs="?", default="data/mkp.mps.bz2")
+    parser.add_argument("--gap", type=float, default=1e-3, help="Gap visé")
+    parser.add_argument("--time-limit", type=float, default=120)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, row in compare(args.model, args.gap, args.time_limit, args.iterations).items():
+        print(f"{name:>10}: {row}")
+
+
+if __name__ == "__main__":
+    main()
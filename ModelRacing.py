@@ -0,0 +1,234 @@
+# Course de configurations sur un même modèle MIP.
+# Le modèle est lu une seule fois par le processus principal puis réécrit au format MPS non
+# compressé dans un répertoire temporaire : chaque concurrent le relit sans décompression, dans
+# son propre processus, avec son propre Env, ses paramètres (MIPFocus, Heuristics, Cuts, Seed...)
+# et sa part des cœurs. Les concurrents partagent leurs solutions via une mémoire partagée : une
+# nouvelle meilleure solution y est publiée dans le callback MIPSOL et les autres la récupèrent
+# au MIPNODE suivant (cbSetSolution). Le premier qui atteint le gap visé, calculé avec la
+# meilleure solution partagée et sa propre borne, arrête tous les autres.
+import argparse
+import math
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+
+from SolverTelemetry import chain_callbacks
+from TerminationCriteria import TerminationPolicy
+
+DEFAULT_CONFIGS = [
+    {},
+    {"MIPFocus": 1},
+    {"MIPFocus": 2},
+    {"MIPFocus": 3},
+    {"Heuristics": 0.5},
+    {"Cuts": 2},
+    {"Cuts": 0, "Heuristics": 0.2},
+    {"Seed": 1},
+    {"Seed": 2},
+    {"MIPFocus": 1, "Seed": 3},
+]
+
+# État partagé de chaque processus concurrent (initialisé par _init_worker)
+_shared = None
+
+
+class SharedIncumbent:
+    """
+    Meilleure solution connue, partagée entre processus (valeurs, objectif, version, fin).
+    """
+
+    def __init__(self, context, num_vars, sense):
+        self.sense = sense
+        self.lock = context.Lock()
+        self.values = context.RawArray("d", num_vars)
+        self.objective = context.RawValue("d", math.inf * sense)
+        self.version = context.RawValue("l", 0)
+        self.winner = context.RawValue("i", -1)
+        self.done = context.Event()
+
+    def better(self, objective):
+        return (objective - self.objective.value) * self.sense < 0
+
+    def publish(self, objective, values):
+        with self.lock:
+            if not self.better(objective):
+                return False
+            np.frombuffer(self.values, dtype=np.float64)[:] = values
+            self.objective.value = objective
+            self.version.value += 1
+            return True
+
+    def read(self):
+        with self.lock:
+            return (self.version.value, self.objective.value,
+                    np.frombuffer(self.values, dtype=np.float64).copy())
+
+    def finish(self, worker):
+        with self.lock:
+            if self.winner.value < 0:
+                self.winner.value = worker
+        self.done.set()
+
+
+def _init_worker(shared):
+    global _shared
+    _shared = shared
+
+
+class RacingCallback:
+    """
+    Callback d'un concurrent : publication et récupération des solutions, arrêt de la course.
+    """
+    __slots__ = ("worker", "vars", "target_gap", "seen_version", "published", "injected",
+                 "reached_at")
+
+    def __init__(self, worker, variables, target_gap):
+        self.worker = worker
+        self.vars = variables
+        self.target_gap = target_gap
+        self.seen_version = 0
+        self.published = 0
+        self.injected = 0
+        self.reached_at = None
+
+    def __call__(self, model, where):
+        if where == GRB.Callback.MIPSOL:
+            objective = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+            if _shared.better(objective) and _shared.publish(objective, model.cbGetSolution(self.vars)):
+                self.published += 1
+                self.seen_version = _shared.version.value
+        elif where == GRB.Callback.MIPNODE:
+            if _shared.version.value == self.seen_version:
+                return
+            if model.cbGet(GRB.Callback.MIPNODE_STATUS) != GRB.OPTIMAL:
+                return
+            version, objective, values = _shared.read()
+            self.seen_version = version
+            if (objective - model.cbGet(GRB.Callback.MIPNODE_OBJBST)) * _shared.sense < 0:
+                model.cbSetSolution(self.vars, values)
+                model.cbUseSolution()
+                self.injected += 1
+        elif where == GRB.Callback.MIP:
+            if _shared.done.is_set():
+                model.terminate()
+                return
+            best = _shared.objective.value
+            if math.isinf(best):
+                return
+            bound = model.cbGet(GRB.Callback.MIP_OBJBND)
+            if abs(best - bound) <= self.target_gap * max(abs(best), 1e-10):
+                self.reached_at = model.cbGet(GRB.Callback.RUNTIME)
+                _shared.finish(self.worker)
+                model.terminate()
+
+
+def _race_one(worker, model_file, params, threads, target_gap, time_limit, criteria):
+    env_params = {"OutputFlag": 0, "Threads": threads, "MIPGap": target_gap}
+    if time_limit is not None:
+        env_params["TimeLimit"] = time_limit
+    start = time.perf_counter()
+    with gp.Env(params=env_params) as env, gp.read(model_file, env=env) as model:
+        for name, value in params.items():
+            model.setParam(name, value)
+        variables = model.getVars()
+
+        # Démarrage à chaud depuis la meilleure solution déjà publiée
+        version, objective, values = _shared.read()
+        if version > 0:
+            model.setAttr("Start", variables, values.tolist())
+
+        racing = RacingCallback(worker, variables, target_gap)
+        racing.seen_version = version
+        policy = TerminationPolicy(criteria) if criteria else None
+        model.optimize(chain_callbacks(racing, policy))
+
+        # Gap atteint sans passer par le callback (fin naturelle de la résolution)
+        if model.Status == GRB.OPTIMAL:
+            _shared.finish(worker)
+        return {
+            "worker": worker,
+            "params": params,
+            "status": model.Status,
+            "runtime": model.Runtime,
+            "wall_time": time.perf_counter() - start,
+            "objective": model.ObjVal if model.SolCount else None,
+            "bound": model.ObjBound if model.IsMIP else None,
+            "reached_target_at": racing.reached_at,
+            "published": racing.published,
+            "injected": racing.injected,
+            "stopped_by": policy.report()["criterion"] if policy else None,
+        }
+
+
+def race(model_path, configs=None, target_gap=1e-4, threads=None, time_limit=None, criteria=None,
+         workers=None):
+    """
+    Lance une course de configurations sur un modèle.
+
+    :param model_path: Fichier du modèle (MPS, LP, éventuellement compressé).
+    :param configs: Liste de dictionnaires de paramètres, un par concurrent.
+    :param target_gap: Gap visé ; le premier concurrent qui l'atteint arrête les autres.
+    :param threads: Threads par concurrent (par défaut les cœurs répartis entre concurrents).
+    :param time_limit: Limite de temps de chaque concurrent.
+    :param criteria: Critères d'arrêt (TerminationCriteria) ajoutés à chaque concurrent.
+    :param workers: Nombre de concurrents (par défaut autant que de configurations).
+    :return: Dictionnaire : gagnant, meilleur objectif, temps total et résultat de chaque concurrent.
+    """
+    configs = list(configs or DEFAULT_CONFIGS)
+    workers = workers or len(configs)
+    configs = configs[:workers]
+    threads = threads or max(1, (os.cpu_count() or 1) // len(configs))
+
+    start = time.perf_counter()
+    context = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Lecture unique du modèle, réécrit sans compression pour les concurrents
+        model_file = os.path.join(tmp, "model.mps")
+        with gp.Env(params={"OutputFlag": 0}) as env, gp.read(model_path, env=env) as model:
+            model.write(model_file)
+            shared = SharedIncumbent(context, model.NumVars, model.ModelSense)
+        read_time = time.perf_counter() - start
+
+        with ProcessPoolExecutor(max_workers=len(configs), mp_context=context,
+                                 initializer=_init_worker, initargs=(shared,)) as pool:
+            futures = [pool.submit(_race_one, worker, model_file, params, threads, target_gap,
+                                   time_limit, criteria)
+                       for worker, params in enumerate(configs)]
+            results = [future.result() for future in futures]
+
+    objective = shared.objective.value
+    return {
+        "winner": shared.winner.value if shared.winner.value >= 0 else None,
+        "objective": None if math.isinf(objective) else objective,
+        "read_time": read_time,
+        "wall_time": time.perf_counter() - start,
+        "threads_per_worker": threads,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Course de configurations sur un modèle MIP")
+    parser.add_argument("model", nargs="?", default="data/mkp.mps.bz2")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None, help="Threads par concurrent")
+    parser.add_argument("--gap", type=float, default=1e-4)
+    parser.add_argument("--time-limit", type=float, default=None)
+    args = parser.parse_args()
+
+    result = race(args.model, target_gap=args.gap, threads=args.threads,
+                  time_limit=args.time_limit, workers=args.workers)
+    for row in result["results"]:
+        print(row)
+    print(f"Gagnant : {result['winner']}, objectif {result['objective']}, "
+          f"{result['wall_time']:.2f}s ({result['threads_per_worker']} threads par concurrent)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,115 @@
 import json
-import pandas as pd
 import numpy as np
 import gurobipy as gp
 from gurobipy import GRB
 
-# Charger les données du fichier JSON
-with open("data/portfolio-example.json", "r") as f:
-    data = json.load(f)
+def load_portfolio_data(file_path="data/portfolio-example.json"):
+    # Charger les données du fichier JSON
+    with open(file_path, "r") as f:
+        data = json.load(f)
 
-# Extraire les données
-n = data["num_assets"]
-sigma = np.array(data["covariance"])
-mu = np.array(data["expected_return"])
-mu_0 = data["target_return"]
-k = data["portfolio_max_size"]
+    # Extraire les données
+    return {
+        "num_assets": data["num_assets"],
+        "covariance": np.array(data["covariance"]),
+        "expected_return": np.array(data["expected_return"]),
+        "target_return": data["target_return"],
+        "portfolio_max_size": data["portfolio_max_size"],
+    }
 
-# Créer le modèle Gurobi
-with gp.Model("portfolio") as model:
+def factor_model(sigma, rank):
+    """
+    Approche la covariance par un modèle à facteurs Sigma ~ B F B^T + D à partir des
+    ``rank`` plus grandes valeurs propres ; D reprend le résidu sur la diagonale.
+
+    :param sigma: Matrice de covariance (n x n).
+    :param rank: Nombre de facteurs k.
+    :return: Tuple (B de taille n x k, F diagonale de taille k, D diagonale de taille n).
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(sigma)
+    top = np.argsort(eigenvalues)[::-1][:rank]
+    loadings = eigenvectors[:, top]
+    factor_variance = np.clip(eigenvalues[top], 0, None)
+    residual = np.diag(sigma) - (loadings ** 2) @ factor_variance
+    return loadings, factor_variance, np.clip(residual, 0, None)
+
+def build_portfolio_model(sigma, mu, mu_0, k, env=None, factors=None):
+    """
+    Construit le modèle de portefeuille avec l'API matricielle.
+
+    :param sigma: Matrice de covariance (ignorée si ``factors`` est fourni).
+    :param mu: Rendements attendus.
+    :param mu_0: Rendement minimal visé.
+    :param k: Nombre maximal d'actifs dans le portefeuille.
+    :param env: Environnement Gurobi (None pour l'environnement par défaut).
+    :param factors: Tuple (B, F, D) du modèle à facteurs Sigma = B F B^T + D, où F est la
+        covariance des facteurs (k x k, ou sa diagonale) et D la diagonale du risque spécifique.
+        Le terme quadratique a alors O(n + k²) termes au lieu de O(n²).
+    :return: Tuple (model, x, y).
+    """
+    n = len(mu)
+    model = gp.Model("portfolio", env=env)
     # Variables continues pour les investissements
-    x = model.addVars(n, vtype=GRB.CONTINUOUS, name="x")
+    x = model.addMVar(n, vtype=GRB.CONTINUOUS, name="x")
     # Variables binaires pour indiquer si un actif est inclus
-    y = model.addVars(n, vtype=GRB.BINARY, name="y")
+    y = model.addMVar(n, vtype=GRB.BINARY, name="y")
 
     # Définir la fonction objectif : Minimiser le risque (variance du portefeuille)
-    risk = gp.quicksum(sigma[i, j] * x[i] * x[j] for i in range(n) for j in range(n))
+    if factors is None:
+        risk = x @ sigma @ x
+    else:
+        import scipy.sparse as sp  # seulement pour le modèle à facteurs
+        loadings, factor_cov, specific = factors
+        factor_cov = np.diag(factor_cov) if np.ndim(factor_cov) == 1 else factor_cov
+        # Expositions aux facteurs : f = B^T x (n * k coefficients dans les contraintes)
+        f = model.addMVar(loadings.shape[1], lb=-GRB.INFINITY, name="factor")
+        model.addConstr(loadings.T @ x - f == 0, name="factor_exposure")
+        risk = f @ factor_cov @ f + x @ sp.diags(specific) @ x
     model.setObjective(risk, GRB.MINIMIZE)
 
     # Contrainte : Retour attendu doit dépasser le seuil minimum
-    model.addConstr(gp.quicksum(mu[i] * x[i] for i in range(n)) >= mu_0, name="return")
+    model._return = model.addConstr(mu @ x >= mu_0, name="return")
 
     # Contrainte : La somme des investissements doit être égale à 1
-    model.addConstr(gp.quicksum(x[i] for i in range(n)) == 1, name="budget")
+    model.addConstr(x.sum() == 1, name="budget")
 
     # Contrainte : Limiter le nombre maximal d'actifs dans le portefeuille
-    model.addConstr(gp.quicksum(y[i] for i in range(n)) <= k, name="max_assets")
+    model._max_assets = model.addConstr(y.sum() <= k, name="max_assets")
 
     # Contrainte : L'investissement dans un actif est nul si l'actif n'est pas sélectionné
-    for i in range(n):
-        model.addConstr(x[i] <= y[i], name=f"select_{i}")
-
-    # Optimiser le modèle
-    model.optimize()
-
-    # Vérifier si une solution optimale a été trouvée
-    if model.status == GRB.OPTIMAL:
-        # Extraire les résultats
-        portfolio = [x[i].X for i in range(n)]
-        risk = model.ObjVal
-        expected_return = sum(mu[i] * portfolio[i] for i in range(n))
-
-        # Créer un DataFrame pour afficher les résultats
-        #df = pd.DataFrame(
-            #data=portfolio + [risk, expected_return],
-            #index=[f"asset_{i}" for i in range(n)] + ["risk", "return"],
-            #columns=["Portfolio"],
-        #)
-        #print(df)
-    else:
-        print("Aucune solution optimale n'a été trouvée.")
\ No newline at end of file
+    model.addConstr(x <= y, name="select")
+    return model, x, y
+
+def solve_portfolio(data, env=None, factor_rank=None, callback=None):
+    """
+    Construit et résout le modèle ; ``factor_rank`` active le modèle à facteurs et
+    ``callback`` est passé à l'optimisation (par exemple SolverTelemetry.TelemetryRecorder).
+
+    :return: Tuple (portefeuille, risque, rendement attendu) ou None.
+    """
+    sigma = data["covariance"]
+    mu = data["expected_return"]
+    factors = factor_model(sigma, factor_rank) if factor_rank else None
+
+    model, x, y = build_portfolio_model(sigma, mu, data["target_return"],
+                                        data["portfolio_max_size"], env, factors)
+    with model:
+        # Optimiser le modèle
+        model.optimize(callback)
+
+        # Vérifier si une solution optimale a été trouvée
+        if model.status == GRB.OPTIMAL:
+            # Extraire les résultats
+            portfolio = x.X
+            # Le risque est recalculé avec la vraie covariance (utile en mode facteurs)
+            risk = portfolio @ sigma @ portfolio
+            expected_return = mu @ portfolio
+            return portfolio, risk, expected_return
+        else:
+            print("Aucune solution optimale n'a été trouvée.")
+            return None
+
+if __name__ == "__main__":
+    # Les tableaux sont lus depuis un cache binaire projeté en mémoire (voir PortfolioData)
+    from PortfolioData import load_portfolio_cached
+    solve_portfolio(load_portfolio_cached())
@@ -0,0 +1,123 @@
+# Cache binaire des données de portefeuille.
+# Le JSON (data/portfolio-example.json) n'est analysé qu'une seule fois : la covariance et les
+# rendements sont enregistrés au format .npy puis, aux exécutions suivantes, projetés en mémoire
+# (np.load avec mmap_mode) sans copie. Une empreinte du contenu du JSON est conservée : si le
+# fichier change, le cache est reconstruit automatiquement.
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+ARRAYS = ("covariance", "expected_return")
+SCALARS = ("num_assets", "target_return", "portfolio_max_size")
+
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """
+    Empreinte BLAKE2b du contenu d'un fichier, lu par blocs.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_dir(json_path, cache_root):
+    stem = os.path.splitext(os.path.basename(json_path))[0]
+    root = cache_root or os.path.join(os.path.dirname(os.path.abspath(json_path)), ".cache")
+    return os.path.join(root, stem)
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "meta.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def replace_atomically(path, write, binary=False):
+    """
+    Écrit ``path`` via un fichier temporaire unique du même répertoire, renommé à la fin :
+    deux processus qui reconstruisent le même cache n'écrivent jamais dans le même fichier.
+
+    :param write: Fonction qui écrit le contenu dans le fichier ouvert.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def save_array(path, values):
+    """
+    Enregistre un tableau float64 contigu en .npy, de façon atomique.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    replace_atomically(path, lambda f: np.save(f, values), binary=True)
+
+
+def _write_meta(cache_dir, meta):
+    replace_atomically(os.path.join(cache_dir, "meta.json"), lambda f: json.dump(meta, f))
+
+
+def build_cache(json_path, cache_root=None, digest=None):
+    """
+    Analyse le JSON et écrit le cache (.npy pour les tableaux, meta.json pour le reste).
+    Les métadonnées sont écrites en dernier : un cache interrompu est simplement reconstruit.
+
+    :return: Répertoire du cache.
+    """
+    cache_dir = _cache_dir(json_path, cache_root)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Import différé : les chargements depuis le cache n'ont pas besoin de gurobipy
+    from Portfolio import load_portfolio_data
+    data = load_portfolio_data(json_path)
+    for name in ARRAYS:
+        save_array(os.path.join(cache_dir, f"{name}.npy"), data[name])
+
+    stat = os.stat(json_path)
+    meta = {name: data[name] for name in SCALARS}
+    meta.update(digest=digest or file_digest(json_path), size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    _write_meta(cache_dir, meta)
+    return cache_dir
+
+
+def load_portfolio_cached(json_path="data/portfolio-example.json", cache_root=None):
+    """
+    Charge les données du portefeuille depuis le cache, en le (re)construisant si besoin.
+
+    Si la taille et la date de modification du JSON n'ont pas changé, le cache est utilisé
+    directement ; sinon l'empreinte du contenu est recalculée et comparée à celle du cache.
+
+    :param json_path: Chemin du fichier JSON.
+    :param cache_root: Répertoire racine des caches (par défaut ``.cache`` à côté du JSON).
+    :return: Même dictionnaire que Portfolio.load_portfolio_data, tableaux projetés en mémoire.
+    """
+    cache_dir = _cache_dir(json_path, cache_root)
+    meta = _read_meta(cache_dir)
+    stat = os.stat(json_path)
+
+    if meta is None:
+        build_cache(json_path, cache_root)
+    elif meta["size"] != stat.st_size or meta["mtime_ns"] != stat.st_mtime_ns:
+        digest = file_digest(json_path)
+        if digest != meta["digest"]:
+            build_cache(json_path, cache_root, digest)
+        else:
+            # Contenu identique (fichier simplement touché) : mettre à jour la date
+            meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            _write_meta(cache_dir, meta)
+
+    meta = _read_meta(cache_dir)
+    data = {name: meta[name] for name in SCALARS}
+    for name in ARRAYS:
+        data[name] = np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode="r")
+    return data
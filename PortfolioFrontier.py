@@ -0,0 +1,125 @@
+# Calcul de la frontière efficiente du portefeuille sur une grille (rendement visé mu_0, taille k).
+# Le modèle est construit une seule fois par processus : entre deux résolutions, seuls le second
+# membre de la contrainte de rendement et la borne de cardinalité changent, et chaque point part
+# de la solution du point voisin (MIP start). La grille peut être répartie sur plusieurs processus.
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from GurobiEnv import shared_env
+from Portfolio import build_portfolio_model, factor_model
+from PortfolioData import load_portfolio_cached
+
+COLUMNS = ["target_return", "max_assets", "risk", "expected_return", "num_selected",
+           "selected", "runtime", "status"]
+
+
+def _grid_order(targets, sizes):
+    # Parcours en serpentin : deux points consécutifs sont toujours voisins dans la grille
+    order = []
+    for n, k in enumerate(sorted(sizes)):
+        row = sorted(targets) if n % 2 == 0 else sorted(targets, reverse=True)
+        order.extend((mu_0, k) for mu_0 in row)
+    return order
+
+
+def sweep(data, points, env_params=None, factor_rank=None):
+    """
+    Résout une suite de points (mu_0, k) sur un seul modèle.
+
+    :param data: Données du portefeuille (voir Portfolio.load_portfolio_data), ou chemin du
+        JSON dont le cache binaire est alors projeté en mémoire par ce processus.
+    :param points: Liste de tuples (rendement visé, nombre maximal d'actifs), de préférence
+        ordonnée pour que deux points consécutifs soient proches.
+    :param env_params: Paramètres de l'environnement Gurobi.
+    :param factor_rank: Active le modèle à facteurs avec ce nombre de facteurs.
+    :return: Liste de lignes (dictionnaires) de la frontière.
+    """
+    if isinstance(data, str):
+        data = load_portfolio_cached(data)
+    sigma = data["covariance"]
+    mu = data["expected_return"]
+    factors = factor_model(sigma, factor_rank) if factor_rank else None
+    params = {"OutputFlag": 0}
+    params.update(env_params or {})
+
+    rows = []
+    model, x, y = build_portfolio_model(sigma, mu, points[0][0], points[0][1], shared_env(params), factors)
+    with model:
+        for mu_0, k in points:
+            # Seuls les seconds membres changent d'un point à l'autre
+            model._return.RHS = mu_0
+            model._max_assets.RHS = k
+            model.optimize()
+
+            row = {"target_return": mu_0, "max_assets": k, "runtime": model.Runtime,
+                   "status": model.Status, "risk": np.nan, "expected_return": np.nan,
+                   "num_selected": 0, "selected": []}
+            if model.SolCount > 0:
+                portfolio = x.X
+                selected = np.flatnonzero(y.X > 0.5)
+                row.update(risk=float(portfolio @ sigma @ portfolio),
+                           expected_return=float(mu @ portfolio),
+                           num_selected=len(selected), selected=selected.tolist())
+                # Démarrage à chaud du point suivant depuis cette solution
+                x.Start = portfolio
+                y.Start = y.X
+            rows.append(row)
+    return rows
+
+
+def frontier(data, targets, sizes, workers=1, env_params=None, factor_rank=None):
+    """
+    Calcule la frontière efficiente sur la grille targets x sizes.
+
+    :param data: Données du portefeuille, ou chemin du JSON : chaque processus projette alors
+        le cache en mémoire au lieu de recevoir une copie des tableaux.
+    :param workers: Nombre de processus ; la grille (parcourue en serpentin) est découpée en
+        ``workers`` morceaux contigus, chacun résolu sur son propre modèle.
+    :return: DataFrame avec une ligne par point (risque, rendement, actifs, temps).
+    """
+    points = _grid_order(targets, sizes)
+    if workers <= 1:
+        rows = sweep(data, points, env_params, factor_rank)
+    else:
+        chunks = [list(chunk) for chunk in np.array_split(np.array(points, dtype=object), workers)
+                  if len(chunk)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(sweep, data, chunk, env_params, factor_rank) for chunk in chunks]
+            rows = [row for future in futures for row in future.result()]
+
+    import pandas as pd
+    table = pd.DataFrame(rows, columns=COLUMNS)
+    return table.sort_values(["max_assets", "target_return"], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frontière efficiente du portefeuille")
+    parser.add_argument("--data", default="data/portfolio-example.json")
+    parser.add_argument("--targets", type=int, default=20, help="Nombre de rendements visés")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="Valeurs de k (par défaut : portfolio_max_size)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--factors", type=int, default=None, help="Rang du modèle à facteurs")
+    parser.add_argument("--output", default=None, help="Fichier CSV de sortie")
+    args = parser.parse_args()
+
+    data = load_portfolio_cached(args.data)
+    mu = np.asarray(data["expected_return"])
+    # Des rendements du plus petit au plus grand atteignable
+    targets = np.linspace(mu.min(), mu.max(), args.targets).tolist()
+    sizes = args.sizes or [data["portfolio_max_size"]]
+
+    start = time.perf_counter()
+    table = frontier(args.data, targets, sizes, args.workers, factor_rank=args.factors)
+    elapsed = time.perf_counter() - start
+    print(table.drop(columns="selected").to_string(index=False))
+    print(f"{len(table)} points en {elapsed:.2f}s")
+    if args.output:
+        table.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,35 @@
-from itertools import combinations
-from gurobipy import Model, GRB, quicksum
+import argparse
+from gurobipy import Model, GRB, QuadExpr, quicksum
+from SlideCandidates import candidate_pairs, vertical_pairs
+from SlideshowIO import load_photos
+from SlideshowHeuristic import DEFAULT_TIME_LIMITS, solve_heuristic
+from TagEngine import build_engine, interest, interest_sized
 
 def load_data(filename):
-    with open(filename, "r") as f:
-        n_photos = int(f.readline().strip())
-        photos = []
-        for i in range(n_photos):
-            parts = f.readline().strip().split()
-            orientation = parts[0]
-            tags = set(parts[2:])
-            photos.append((i, orientation, tags))
-    return photos
-
-def interest_score(tags1, tags2):
-    common = len(tags1 & tags2)
-    only_in_first = len(tags1 - tags2)
-    only_in_second = len(tags2 - tags1)
-    return min(common, only_in_first, only_in_second)
-
-def create_model(photos):
+    # Streamed into compact arrays (orientation bytes + CSR tag ids), gzip/bz2 accepted
+    return load_photos(filename)
+
+def interest_score(mask1, mask2):
+    # Tags are packed bitsets (see TagEngine), so the score is three popcounts
+    return interest(mask1, mask2)
+
+def build_model(photos, top_k=None, vertical_k=None):
     model = Model("Photo Slideshow")
     model.setParam('OutputFlag', 0)  # Suppress output
 
+    # Intern tags once and keep each photo as a bitset
+    engine = build_engine(photos)
+
     # Separate horizontal and vertical photos
-    horizontal_photos = [p for p in photos if p[1] == 'H']
-    vertical_photos = [p for p in photos if p[1] == 'V']
+    horizontal_photos = [i for i, o in enumerate(engine.orientations) if o == 'H']
+    vertical_photos = [i for i, o in enumerate(engine.orientations) if o == 'V']
 
-    # Create all possible slides
+    # Create candidate slides
     slides = []
     # Horizontal slides
-    slides.extend([(p[0],) for p in horizontal_photos])
-    # Vertical photo pair slides
-    for v1, v2 in combinations(vertical_photos, 2):
-        if v1[0] != v2[0]:
-            slides.append((v1[0], v2[0]))
+    slides.extend([(p,) for p in horizontal_photos])
+    # Vertical photo pair slides (all pairs, or vertical_k partners per photo)
+    slides.extend(vertical_pairs(engine, vertical_photos, vertical_k))
 
     # Decision variables
     x = model.addVars(len(slides), vtype=GRB.BINARY, name="slide_selection")
@@ -52,30 +48,35 @@ def create_model(photos):
     # Compute total interest
     def compute_total_interest(selected_slide):
         total_interest = 0
+        masks, sizes = engine.slide_masks(selected_slide)
         for i in range(len(selected_slide) - 1):
-            tags1 = set().union(*(photos[p][2] for p in selected_slide[i]))
-            tags2 = set().union(*(photos[p][2] for p in selected_slide[i+1]))
-            total_interest += interest_score(tags1, tags2)
+            total_interest += interest_sized(masks[i], sizes[i], masks[i+1], sizes[i+1])
         return total_interest
 
     # Objective function: Maximize total interest
     def add_interest_constraints():
-        total_interest = 0
-        for i in range(len(slides)):
-            for j in range(i+1, len(slides)):
-                tags1 = set().union(*(photos[p][2] for p in slides[i]))
-                tags2 = set().union(*(photos[p][2] for p in slides[j]))
-                score = interest_score(tags1, tags2)
-                # Big-M method to capture pairwise interest
-                M = 1000  # Large constant
-                total_interest += score * x[i] * x[j]
+        # Only slide pairs sharing a tag can score, found through the tag -> slides index
+        masks, sizes = engine.slide_masks(slides)
+        pairs, stats = candidate_pairs(masks, sizes, top_k=top_k)
+        print(f"Candidate pairs: {stats['num_pairs']} "
+              f"(slides: {stats['num_slides']}, index size: {stats['index_size']}, "
+              f"built in {stats['build_time']:.3f}s)")
+
+        total_interest = QuadExpr()
+        total_interest.addTerms([score for _, _, score in pairs],
+                                [x[i] for i, _, _ in pairs],
+                                [x[j] for _, j, _ in pairs])
         return total_interest
 
     # Set objective
     model.setObjective(add_interest_constraints(), GRB.MAXIMIZE)
+    return model, x, slides
+
+def create_model(photos, top_k=None, vertical_k=None, callback=None):
+    model, x, slides = build_model(photos, top_k, vertical_k)
 
     # Solve the model
-    model.optimize()
+    model.optimize(callback)
 
     # Afficher fonction objectif
     print(f"Objectif : {model.objVal}")
@@ -91,12 +92,26 @@ def write_output(selected_slides, output_file):
             f.write(" ".join(map(str, slide)) + "\n")
 
 def main():
-    #input_file = 'data/trivial.txt'
-    input_file = 'data/PetPics-20.txt'
-    output_file = 'slideshow.sol'
-    photos = load_data(input_file)
-    selected_slides = create_model(photos)
-    write_output(selected_slides, output_file)
+    parser = argparse.ArgumentParser(description="Photo slideshow solver")
+    #parser.add_argument("input_file", nargs="?", default='data/trivial.txt')
+    parser.add_argument("input_file", nargs="?", default='data/PetPics-20.txt')
+    parser.add_argument("output_file", nargs="?", default='slideshow.sol')
+    parser.add_argument("--mode", choices=["mip", "heuristic"], default="mip",
+                        help="mip: single quadratic model, heuristic: greedy + local search + window refinement")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="Time budget in seconds for each heuristic stage")
+    args = parser.parse_args()
+
+    photos = load_data(args.input_file)
+    if args.mode == "heuristic":
+        time_limits = None
+        if args.time_limit is not None:
+            time_limits = {stage: args.time_limit for stage in DEFAULT_TIME_LIMITS}
+        selected_slides, score = solve_heuristic(build_engine(photos), time_limits)
+        print(f"Objectif : {score}")
+    else:
+        selected_slides = create_model(photos)
+    write_output(selected_slides, args.output_file)
     print(f"Number of slides: {len(selected_slides)}")
     for slide in selected_slides:
         print(slide)
@@ -0,0 +1,127 @@
+# Génération de paires candidates pour le diaporama à partir d'un index inversé tag -> diapositives.
+# Deux diapositives sans tag commun ont un score d'intérêt nul : il est inutile de les coupler
+# dans le modèle. On ne garde donc que les paires qui partagent au moins un tag, éventuellement
+# limitées aux k meilleurs voisins de chaque diapositive.
+import heapq
+import time
+
+
+def mask_tags(mask):
+    """
+    Liste les identifiants de tags présents dans un bitset.
+
+    :param mask: Bitset de tags.
+    :return: Liste d'identifiants de tags.
+    """
+    tags = []
+    while mask:
+        low = mask & -mask
+        tags.append(low.bit_length() - 1)
+        mask ^= low
+    return tags
+
+
+def build_tag_index(masks):
+    """
+    Construit l'index inversé tag -> liste des diapositives portant ce tag.
+
+    :param masks: Bitsets des diapositives.
+    :return: Dictionnaire {identifiant de tag: liste d'indices de diapositives}.
+    """
+    index = {}
+    for i, mask in enumerate(masks):
+        for tag in mask_tags(mask):
+            index.setdefault(tag, []).append(i)
+    return index
+
+
+def vertical_pairs(engine, vertical_ids, k=None):
+    """
+    Génère les diapositives verticales candidates.
+
+    Sans limite, toutes les paires de photos verticales sont produites (comportement historique).
+    Avec ``k``, chaque photo est associée à ses ``k`` voisines dans l'ordre du nombre de tags,
+    parmi lesquelles on préfère celles qui recouvrent le moins ses propres tags.
+
+    :param engine: TagEngine contenant les photos.
+    :param vertical_ids: Identifiants des photos verticales.
+    :param k: Nombre maximal de partenaires par photo (None pour toutes les paires).
+    :return: Liste de tuples (v1, v2) avec v1 < v2.
+    """
+    if k is None:
+        return [(v1, v2) for n, v1 in enumerate(vertical_ids) for v2 in vertical_ids[n + 1:]]
+
+    masks = engine.photo_masks
+    order = sorted(vertical_ids, key=lambda v: engine.photo_sizes[v])
+    pairs = set()
+    window = 4 * k
+    for n, v1 in enumerate(order):
+        neighbours = order[max(0, n - window):n] + order[n + 1:n + 1 + window]
+        # Moins de tags communs = diapositive plus riche
+        best = heapq.nsmallest(k, neighbours, key=lambda v2: (masks[v1] & masks[v2]).bit_count())
+        for v2 in best:
+            pairs.add((min(v1, v2), max(v1, v2)))
+    return sorted(pairs)
+
+
+def candidate_pairs(masks, sizes, top_k=None, max_posting=None, time_limit=None):
+    """
+    Génère les paires de diapositives au score d'intérêt non nul.
+
+    :param masks: Bitsets des diapositives.
+    :param sizes: Nombre de tags de chaque diapositive.
+    :param top_k: Nombre maximal de voisins conservés par diapositive (None pour tous).
+    :param max_posting: Ignore les tags portés par plus de ``max_posting`` diapositives
+        (tags trop fréquents, peu discriminants). None pour tout garder.
+    :param time_limit: Temps maximal en secondes ; au-delà, les diapositives restantes ne
+        cherchent plus de voisins (elles gardent ceux trouvés depuis les diapositives traitées).
+    :return: Tuple (paires, statistiques) où paires est une liste de (i, j, score) avec i < j.
+    """
+    start = time.perf_counter()
+    index = build_tag_index(masks)
+    index_time = time.perf_counter() - start
+
+    pairs = {}
+    processed = len(masks)
+    for i, mask_i in enumerate(masks):
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            processed = i
+            break
+        # Diapositives partageant au moins un tag avec i, avec leur nombre de tags communs
+        common = {}
+        skipped = False
+        for tag in mask_tags(mask_i):
+            posting = index[tag]
+            if max_posting is not None and len(posting) > max_posting:
+                skipped = True
+                continue
+            for j in posting:
+                common[j] = common.get(j, 0) + 1
+        common.pop(i, None)
+
+        # Le nombre de tags communs suffit : pas besoin de refaire les popcounts,
+        # sauf si des tags trop fréquents ont été ignorés dans le comptage
+        size_i = sizes[i]
+        scored = []
+        for j, c in common.items():
+            if skipped:
+                c = (mask_i & masks[j]).bit_count()
+            score = min(c, size_i - c, sizes[j] - c)
+            if score:
+                scored.append((score, j))
+        if top_k is not None and len(scored) > top_k:
+            scored = heapq.nlargest(top_k, scored)
+
+        for score, j in scored:
+            pairs[(min(i, j), max(i, j))] = score
+
+    stats = {
+        "num_slides": len(masks),
+        "num_tags": len(index),
+        "index_size": sum(len(posting) for posting in index.values()),
+        "num_pairs": len(pairs),
+        "processed": processed,
+        "index_time": index_time,
+        "build_time": time.perf_counter() - start,
+    }
+    return [(i, j, score) for (i, j), score in pairs.items()], stats
@@ -0,0 +1,411 @@
+# Solveur heuristique du diaporama : appariement glouton des photos verticales, chaîne du plus
+# proche voisin, recherche locale (2-opt et Or-opt) avec calcul incrémental du score, puis
+# ré-optimisation exacte de fenêtres de la séquence avec de petits modèles Gurobi.
+# Contrairement au modèle de Projet.create_model, on optimise ici directement l'ordre des
+# diapositives, c'est-à-dire la somme des scores des transitions adjacentes.
+import time
+from itertools import permutations
+
+import gurobipy as gp
+from gurobipy import GRB
+
+from SlideCandidates import build_tag_index, candidate_pairs, mask_tags
+from TagEngine import interest_sized
+
+DEFAULT_TIME_LIMITS = {
+    "pairing": 10.0,  # Appariement des photos verticales
+    "chain": 60.0,  # Construction de la chaîne du plus proche voisin
+    "local_search": 60.0,  # 2-opt et Or-opt
+    "refine": 30.0,  # Ré-optimisation de fenêtres avec Gurobi
+}
+
+
+def pair_verticals(engine, vertical_ids, window=50, time_limit=None):
+    """
+    Associe les photos verticales deux à deux en cherchant peu de tags communs.
+
+    Les photos sont triées par nombre de tags décroissant ; chaque photo libre est associée,
+    parmi les ``window`` photos libres suivantes, à celle qui recouvre le moins ses tags.
+
+    :param engine: TagEngine contenant les photos.
+    :param vertical_ids: Identifiants des photos verticales.
+    :param window: Nombre de partenaires examinés par photo.
+    :param time_limit: Temps maximal en secondes ; au-delà, les photos restantes sont
+        associées dans l'ordre.
+    :return: Liste de tuples (v1, v2).
+    """
+    start = time.perf_counter()
+    masks = engine.photo_masks
+    order = sorted(vertical_ids, key=lambda v: engine.photo_sizes[v], reverse=True)
+    paired = bytearray(len(order))
+    pairs = []
+    for n, v1 in enumerate(order):
+        if paired[n]:
+            continue
+        paired[n] = 1
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            # Budget épuisé : associer les photos restantes dans l'ordre
+            rest = [v1] + [order[m] for m in range(n + 1, len(order)) if not paired[m]]
+            pairs.extend(zip(rest[0::2], rest[1::2]))
+            break
+
+        # Les ``window`` photos libres suivantes
+        candidates = []
+        m = n + 1
+        while m < len(order) and len(candidates) < window:
+            if not paired[m]:
+                candidates.append(m)
+            m += 1
+        if not candidates:
+            break
+        mask1 = masks[v1]
+        best = min(candidates, key=lambda m: (mask1 & masks[order[m]]).bit_count())
+        paired[best] = 1
+        pairs.append((v1, order[best]))
+    return pairs
+
+
+def nearest_neighbour_chain(masks, sizes, max_candidates=200, time_limit=None):
+    """
+    Construit une séquence en ajoutant à chaque étape la diapositive non utilisée qui donne
+    la meilleure transition, cherchée via l'index inversé tag -> diapositives.
+
+    :param masks: Bitsets des diapositives.
+    :param sizes: Nombre de tags de chaque diapositive.
+    :param max_candidates: Nombre maximal de diapositives examinées par étape.
+    :param time_limit: Temps maximal en secondes ; au-delà, les diapositives restantes sont
+        ajoutées dans l'ordre.
+    :return: Liste d'indices de diapositives (permutation).
+    """
+    start = time.perf_counter()
+    n = len(masks)
+    if n == 0:
+        return []
+    index = build_tag_index(masks)
+    used = bytearray(n)
+    next_free = 0  # Plus petit indice potentiellement libre, pour les cas sans voisin
+
+    order = [0]
+    used[0] = 1
+    current = 0
+    while len(order) < n:
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            order.extend(i for i in range(n) if not used[i])
+            break
+
+        best, best_score, examined = -1, -1, 0
+        mask_c, size_c = masks[current], sizes[current]
+        for tag in mask_tags(mask_c):
+            posting = index[tag]
+            # Retirer paresseusement les diapositives déjà utilisées
+            k = 0
+            while k < len(posting):
+                j = posting[k]
+                if used[j]:
+                    posting[k] = posting[-1]
+                    posting.pop()
+                    continue
+                k += 1
+                score = interest_sized(mask_c, size_c, masks[j], sizes[j])
+                if score > best_score:
+                    best, best_score = j, score
+                examined += 1
+                if examined >= max_candidates:
+                    break
+            if examined >= max_candidates:
+                break
+
+        if best < 0:
+            while used[next_free]:
+                next_free += 1
+            best = next_free
+        order.append(best)
+        used[best] = 1
+        current = best
+    return order
+
+
+def sequence_score(order, masks, sizes):
+    """
+    Score total d'une séquence (somme des transitions adjacentes).
+    """
+    return sum(
+        interest_sized(masks[a], sizes[a], masks[b], sizes[b])
+        for a, b in zip(order, order[1:])
+    )
+
+
+class LocalSearch:
+    """
+    Recherche locale 2-opt et Or-opt sur une séquence de diapositives.
+
+    Chaque mouvement est évalué par la variation du score des seules transitions modifiées
+    (deux pour 2-opt, trois pour Or-opt). Les mouvements candidats sont limités aux voisins
+    de chaque diapositive dans le graphe des paires candidates.
+    """
+
+    def __init__(self, order, masks, sizes, neighbours, max_segment=1000):
+        self.order = list(order)
+        self.masks = masks
+        self.sizes = sizes
+        self.neighbours = neighbours  # Diapositive -> liste de voisins candidats
+        self.max_segment = max_segment  # Longueur maximale d'un segment inversé ou déplacé
+        self.pos = [0] * len(order)
+        for p, slide in enumerate(self.order):
+            self.pos[slide] = p
+        self.score = sequence_score(self.order, masks, sizes)
+
+    def _s(self, a, b):
+        # Score d'une transition ; -1 désigne le bord de la séquence
+        if a < 0 or b < 0:
+            return 0
+        return interest_sized(self.masks[a], self.sizes[a], self.masks[b], self.sizes[b])
+
+    def _at(self, p):
+        return self.order[p] if 0 <= p < len(self.order) else -1
+
+    def _reverse(self, i, j):
+        # Inverser order[i..j] et mettre à jour les positions
+        order, pos = self.order, self.pos
+        order[i:j + 1] = order[i:j + 1][::-1]
+        for p in range(i, j + 1):
+            pos[order[p]] = p
+
+    def two_opt(self, deadline):
+        """
+        Applique les mouvements 2-opt améliorants jusqu'à stabilité ou jusqu'à ``deadline``.
+
+        :return: Nombre de mouvements appliqués.
+        """
+        moves = 0
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for i in range(1, len(self.order)):
+                if time.perf_counter() >= deadline:
+                    break
+                a, b = self._at(i - 1), self._at(i)
+                old_ab = self._s(a, b)
+                for c in self.neighbours[a]:
+                    j = self.pos[c]
+                    if j <= i or j - i > self.max_segment:
+                        continue
+                    d = self._at(j + 1)
+                    # Inverser order[i..j] : (a, b) et (c, d) deviennent (a, c) et (b, d)
+                    delta = self._s(a, c) + self._s(b, d) - old_ab - self._s(c, d)
+                    if delta > 0:
+                        self._reverse(i, j)
+                        self.score += delta
+                        moves += 1
+                        improved = True
+                        break
+        return moves
+
+    def or_opt(self, deadline, max_length=3):
+        """
+        Déplace des segments de 1 à ``max_length`` diapositives à côté d'un voisin candidat,
+        dans un sens ou dans l'autre, tant que cela améliore le score.
+
+        :return: Nombre de mouvements appliqués.
+        """
+        moves = 0
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for i in range(len(self.order)):
+                if time.perf_counter() >= deadline:
+                    break
+                for length in range(1, max_length + 1):
+                    if i + length > len(self.order):
+                        break
+                    if self._try_move(i, length):
+                        moves += 1
+                        improved = True
+                        break
+        return moves
+
+    def _try_move(self, i, length):
+        first, last = self.order[i], self.order[i + length - 1]
+        prev, nxt = self._at(i - 1), self._at(i + length)
+        removed = self._s(prev, first) + self._s(last, nxt) - self._s(prev, nxt)
+
+        for reverse in (False, True):
+            # Le segment est inséré juste après c, orienté pour que c touche son voisin
+            head, tail = (last, first) if reverse else (first, last)
+            for c in self.neighbours[head]:
+                p = self.pos[c]
+                if i - 1 <= p <= i + length - 1 or abs(p - i) > self.max_segment:
+                    continue
+                d = self._at(p + 1)
+                delta = self._s(c, head) + self._s(tail, d) - self._s(c, d) - removed
+                if delta > 0:
+                    self._move(i, length, p, reverse)
+                    self.score += delta
+                    return True
+        return False
+
+    def _move(self, i, length, p, reverse):
+        # Retirer order[i:i+length] puis l'insérer après la diapositive en position p
+        order, pos = self.order, self.pos
+        segment = order[i:i + length]
+        if reverse:
+            segment.reverse()
+        del order[i:i + length]
+        q = (p - length if p > i else p) + 1
+        order[q:q] = segment
+        for k in range(min(i, q), max(i + length, q + length)):
+            pos[order[k]] = k
+
+
+def refine_windows(order, masks, sizes, env, window=8, time_limit=None):
+    """
+    Ré-optimise exactement des fenêtres de ``window`` diapositives consécutives : leurs
+    extrémités extérieures sont fixées et un petit modèle Gurobi (chemin hamiltonien avec
+    contraintes MTZ) cherche le meilleur ordre interne.
+
+    :param order: Séquence à améliorer (modifiée sur place).
+    :param masks: Bitsets des diapositives.
+    :param sizes: Nombre de tags de chaque diapositive.
+    :param env: Environnement Gurobi réutilisé pour tous les sous-modèles.
+    :param window: Nombre de diapositives par fenêtre.
+    :param time_limit: Temps maximal en secondes.
+    :return: Gain total de score.
+    """
+    start = time.perf_counter()
+
+    def s(a, b):
+        if a < 0 or b < 0:
+            return 0
+        return interest_sized(masks[a], sizes[a], masks[b], sizes[b])
+
+    if len(order) < 2:
+        return 0
+    gain = 0
+    step = max(1, window // 2)
+    firsts = list(range(0, max(1, len(order) - window + 1), step))
+    # Dernière fenêtre calée sur la fin de la séquence : aucune diapositive n'est oubliée
+    if firsts[-1] != max(0, len(order) - window):
+        firsts.append(len(order) - window)
+    for first in firsts:
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            break
+        nodes = order[first:first + window]
+        prev = order[first - 1] if first > 0 else -1
+        nxt = order[first + window] if first + window < len(order) else -1
+        current = s(prev, nodes[0]) + sequence_score(nodes, masks, sizes) + s(nodes[-1], nxt)
+        best_nodes, best = _solve_window(nodes, prev, nxt, s, env)
+        if best > current:
+            order[first:first + window] = best_nodes
+            gain += best - current
+    return gain
+
+
+def _solve_window(nodes, prev, nxt, s, env):
+    def path_score(path):
+        return s(prev, path[0]) + sum(s(u, v) for u, v in zip(path, path[1:])) + s(path[-1], nxt)
+
+    n = len(nodes)
+    if n <= 3:
+        # Énumération directe pour les toutes petites fenêtres
+        best_nodes = list(max(permutations(nodes), key=path_score))
+        return best_nodes, path_score(best_nodes)
+
+    with gp.Model("window", env=env) as model:
+        # Nœud 0 : entrée de la fenêtre (après prev), nœud n+1 : sortie (avant nxt)
+        arcs = {}
+        for u in range(n):
+            arcs[0, u + 1] = s(prev, nodes[u])
+            arcs[u + 1, n + 1] = s(nodes[u], nxt)
+            for v in range(n):
+                if u != v:
+                    arcs[u + 1, v + 1] = s(nodes[u], nodes[v])
+        x = model.addVars(arcs.keys(), vtype=GRB.BINARY, obj=arcs, name="x")
+        rank = model.addVars(range(1, n + 1), lb=1, ub=n, name="rank")
+        model.ModelSense = GRB.MAXIMIZE
+
+        model.addConstr(x.sum(0, "*") == 1, name="enter")
+        model.addConstr(x.sum("*", n + 1) == 1, name="leave")
+        for u in range(1, n + 1):
+            model.addConstr(x.sum("*", u) == 1, name=f"in_{u}")
+            model.addConstr(x.sum(u, "*") == 1, name=f"out_{u}")
+        # Élimination des sous-tours (MTZ)
+        for (u, v) in arcs:
+            if u != 0 and v != n + 1:
+                model.addConstr(rank[u] - rank[v] + n * x[u, v] <= n - 1, name=f"mtz_{u}_{v}")
+
+        model.optimize()
+        if model.SolCount == 0:
+            return nodes, -1
+
+        succ = {u: v for (u, v) in arcs if x[u, v].X > 0.5}
+        result, u = [], succ[0]
+        while u != n + 1:
+            result.append(nodes[u - 1])
+            u = succ[u]
+        return result, round(model.ObjVal)
+
+
+def solve_heuristic(engine, time_limits=None, top_k=10, window=8, refine=True, verbose=True,
+                    max_posting=1000):
+    """
+    Chaîne complète : appariement des verticales, plus proche voisin, recherche locale,
+    puis ré-optimisation de fenêtres avec Gurobi.
+
+    :param engine: TagEngine contenant les photos.
+    :param time_limits: Temps maximal par étape (voir DEFAULT_TIME_LIMITS).
+    :param top_k: Nombre de voisins candidats par diapositive pour la recherche locale.
+    :param window: Taille des fenêtres ré-optimisées avec Gurobi.
+    :param refine: Active l'étape Gurobi.
+    :param verbose: Affiche le score et le temps de chaque étape.
+    :param max_posting: Les tags portés par plus de ``max_posting`` diapositives sont ignorés
+        pour chercher les voisins candidats (voir SlideCandidates.candidate_pairs).
+    :return: Tuple (liste ordonnée de diapositives, score).
+    """
+    limits = dict(DEFAULT_TIME_LIMITS)
+    if time_limits:
+        limits.update(time_limits)
+
+    def report(stage, score, start):
+        if verbose:
+            print(f"{stage:>13}: score = {score} ({time.perf_counter() - start:.2f}s)")
+
+    start = time.perf_counter()
+    horizontal = [i for i, o in enumerate(engine.orientations) if o == 'H']
+    vertical = [i for i, o in enumerate(engine.orientations) if o == 'V']
+    slides = [(h,) for h in horizontal]
+    slides.extend(pair_verticals(engine, vertical, time_limit=limits["pairing"]))
+    masks, sizes = engine.slide_masks(slides)
+    if verbose:
+        print(f"{'pairing':>13}: {len(slides)} slides ({time.perf_counter() - start:.2f}s)")
+
+    start = time.perf_counter()
+    order = nearest_neighbour_chain(masks, sizes, time_limit=limits["chain"])
+    report("chain", sequence_score(order, masks, sizes), start)
+
+    # Les voisins candidats font partie de l'étape de recherche locale et de son budget :
+    # au plus la moitié, le reste pour les mouvements
+    start = time.perf_counter()
+    deadline = start + limits["local_search"]
+    pairs, _ = candidate_pairs(masks, sizes, top_k=top_k, max_posting=max_posting,
+                               time_limit=limits["local_search"] / 2)
+    neighbours = [[] for _ in range(len(slides))]
+    for i, j, _ in pairs:
+        neighbours[i].append(j)
+        neighbours[j].append(i)
+    search = LocalSearch(order, masks, sizes, neighbours)
+    previous = -1
+    while search.score > previous and time.perf_counter() < deadline:
+        previous = search.score
+        search.two_opt(deadline)
+        search.or_opt(deadline)
+    order = search.order
+    report("local search", search.score, start)
+
+    score = search.score
+    if refine and limits["refine"] > 0:
+        start = time.perf_counter()
+        with gp.Env(params={"OutputFlag": 0}) as env:
+            score += refine_windows(order, masks, sizes, env, window=window, time_limit=limits["refine"])
+        report("refine", score, start)
+
+    return [slides[i] for i in order], score
@@ -0,0 +1,132 @@
+# Lecture en flux des fichiers du diaporama (photos et solutions), partagée par Projet.py et
+# VerifSol.py. Les fichiers sont lus ligne par ligne (jamais en entier en mémoire), les tags
+# sont convertis en identifiants entiers et les photos sont stockées dans des tableaux compacts :
+# orientation sur un octet, tags au format CSR (décalages + identifiants).
+# Les fichiers .gz, .bz2 et .xz sont décompressés à la volée.
+import bz2
+import gzip
+import lzma
+from array import array
+
+import numpy as np
+
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def open_text(file_path):
+    """
+    Ouvre un fichier texte, éventuellement compressé (d'après son extension).
+
+    :param file_path: Chemin du fichier.
+    :return: Fichier ouvert en lecture texte.
+    """
+    for suffix, opener in _OPENERS.items():
+        if str(file_path).endswith(suffix):
+            return opener(file_path, "rt")
+    return open(file_path, "r")
+
+
+class PhotoSet:
+    """
+    Photos stockées en tableaux compacts.
+
+    - ``orientation`` : tableau uint8 des codes ASCII 'H' / 'V' ;
+    - ``offsets`` : tableau int64 de taille n + 1, les tags de la photo i sont
+      ``tags[offsets[i]:offsets[i + 1]]`` ;
+    - ``tags`` : tableau int32 des identifiants de tags ;
+    - ``tag_ids`` : dictionnaire tag -> identifiant.
+    """
+
+    def __init__(self, orientation, offsets, tags, tag_ids):
+        self.orientation = orientation
+        self.offsets = offsets
+        self.tags = tags
+        self.tag_ids = tag_ids
+
+    def __len__(self):
+        return len(self.orientation)
+
+    @property
+    def num_tags(self):
+        return len(self.tag_ids)
+
+    def photo_tags(self, photo_id):
+        """
+        Identifiants des tags d'une photo (vue sur le tableau, sans copie).
+        """
+        return self.tags[self.offsets[photo_id]:self.offsets[photo_id + 1]]
+
+    def orientations(self):
+        """
+        Orientations sous forme de chaîne ('HVVH...'), indexable par identifiant de photo.
+        """
+        return self.orientation.tobytes().decode("ascii")
+
+
+def iter_photos(file_path, tag_ids=None):
+    """
+    Parcourt les photos d'un fichier d'entrée sans le charger en entier.
+
+    :param file_path: Chemin du fichier d'entrée (éventuellement compressé).
+    :param tag_ids: Dictionnaire tag -> identifiant à compléter (créé si None).
+    :return: Itérateur de tuples (id, orientation, liste d'identifiants de tags).
+    """
+    if tag_ids is None:
+        tag_ids = {}
+    with open_text(file_path) as f:
+        n_photos = int(f.readline())
+        for i in range(n_photos):
+            parts = f.readline().split()
+            ids = []
+            for tag in parts[2:]:
+                tag_id = tag_ids.get(tag)
+                if tag_id is None:
+                    tag_id = len(tag_ids)
+                    tag_ids[tag] = tag_id
+                ids.append(tag_id)
+            yield i, parts[0], ids
+
+
+def load_photos(file_path):
+    """
+    Charge toutes les photos d'un fichier dans un PhotoSet.
+
+    :param file_path: Chemin du fichier d'entrée (éventuellement compressé).
+    :return: PhotoSet.
+    """
+    tag_ids = {}
+    orientation = bytearray()
+    offsets = array("q", [0])
+    tags = array("i")
+    for _, o, ids in iter_photos(file_path, tag_ids):
+        orientation.append(ord(o))
+        tags.extend(ids)
+        offsets.append(len(tags))
+    return PhotoSet(
+        np.frombuffer(orientation, dtype=np.uint8),
+        np.frombuffer(offsets, dtype=np.int64),
+        np.frombuffer(tags, dtype=np.int32),
+        tag_ids,
+    )
+
+
+def iter_solution(file_path):
+    """
+    Parcourt les diapositives d'un fichier de solution.
+
+    :param file_path: Chemin du fichier de solution (éventuellement compressé).
+    :return: Itérateur de tuples d'identifiants de photos.
+    """
+    with open_text(file_path) as f:
+        num_slides = int(f.readline())
+        for _ in range(num_slides):
+            yield tuple(map(int, f.readline().split()))
+
+
+def read_solution(file_path):
+    """
+    Lit toutes les diapositives d'un fichier de solution.
+
+    :return: Liste de tuples d'identifiants de photos.
+    """
+    return list(iter_solution(file_path))
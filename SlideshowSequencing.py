@@ -0,0 +1,213 @@
+# Formulation du diaporama qui tient compte de l'ordre des diapositives.
+# Le modèle de Projet.py additionne l'intérêt de toutes les paires de diapositives choisies,
+# alors que VerifSol.py ne compte que les transitions adjacentes. Ici on choisit un chemin :
+# une variable d'arc par transition candidate (i -> j), des contraintes de degré et une
+# élimination paresseuse des sous-tours dans un callback. Le modèle est construit avec
+# addMVar et des matrices creuses SciPy, sans quicksum terme à terme.
+import time
+
+import numpy as np
+import scipy.sparse as sp
+import gurobipy as gp
+from gurobipy import GRB
+
+from Projet import build_model, load_data
+from SlideCandidates import candidate_pairs, vertical_pairs
+from SolverTelemetry import chain_callbacks
+from TagEngine import build_engine, interest_sized
+
+
+def build_sequencing_model(engine, env=None, top_k=None, vertical_k=None):
+    """
+    Construit le modèle de chemin sur les arcs candidats.
+
+    Un nœud « dépôt » (indice ``n``) ouvre et ferme le chemin : il a exactement un arc sortant
+    et un arc entrant. Chaque diapositive choisie (z = 1) a un arc entrant et un arc sortant.
+
+    :param engine: TagEngine contenant les photos.
+    :param env: Environnement Gurobi (None pour l'environnement par défaut).
+    :param top_k: Nombre maximal de voisins candidats par diapositive.
+    :param vertical_k: Nombre maximal de partenaires par photo verticale.
+    :return: Tuple (model, slides, arcs) où arcs est un tableau (nb_arcs, 2) d'extrémités.
+    """
+    horizontal = [i for i, o in enumerate(engine.orientations) if o == 'H']
+    vertical = [i for i, o in enumerate(engine.orientations) if o == 'V']
+    slides = [(h,) for h in horizontal] + vertical_pairs(engine, vertical, vertical_k)
+    n = len(slides)
+    masks, sizes = engine.slide_masks(slides)
+
+    # Arcs candidats dans les deux sens, plus les arcs depuis et vers le dépôt (score nul)
+    pairs, _ = candidate_pairs(masks, sizes, top_k=top_k)
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 3)
+    depot = np.full(n, n, dtype=np.int64)
+    nodes = np.arange(n, dtype=np.int64)
+    tail = np.concatenate([pairs[:, 0], pairs[:, 1], depot, nodes])
+    head = np.concatenate([pairs[:, 1], pairs[:, 0], nodes, depot])
+    score = np.concatenate([pairs[:, 2], pairs[:, 2], np.zeros(2 * n, dtype=np.int64)])
+    num_arcs = len(tail)
+
+    model = gp.Model("Slideshow Sequencing", env=env)
+    x = model.addMVar(num_arcs, vtype=GRB.BINARY, obj=score, name="arc")
+    z = model.addMVar(n, vtype=GRB.BINARY, name="slide")
+    model.ModelSense = GRB.MAXIMIZE
+
+    # Matrices d'incidence (nœud x arc) : une ligne par nœud, dépôt compris
+    columns = np.arange(num_arcs)
+    ones = np.ones(num_arcs)
+    out_matrix = sp.csr_matrix((ones, (tail, columns)), shape=(n + 1, num_arcs))
+    in_matrix = sp.csr_matrix((ones, (head, columns)), shape=(n + 1, num_arcs))
+    # Sélection des nœuds : z pour les diapositives, 1 pour le dépôt
+    node_matrix = sp.vstack([sp.identity(n, format="csr"), sp.csr_matrix((1, n))], format="csr")
+    depot_rhs = np.zeros(n + 1)
+    depot_rhs[n] = 1.0
+
+    model.addConstr(out_matrix @ x - node_matrix @ z == depot_rhs, name="out_degree")
+    model.addConstr(in_matrix @ x - node_matrix @ z == depot_rhs, name="in_degree")
+
+    # Chaque photo est utilisée au plus une fois
+    rows = [photo for slide in slides for photo in slide]
+    cols = [i for i, slide in enumerate(slides) for _ in slide]
+    usage = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(engine.num_photos, n))
+    model.addConstr(usage @ z <= 1, name="photo_usage")
+
+    model.Params.LazyConstraints = 1
+    model._x = x
+    model._arcs = np.column_stack([tail, head])
+    model._arc_index = {(int(u), int(v)): a for a, (u, v) in enumerate(model._arcs)}
+    model._depot = n
+    return model, slides, model._arcs
+
+
+def _successors(arcs, values):
+    # Successeur de chaque nœud dans une solution entière
+    chosen = arcs[values > 0.5]
+    return dict(zip(chosen[:, 0].tolist(), chosen[:, 1].tolist()))
+
+
+def subtour_callback(model, where):
+    """
+    Callback d'élimination des sous-tours : pour chaque cycle qui ne passe pas par le dépôt,
+    ajoute la coupe paresseuse sum(x[arcs internes]) <= |S| - 1.
+    """
+    if where != GRB.Callback.MIPSOL:
+        return
+    succ = _successors(model._arcs, model.cbGetSolution(model._x))
+
+    # Retirer le chemin principal, qui part du dépôt
+    node = succ.pop(model._depot, None)
+    while node is not None and node != model._depot:
+        node = succ.pop(node, None)
+
+    # Les arcs restants forment des cycles
+    while succ:
+        start, node = next(iter(succ.items()))
+        cycle = [start]
+        succ.pop(start)
+        while node != start:
+            cycle.append(node)
+            node = succ.pop(node)
+        inner = [model._arc_index[u, v] for u in cycle for v in cycle if (u, v) in model._arc_index]
+        model.cbLazy(model._x[inner].sum() <= len(cycle) - 1)
+
+
+def extract_sequence(model, slides):
+    """
+    Reconstruit l'ordre des diapositives à partir des arcs choisis.
+
+    :return: Liste ordonnée de diapositives.
+    """
+    succ = _successors(model._arcs, model._x.X)
+    sequence = []
+    node = succ[model._depot]
+    while node != model._depot:
+        sequence.append(slides[node])
+        node = succ[node]
+    return sequence
+
+
+def solve_sequencing(engine, env=None, top_k=None, vertical_k=None, time_limit=None, callback=None):
+    """
+    Construit et résout le modèle de chemin.
+    ``callback`` est appelé en plus du callback des sous-tours (suivi de la progression...).
+
+    :return: Tuple (séquence de diapositives, score).
+    """
+    model, slides, _ = build_sequencing_model(engine, env, top_k, vertical_k)
+    with model:
+        if time_limit is not None:
+            model.Params.TimeLimit = time_limit
+        model.optimize(chain_callbacks(subtour_callback, callback))
+        if model.SolCount == 0:
+            return [], 0
+        return extract_sequence(model, slides), round(model.ObjVal)
+
+
+def sequence_score(engine, sequence):
+    """
+    Score d'une séquence tel que le calcule VerifSol.py (transitions adjacentes).
+    """
+    masks, sizes = engine.slide_masks(sequence)
+    return sum(interest_sized(masks[i], sizes[i], masks[i + 1], sizes[i + 1])
+               for i in range(len(sequence) - 1))
+
+
+def compare_builders(photos, top_k=None, vertical_k=None, time_limit=60):
+    """
+    Compare le modèle quadratique de Projet.py et le modèle de chemin : temps de construction,
+    taille du modèle et score obtenu au sens de VerifSol.py.
+
+    :param photos: Photos telles que renvoyées par ``Projet.load_data``.
+    :return: Dictionnaire {nom du modèle: statistiques}.
+    """
+    engine = build_engine(photos)
+    results = {}
+
+    start = time.perf_counter()
+    model, x, slides = build_model(photos, top_k, vertical_k)
+    model.update()
+    build_time = time.perf_counter() - start
+    with model:
+        model.Params.TimeLimit = time_limit
+        start = time.perf_counter()
+        model.optimize()
+        solve_time = time.perf_counter() - start
+        # Le modèle quadratique ne fixe pas d'ordre : on garde l'ordre des indices
+        selected = [slides[i] for i in range(len(slides)) if x[i].X > 0.5] if model.SolCount else []
+        results["pairwise"] = _model_stats(model, build_time, solve_time, sequence_score(engine, selected))
+
+    start = time.perf_counter()
+    model, slides, _ = build_sequencing_model(engine, None, top_k, vertical_k)
+    model.update()
+    build_time = time.perf_counter() - start
+    with model:
+        model.Params.OutputFlag = 0
+        model.Params.TimeLimit = time_limit
+        start = time.perf_counter()
+        model.optimize(subtour_callback)
+        solve_time = time.perf_counter() - start
+        sequence = extract_sequence(model, slides) if model.SolCount else []
+        results["sequencing"] = _model_stats(model, build_time, solve_time, sequence_score(engine, sequence))
+
+    for name, stats in results.items():
+        print(f"{name:>10}: build {stats['build_time']:.3f}s, solve {stats['solve_time']:.3f}s, "
+              f"vars {stats['num_vars']}, constrs {stats['num_constrs']}, "
+              f"nnz {stats['num_nz']}, qnnz {stats['num_qnz']}, score {stats['score']}")
+    return results
+
+
+def _model_stats(model, build_time, solve_time, score):
+    return {
+        "build_time": build_time,
+        "solve_time": solve_time,
+        "num_vars": model.NumVars,
+        "num_constrs": model.NumConstrs,
+        "num_nz": model.NumNZs,
+        "num_qnz": model.NumQNZs,
+        "score": score,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    compare_builders(load_data(sys.argv[1] if len(sys.argv) > 1 else "data/PetPics-20.txt"))
@@ -0,0 +1,245 @@
+# Cache des solutions indexé par une empreinte canonique du modèle.
+# L'empreinte porte sur ce qui détermine la solution : matrice des contraintes, seconds membres
+# et sens, objectif (linéaire et quadratique), bornes, types des variables et paramètres de
+# tolérance ; les noms sont ignorés. Pour les modèles avec contraintes quadratiques ou générales,
+# l'empreinte est celle de l'export MPS. Une seconde empreinte, de structure (dimensions, motif
+# de la matrice, types, sens), repère les modèles presque identiques : leur solution en cache
+# sert alors de MIP start. Chaque entrée est un fichier .npz (vecteur solution, objectif,
+# statut) ; un index JSON garde tailles et dates d'accès pour l'éviction LRU sous une taille
+# maximale.
+#
+#     cache = SolutionCache(".cache/solutions", max_bytes=100 << 20)
+#     result = cache.optimize(model)   # result["cache"] : "hit", "warm" ou "miss"
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+
+from PortfolioData import replace_atomically
+
+# Paramètres qui changent la solution renvoyée (ou son statut)
+RELEVANT_PARAMS = ("MIPGap", "MIPGapAbs", "FeasibilityTol", "IntFeasTol", "OptimalityTol",
+                   "TimeLimit", "NonConvex", "ObjScale")
+
+
+def _update(digest, *arrays):
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+
+
+def _mps_digest(model):
+    # Export MPS d'une copie dont variables et contraintes sont renommées dans l'ordre :
+    # l'empreinte ne dépend pas des noms d'origine
+    with model.copy() as copy, tempfile.TemporaryDirectory() as tmp:
+        copy.ModelName = "model"
+        for attr, items, prefix in (("VarName", copy.getVars(), "x"),
+                                    ("ConstrName", copy.getConstrs(), "c"),
+                                    ("QCName", copy.getQConstrs(), "q"),
+                                    ("GenConstrName", copy.getGenConstrs(), "g")):
+            if items:
+                copy.setAttr(attr, items, [f"{prefix}{i}" for i in range(len(items))])
+        path = os.path.join(tmp, "model.mps")
+        copy.write(path)
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def model_fingerprint(model, params=RELEVANT_PARAMS):
+    """
+    Empreintes du modèle.
+
+    :return: Tuple (empreinte exacte, empreinte de structure) en hexadécimal.
+    """
+    model.update()
+    variables, constraints = model.getVars(), model.getConstrs()
+    matrix = model.getA().tocsr()
+    matrix.sort_indices()
+    vtypes = np.frombuffer("".join(model.getAttr("VType", variables)).encode(), dtype=np.uint8)
+    senses = np.frombuffer("".join(model.getAttr("Sense", constraints)).encode(), dtype=np.uint8)
+
+    structure = hashlib.blake2b(digest_size=16)
+    _update(structure, np.array(matrix.shape), matrix.indptr, matrix.indices, vtypes, senses,
+            np.array([model.ModelSense, model.NumQConstrs, model.NumGenConstrs, model.NumSOS]))
+
+    exact = structure.copy()
+    _update(exact, matrix.data,
+            np.array(model.getAttr("RHS", constraints)),
+            np.array(model.getAttr("Obj", variables)),
+            np.array(model.getAttr("LB", variables)),
+            np.array(model.getAttr("UB", variables)),
+            np.array([model.ObjCon]))
+    if model.NumQConstrs or model.NumGenConstrs or model.NumSOS:
+        exact.update(_mps_digest(model).encode())
+    elif model.IsQP:
+        q = model.getQ().tocsr()
+        q.sort_indices()
+        _update(exact, q.indptr, q.indices, q.data)
+    exact.update(json.dumps([model.getParamInfo(name)[2] for name in params]).encode())
+    return exact.hexdigest(), structure.hexdigest()
+
+
+class SolutionCache:
+    """
+    Cache disque des solutions.
+
+    :param cache_dir: Répertoire du cache.
+    :param max_bytes: Taille maximale des entrées ; les moins récemment utilisées sont supprimées.
+    """
+
+    def __init__(self, cache_dir=".cache/solutions", max_bytes=256 << 20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, "index.json")
+        try:
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+        self.stats = {"hits": 0, "warm_starts": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _save_index(self):
+        replace_atomically(self.index_path, lambda f: json.dump(self.index, f))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _touch(self, key):
+        self.index[key]["accessed"] = time.time()
+
+    def load(self, key):
+        """
+        Entrée du cache (dictionnaire x, objective, status) ou None.
+        """
+        if key not in self.index:
+            return None
+        try:
+            with np.load(self._path(key)) as entry:
+                result = {"x": entry["x"], "objective": float(entry["objective"]),
+                          "status": int(entry["status"])}
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Fichier supprimé ou corrompu : l'entrée est oubliée
+            del self.index[key]
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            return None
+        self._touch(key)
+        return result
+
+    def store(self, key, structure, x, objective, status):
+        """
+        Enregistre une solution puis applique la limite de taille.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        replace_atomically(self._path(key), lambda f: np.savez(f, x=x, objective=objective, status=status),
+                           binary=True)
+        self.index[key] = {"structure": structure, "bytes": os.path.getsize(self._path(key)),
+                           "status": status, "accessed": time.time()}
+        self.stats["stores"] += 1
+        self._evict()
+        self._save_index()
+
+    def _evict(self):
+        total = sum(entry["bytes"] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.index.pop(key)["bytes"]
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self.stats["evictions"] += 1
+
+    def _similar(self, structure):
+        # Entrée la plus récente de même structure
+        keys = [k for k, entry in self.index.items() if entry["structure"] == structure]
+        return max(keys, key=lambda k: self.index[k]["accessed"]) if keys else None
+
+    def optimize(self, model, callback=None):
+        """
+        Résout ``model`` sauf si une solution optimale du même modèle est en cache.
+
+        En cas de "hit", le modèle n'est pas résolu : ``model.X`` et les autres attributs de
+        solution ne sont pas disponibles, la solution est à lire dans ``result["x"]``.
+
+        :return: Dictionnaire : cache ("hit", "warm" ou "miss"), objectif, statut, solution x
+            (dans l'ordre de model.getVars()) et temps de calcul de l'empreinte.
+        """
+        start = time.perf_counter()
+        key, structure = model_fingerprint(model)
+        result = {"fingerprint_time": time.perf_counter() - start}
+
+        entry = self.load(key)
+        if entry is not None and entry["status"] == GRB.OPTIMAL:
+            self.stats["hits"] += 1
+            self._save_index()
+            return {**result, "cache": "hit", "runtime": 0.0, **entry}
+
+        variables = model.getVars()
+        similar = entry if entry is not None else self.load(self._similar(structure) or "")
+        if similar is not None and model.IsMIP:
+            # Modèle identique non résolu à l'optimum, ou de même structure : MIP start
+            model.setAttr("Start", variables, similar["x"].tolist())
+            self.stats["warm_starts"] += 1
+            result["cache"] = "warm"
+        else:
+            self.stats["misses"] += 1
+            result["cache"] = "miss"
+
+        model.optimize(callback)
+        result.update(objective=model.ObjVal if model.SolCount else None, status=model.Status,
+                      runtime=model.Runtime, x=None)
+        if model.SolCount:
+            result["x"] = np.array(model.getAttr("X", variables))
+            self.store(key, structure, result["x"], model.ObjVal, model.Status)
+        return result
+
+    def clear(self):
+        for key in list(self.index):
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+        self.index = {}
+        self._save_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résolution avec cache de solutions")
+    parser.add_argument("model", nargs="?", default=None,
+                        help="Fichier du modèle (par défaut un sac à dos généré)")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--cache-dir", default=".cache/solutions")
+    parser.add_argument("--max-mb", type=float, default=256)
+    args = parser.parse_args()
+
+    cache = SolutionCache(args.cache_dir, int(args.max_mb * (1 << 20)))
+    with gp.Env(params={"OutputFlag": 0}) as env:
+        for capacity_ratio in (0.7, 0.7, 0.69):
+            if args.model:
+                model = gp.read(args.model, env=env)
+            else:
+                from Knapsack import build_knapsack_model, generate_knapsack
+                model, _ = build_knapsack_model(*generate_knapsack(args.items, 0, capacity_ratio), env)
+            with model:
+                start = time.perf_counter()
+                result = cache.optimize(model)
+                print(f"{result['cache']:>5}  objectif {result['objective']}  "
+                      f"{time.perf_counter() - start:.4f}s (empreinte {result['fingerprint_time']:.4f}s)")
+    print(cache.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+# Service local de résolutions répétées.
+# Les modèles sont construits une seule fois et gardés dans un pool indexé par leur structure
+# (type de modèle et paramètres de construction). Une requête ne fait que modifier des données
+# du modèle existant (seconds membres, bornes, coefficients de l'objectif), en bloc sur des
+# MVar/MConstr, puis relance la résolution : Gurobi repart de la base précédente pour un modèle
+# continu, et la solution précédente est donnée comme MIP start pour un modèle en nombres
+# entiers. Le pool est limité en taille : le modèle utilisé le moins récemment est libéré.
+#
+#     service = SolveService(capacity=4)
+#     service.solve({"kind": "knapsack", "key": {"num_items": 1000, "seed": 0},
+#                    "rhs": {"capacity": [5000.0]}})
+import argparse
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from GurobiEnv import shared_env
+
+# Attributs modifiables par une requête : champ de la requête -> (attribut, famille)
+UPDATES = {
+    "rhs": ("RHS", "constraints"),
+    "lb": ("LB", "variables"),
+    "ub": ("UB", "variables"),
+    "obj": ("Obj", "variables"),
+}
+
+
+def build_knapsack(env, num_items, seed=0, capacity_ratio=0.7):
+    from Knapsack import build_knapsack_model, generate_knapsack
+    values, weights, capacity = generate_knapsack(num_items, seed, capacity_ratio)
+    model, x = build_knapsack_model(values, weights, capacity, env)
+    return model, {"x": x}, {"capacity": model.getConstrs()}
+
+
+def build_uc(env, num_units, num_periods, seed=0):
+    from UnitCommitmentBenchmark import synthetic_fleet, synthetic_series
+    from UnitCommitmentProblemMatrixAPI import build_uc_model
+    fleet = synthetic_fleet(num_units, seed)
+    load, solar = synthetic_series(num_periods, fleet, seed)
+    return build_uc_model(
+        env, fleet["a"], fleet["b"], fleet["c"], fleet["sup_cost"], fleet["sdn_cost"],
+        fleet["pmin"], fleet["pmax"], fleet["init_status"], load, solar,
+    )
+
+
+def build_portfolio(env, data_path, factor_rank=None):
+    from Portfolio import build_portfolio_model, factor_model
+    from PortfolioData import load_portfolio_cached
+    data = load_portfolio_cached(data_path)
+    sigma, mu = data["covariance"], data["expected_return"]
+    factors = factor_model(sigma, factor_rank) if factor_rank else None
+    model, x, y = build_portfolio_model(sigma, mu, data["target_return"],
+                                        data["portfolio_max_size"], env, factors)
+    return model, {"x": x, "y": y}, {"return": model._return, "max_assets": model._max_assets}
+
+
+BUILDERS = {"knapsack": build_knapsack, "uc": build_uc, "portfolio": build_portfolio}
+
+
+class ModelHandle:
+    """
+    Modèle du pool : le modèle, ses variables et contraintes nommées et la dernière solution.
+
+    Les valeurs de construction de chaque attribut modifié par une requête sont conservées :
+    un attribut modifié par une requête précédente et absent de la requête courante est remis
+    à sa valeur d'origine, pour que le résultat ne dépende pas des requêtes déjà traitées.
+    """
+    __slots__ = ("model", "variables", "constraints", "last_solution", "solves", "base", "dirty")
+
+    def __init__(self, model, variables, constraints):
+        self.model = model
+        self.variables = variables
+        self.constraints = constraints
+        self.last_solution = None
+        self.solves = 0
+        self.base = {}  # (attribut, famille, nom) -> valeurs à la construction
+        self.dirty = set()  # Attributs modifiés par la dernière requête
+
+    def _get(self, attr, family, name):
+        target = getattr(self, family)[name]
+        if isinstance(target, list):
+            return np.array(self.model.getAttr(attr, target))
+        return np.array(getattr(target, attr))
+
+    def _set(self, attr, family, name, values):
+        # Modifications en bloc : une affectation d'attribut par tableau
+        target = getattr(self, family)[name]
+        if isinstance(target, list):
+            self.model.setAttr(attr, target, np.broadcast_to(values, len(target)).tolist())
+        else:
+            setattr(target, attr, np.broadcast_to(np.asarray(values, dtype=float), target.shape))
+
+    def apply(self, request):
+        touched = set()
+        for field, (attr, family) in UPDATES.items():
+            for name, values in request.get(field, {}).items():
+                key = (attr, family, name)
+                if key not in self.base:
+                    self.base[key] = self._get(*key)
+                self._set(*key, values)
+                touched.add(key)
+        for key in self.dirty - touched:
+            self._set(*key, self.base[key])
+        self.dirty = touched
+
+    def warm_start(self):
+        # Le modèle continu repart seul de sa base ; un MIP reçoit la solution précédente
+        if self.model.IsMIP and self.last_solution is not None:
+            for name, values in self.last_solution.items():
+                _set_start(self.variables[name], values)
+
+    def solve(self, request, keep_solution=False):
+        self.apply(request)
+        self.warm_start()
+        self.model.optimize()
+        self.solves += 1
+        result = {"status": self.model.Status, "runtime": self.model.Runtime,
+                  "objective": self.model.ObjVal if self.model.SolCount else None}
+        if self.model.SolCount:
+            self.last_solution = {name: _values(var) for name, var in self.variables.items()}
+            if keep_solution:
+                result["solution"] = self.last_solution
+        return result
+
+
+def _values(variables):
+    if isinstance(variables, list):
+        return np.array([var.X for var in variables])
+    return variables.X
+
+
+def _set_start(variables, values):
+    if isinstance(variables, list):
+        for var, value in zip(variables, values):
+            var.Start = value
+    else:
+        variables.Start = values
+
+
+def _structure_key(request):
+    return request["kind"], tuple(sorted(request.get("key", {}).items()))
+
+
+class SolveService:
+    """
+    Pool de modèles construits une fois, modifiés et résolus à chaque requête.
+
+    :param capacity: Nombre maximal de modèles gardés en mémoire (LRU).
+    :param env_params: Paramètres de l'environnement partagé (voir GurobiEnv).
+    :param builders: Constructeurs par type : fonction (env, **key) -> (model, variables,
+        contraintes), variables et contraintes étant des dictionnaires nom -> MVar/MConstr.
+    """
+
+    def __init__(self, capacity=8, env_params=None, builders=None):
+        self.capacity = capacity
+        self.env = shared_env({"OutputFlag": 0, **(env_params or {})})
+        self.builders = dict(BUILDERS if builders is None else builders)
+        self.pool = OrderedDict()
+        self.stats = {"requests": 0, "builds": 0, "evictions": 0, "build_time": 0.0}
+
+    def handle(self, request):
+        """
+        Modèle du pool pour la structure de la requête, construit au premier besoin.
+        """
+        key = _structure_key(request)
+        handle = self.pool.get(key)
+        if handle is not None:
+            self.pool.move_to_end(key)
+            return handle
+
+        start = time.perf_counter()
+        model, variables, constraints = self.builders[request["kind"]](self.env, **request.get("key", {}))
+        model.update()
+        self.stats["build_time"] += time.perf_counter() - start
+        self.stats["builds"] += 1
+        handle = self.pool[key] = ModelHandle(model, variables, constraints)
+        while len(self.pool) > self.capacity:
+            _, evicted = self.pool.popitem(last=False)
+            evicted.model.dispose()
+            self.stats["evictions"] += 1
+        return handle
+
+    def solve(self, request, keep_solution=False):
+        """
+        Résout une requête : {"kind", "key", et éventuellement "rhs", "lb", "ub", "obj"},
+        chacun étant un dictionnaire nom -> tableau de valeurs.
+        """
+        self.stats["requests"] += 1
+        return self.handle(request).solve(request, keep_solution)
+
+    def solve_batch(self, requests, keep_solution=False):
+        """
+        Résout un lot de requêtes, regroupées par structure pour limiter les constructions et
+        les évictions. Les résultats sont renvoyés dans l'ordre des requêtes.
+        """
+        order = sorted(range(len(requests)), key=lambda i: str(_structure_key(requests[i])))
+        results = [None] * len(requests)
+        for i in order:
+            results[i] = self.solve(requests[i], keep_solution)
+        return results
+
+    def close(self):
+        for handle in self.pool.values():
+            handle.model.dispose()
+        self.pool.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def solve_rebuilding(requests, builders=None, env_params=None):
+    """
+    Référence : construit un nouveau modèle pour chaque requête.
+    """
+    builders = BUILDERS if builders is None else builders
+    env = shared_env({"OutputFlag": 0, **(env_params or {})})
+    results = []
+    for request in requests:
+        model, variables, constraints = builders[request["kind"]](env, **request.get("key", {}))
+        model.update()
+        with model:
+            results.append(ModelHandle(model, variables, constraints).solve(request))
+    return results
+
+
+def knapsack_requests(count, num_items=1000, seeds=1, seed=0):
+    """
+    Requêtes de test : capacités aléatoires sur ``seeds`` instances de sac à dos.
+    """
+    from Knapsack import generate_knapsack
+    rng = np.random.default_rng(seed)
+    totals = [generate_knapsack(num_items, s)[1].sum() for s in range(seeds)]
+    return [{"kind": "knapsack", "key": {"num_items": num_items, "seed": s},
+             "rhs": {"capacity": [rng.uniform(0.3, 0.8) * totals[s]]}}
+            for s in rng.integers(0, seeds, count)]
+
+
+def uc_requests(count, num_units=3, num_periods=8, seed=0):
+    """
+    Requêtes de test : prévisions de charge bruitées pour un même parc.
+    """
+    from UnitCommitmentBenchmark import synthetic_fleet, synthetic_series
+    rng = np.random.default_rng(seed)
+    fleet = synthetic_fleet(num_units, seed)
+    load, solar = synthetic_series(num_periods, fleet, seed)
+    return [{"kind": "uc", "key": {"num_units": num_units, "num_periods": num_periods},
+             "rhs": {"power_balance": (load - solar) * rng.uniform(0.9, 1.1, num_periods)}}
+            for _ in range(count)]
+
+
+def throughput(requests, capacity=8):
+    """
+    Résolutions par seconde avec le service et en reconstruisant chaque modèle.
+    """
+    start = time.perf_counter()
+    with SolveService(capacity) as service:
+        pooled = service.solve_batch(requests)
+        stats = dict(service.stats)
+    pooled_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rebuilt = solve_rebuilding(requests)
+    rebuilt_time = time.perf_counter() - start
+
+    same = all((a["objective"] is None) == (b["objective"] is None)
+               and (a["objective"] is None or abs(a["objective"] - b["objective"]) <= 1e-4 * max(1, abs(b["objective"])))
+               for a, b in zip(pooled, rebuilt))
+    return {
+        "requests": len(requests),
+        "service_per_second": len(requests) / pooled_time,
+        "rebuild_per_second": len(requests) / rebuilt_time,
+        "same_objectives": same,
+        **stats,
+    }
+
+
+def check_isolation(requests):
+    """
+    Vérifie que le résultat d'une requête ne dépend pas des requêtes traitées avant elle :
+    les requêtes sont résolues par le service dans l'ordre donné puis dans l'ordre inverse,
+    et comparées à une construction par requête.
+
+    :return: True si les objectifs sont identiques dans les trois cas.
+    """
+    def objectives(results):
+        return [None if r["objective"] is None else round(r["objective"], 6) for r in results]
+
+    reference = objectives(solve_rebuilding(requests))
+    with SolveService() as service:
+        forward = objectives([service.solve(request) for request in requests])
+    with SolveService() as service:
+        backward = objectives([service.solve(request) for request in requests[::-1]])[::-1]
+    return forward == reference and backward == reference
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit du service de résolution")
+    parser.add_argument("--kind", choices=["knapsack", "uc"], default="knapsack")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--size", type=int, default=1000, help="Objets (sac à dos) ou unités (UC)")
+    parser.add_argument("--periods", type=int, default=8)
+    parser.add_argument("--instances", type=int, default=4, help="Instances distinctes (sac à dos)")
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--check", action="store_true",
+                        help="Vérifie l'indépendance des requêtes au lieu de mesurer le débit")
+    args = parser.parse_args()
+
+    if args.check:
+        key = {"num_items": args.size}
+        print(check_isolation([{"kind": "knapsack", "key": key, "ub": {"x": 0}},
+                               {"kind": "knapsack", "key": key, "rhs": {"capacity": [3000.0]}},
+                               {"kind": "knapsack", "key": key, "obj": {"x": -1.0}}]))
+        return
+
+    if args.kind == "knapsack":
+        requests = knapsack_requests(args.requests, args.size, args.instances)
+    else:
+        requests = uc_requests(args.requests, args.size, args.periods)
+    print(throughput(requests, args.capacity))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# Suivi de la progression des résolutions MIP.
+# Le TelemetryRecorder est un callback Gurobi qui échantillonne (meilleure solution, borne,
+# nœuds, solutions, temps) dans un tampon circulaire numpy préalloué : un relevé au plus toutes
+# les ``interval`` secondes pendant le branch-and-bound, plus un relevé à chaque nouvelle
+# solution. Dès que la moitié du tampon attend, ces relevés sont copiés et confiés à un thread
+# qui les écrit (JSONL ou CSV) : le callback ne fait jamais d'entrée/sortie et la mémoire reste
+# bornée quelle que soit la durée de la résolution. Sans fichier, les relevés sont gardés en
+# mémoire. Plusieurs résolutions successives (fenêtres glissantes,
+# frontière...) sont distinguées par la colonne ``solve``.
+#
+#     with TelemetryRecorder("run.jsonl") as recorder:
+#         optimize(model, recorder)
+#     print(summarize(recorder.samples()))
+import argparse
+import csv
+import json
+import math
+import queue
+import threading
+
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+
+COLUMNS = ("solve", "event", "runtime", "objbst", "objbnd", "nodecnt", "solcnt")
+EVENT_SAMPLE, EVENT_SOLUTION, EVENT_FINAL = 0, 1, 2
+
+
+def chain_callbacks(*callbacks):
+    """
+    Callback qui appelle successivement les callbacks fournis (None ignorés).
+    """
+    callbacks = [callback for callback in callbacks if callback is not None]
+    if len(callbacks) <= 1:
+        return callbacks[0] if callbacks else None
+
+    def callback(model, where):
+        for cb in callbacks:
+            cb(model, where)
+    return callback
+
+
+class TelemetryRecorder:
+    """
+    Callback d'échantillonnage de la progression, écrit en arrière-plan.
+
+    :param path: Fichier de sortie (.jsonl ou .csv) ; None pour ne garder que la mémoire.
+    :param interval: Intervalle minimal (secondes) entre deux relevés pendant le MIP.
+    :param capacity: Nombre de lignes du tampon circulaire préalloué.
+    """
+    __slots__ = ("path", "interval", "buffer", "count", "flushed", "solve", "last_runtime",
+                 "last_sample", "blocks", "queue", "thread")
+
+    def __init__(self, path=None, interval=0.05, capacity=4096):
+        self.path = path
+        self.interval = interval
+        self.buffer = np.empty((max(2, capacity), len(COLUMNS)))
+        self.count = 0  # Relevés enregistrés depuis le début
+        self.flushed = 0  # Relevés déjà sortis du tampon (écrits ou gardés dans ``blocks``)
+        self.solve = 0
+        self.last_runtime = 0.0
+        self.last_sample = -math.inf
+        self.blocks = []  # Relevés sortis du tampon, uniquement sans fichier
+        self.queue = None
+        self.thread = None
+        if path is not None:
+            self.queue = queue.Queue()
+            self.thread = threading.Thread(target=self._write, daemon=True)
+            self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __call__(self, model, where):
+        if where == GRB.Callback.MIP:
+            runtime = model.cbGet(GRB.Callback.RUNTIME)
+            if runtime - self.last_sample < self.interval:
+                return
+            self.last_sample = runtime
+            self._push(EVENT_SAMPLE, runtime,
+                       model.cbGet(GRB.Callback.MIP_OBJBST), model.cbGet(GRB.Callback.MIP_OBJBND),
+                       model.cbGet(GRB.Callback.MIP_NODCNT), model.cbGet(GRB.Callback.MIP_SOLCNT))
+        elif where == GRB.Callback.MIPSOL:
+            # OBJBST et SOLCNT décrivent l'état avant la nouvelle solution : on l'y ajoute
+            objective = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+            incumbent = model.cbGet(GRB.Callback.MIPSOL_OBJBST)
+            better = min if model.ModelSense == GRB.MINIMIZE else max
+            self._push(EVENT_SOLUTION, model.cbGet(GRB.Callback.RUNTIME),
+                       better(objective, incumbent), model.cbGet(GRB.Callback.MIPSOL_OBJBND),
+                       model.cbGet(GRB.Callback.MIPSOL_NODCNT), model.cbGet(GRB.Callback.MIPSOL_SOLCNT) + 1)
+
+    def _push(self, event, runtime, objbst, objbnd, nodecnt, solcnt):
+        # Le temps repart de zéro à chaque résolution : nouvelle résolution
+        if runtime < self.last_runtime:
+            self.solve += 1
+            self.last_sample = -math.inf
+        self.last_runtime = runtime
+        self.buffer[self.count % len(self.buffer)] = (self.solve, event, runtime, objbst, objbnd,
+                                                      nodecnt, solcnt)
+        self.count += 1
+        if 2 * (self.count - self.flushed) >= len(self.buffer):
+            self.flush()
+
+    def record_final(self, model):
+        """
+        Ajoute l'état final de la résolution (à appeler après model.optimize).
+        """
+        if model.SolCount > 0:
+            objbst, objbnd = model.ObjVal, model.ObjBound
+        else:
+            objbst, objbnd = GRB.INFINITY * model.ModelSense, -GRB.INFINITY * model.ModelSense
+        self._push(EVENT_FINAL, model.Runtime, objbst, objbnd, model.NodeCount, model.SolCount)
+        # Les relevés suivants appartiennent à une nouvelle résolution
+        self.solve += 1
+        self.last_runtime = 0.0
+        self.last_sample = -math.inf
+
+    def flush(self):
+        """
+        Confie les relevés en attente au thread d'écriture (ou les garde en mémoire sans fichier).
+        """
+        if self.count == self.flushed:
+            return
+        block = self._pending()
+        self.flushed = self.count
+        if self.queue is not None:
+            self.queue.put(block)
+        else:
+            self.blocks.append(block)
+
+    def _pending(self):
+        # Copie, dans l'ordre, des relevés pas encore sortis du tampon circulaire
+        rows = np.arange(self.flushed, self.count) % len(self.buffer)
+        return self.buffer[rows]
+
+    def close(self):
+        """
+        Écrit les derniers relevés et attend la fin du thread d'écriture.
+        """
+        self.flush()
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def samples(self):
+        """
+        Tous les relevés, tableau (lignes x COLUMNS) ; avec un fichier, ils y sont relus.
+        """
+        blocks = list(self.blocks)
+        if self.path is not None:
+            if self.thread is not None:
+                self.queue.join()
+            blocks = [read_samples(self.path)]
+        blocks.append(self._pending())
+        return np.concatenate(blocks)
+
+    def _write(self):
+        # Thread d'écriture : un bloc par message, None pour terminer
+        with open(self.path, "w", newline="") as f:
+            if self.path.endswith(".csv"):
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                write = writer.writerows
+            else:
+                write = lambda rows: f.writelines(json.dumps(dict(zip(COLUMNS, row))) + "\n" for row in rows)
+            while (block := self.queue.get()) is not None:
+                write(block.tolist())
+                f.flush()
+                self.queue.task_done()
+            self.queue.task_done()
+
+
+def read_samples(path):
+    """
+    Relit un fichier écrit par TelemetryRecorder (.jsonl ou .csv).
+    """
+    with open(path, "r") as f:
+        if path.endswith(".csv"):
+            rows = [list(map(float, row)) for row in list(csv.reader(f))[1:]]
+        else:
+            rows = [[json.loads(line)[name] for name in COLUMNS] for line in f if line.strip()]
+    return np.array(rows).reshape(-1, len(COLUMNS))
+
+
+def _relative_gap(a, b):
+    if abs(a) >= GRB.INFINITY or abs(b) >= GRB.INFINITY:
+        return 1.0
+    scale = max(abs(a), abs(b))
+    return 0.0 if scale < 1e-10 else min(abs(a - b) / scale, 1.0)
+
+
+def summarize(samples, reference=None, gap_target=0.01):
+    """
+    Indicateurs d'une résolution (relevés d'une même valeur de ``solve``).
+
+    :param samples: Relevés (voir TelemetryRecorder.samples ou read_samples).
+    :param reference: Valeur de référence de l'objectif pour l'intégrale primale (par défaut
+        la meilleure solution finale).
+    :param gap_target: Gap visé pour ``time_to_gap``.
+    :return: Dictionnaire : temps jusqu'à la première solution, temps jusqu'au gap visé,
+        intégrale primale, gap final, nombre de relevés.
+    """
+    samples = np.asarray(samples, dtype=float).reshape(-1, len(COLUMNS))
+    if len(samples) == 0:
+        return {"samples": 0, "runtime": 0.0, "time_to_first_solution": None,
+                f"time_to_gap_{gap_target:g}": None, "primal_integral": None, "final_gap": None,
+                "objective": None}
+    samples = samples[np.argsort(samples[:, 2], kind="stable")]
+    runtime, objbst, objbnd, solcnt = samples[:, 2], samples[:, 3], samples[:, 4], samples[:, 6]
+    has_solution = solcnt > 0
+    final_obj = float(objbst[has_solution][-1]) if has_solution.any() else None
+    if reference is None:
+        reference = final_obj
+
+    first = np.flatnonzero(has_solution)
+    gaps = np.array([_relative_gap(best, bound) if ok else 1.0
+                     for best, bound, ok in zip(objbst, objbnd, has_solution)])
+    reached = np.flatnonzero(gaps <= gap_target)
+
+    # Intégrale primale : gap primal (1 sans solution) constant par morceaux entre deux relevés
+    primal = np.array([_relative_gap(best, reference) if ok and reference is not None else 1.0
+                       for best, ok in zip(objbst, has_solution)])
+    steps = np.diff(np.concatenate([[0.0], runtime]))
+    primal_before = np.concatenate([[1.0], primal[:-1]])
+
+    return {
+        "samples": len(samples),
+        "runtime": float(runtime[-1]) if len(runtime) else 0.0,
+        "time_to_first_solution": float(runtime[first[0]]) if len(first) else None,
+        f"time_to_gap_{gap_target:g}": float(runtime[reached[0]]) if len(reached) else None,
+        "primal_integral": float(steps @ primal_before),
+        "final_gap": float(gaps[-1]) if len(gaps) else None,
+        "objective": final_obj,
+    }
+
+
+def summarize_solves(samples, **kwargs):
+    """
+    Un résumé par résolution (colonne ``solve``).
+    """
+    samples = np.asarray(samples, dtype=float).reshape(-1, len(COLUMNS))
+    return [{"solve": int(solve), **summarize(samples[samples[:, 0] == solve], **kwargs)}
+            for solve in np.unique(samples[:, 0])]
+
+
+def optimize(model, recorder, callback=None):
+    """
+    Résout ``model`` en enregistrant la progression (``callback`` est appelé en plus).
+    """
+    model.optimize(chain_callbacks(recorder, callback))
+    recorder.record_final(model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résolution instrumentée d'un modèle")
+    parser.add_argument("model", help="Fichier du modèle (MPS, LP...)")
+    parser.add_argument("--output", default=None, help="Fichier des relevés (.jsonl ou .csv)")
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--time-limit", type=float, default=None)
+    args = parser.parse_args()
+
+    with gp.Env(params={"OutputFlag": 0}) as env, gp.read(args.model, env=env) as model:
+        if args.time_limit is not None:
+            model.Params.TimeLimit = args.time_limit
+        with TelemetryRecorder(args.output, args.interval) as recorder:
+            optimize(model, recorder)
+        for row in summarize_solves(recorder.samples()):
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
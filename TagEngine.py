@@ -0,0 +1,148 @@
+# Moteur de tags partagé entre le constructeur de modèle (Projet.py) et le vérificateur (VerifSol.py).
+# Chaque tag est converti une seule fois en identifiant entier, et chaque photo est stockée
+# sous forme de bitset (entier Python) : le score d'intérêt se calcule alors avec des popcounts,
+# sans créer d'ensembles temporaires.
+
+
+class TagEngine:
+    """
+    Interne les tags en identifiants entiers et représente chaque photo par un bitset.
+
+    Le bit ``k`` du masque d'une photo vaut 1 si la photo porte le tag d'identifiant ``k``.
+    Le masque d'une diapositive verticale est le OU des masques de ses deux photos.
+    """
+
+    def __init__(self):
+        self.tag_ids = {}  # tag -> identifiant entier
+        self.orientations = []  # 'H' ou 'V' pour chaque photo (chaîne si construit depuis un PhotoSet)
+        self.photo_masks = []  # Bitset des tags de chaque photo
+        self.photo_sizes = []  # Nombre de tags de chaque photo
+
+    def intern(self, tag):
+        """
+        Retourne l'identifiant entier d'un tag, en le créant s'il est nouveau.
+
+        :param tag: Tag sous forme de chaîne.
+        :return: Identifiant entier du tag.
+        """
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tag_ids)
+            self.tag_ids[tag] = tag_id
+        return tag_id
+
+    def add_photo(self, orientation, tags):
+        """
+        Ajoute une photo au moteur.
+
+        :param orientation: Orientation de la photo ('H' ou 'V').
+        :param tags: Itérable de tags (chaînes).
+        :return: Identifiant de la photo (son rang d'insertion).
+        """
+        mask = 0
+        for tag in tags:
+            mask |= 1 << self.intern(tag)
+        self.orientations.append(orientation)
+        self.photo_masks.append(mask)
+        self.photo_sizes.append(mask.bit_count())
+        return len(self.photo_masks) - 1
+
+    @property
+    def num_photos(self):
+        return len(self.photo_masks)
+
+    @property
+    def num_tags(self):
+        return len(self.tag_ids)
+
+    def slide_mask(self, slide):
+        """
+        Calcule le bitset d'une diapositive (une photo H ou deux photos V).
+
+        :param slide: Tuple d'identifiants de photos.
+        :return: Bitset des tags de la diapositive.
+        """
+        if len(slide) == 1:
+            return self.photo_masks[slide[0]]
+        mask = 0
+        for photo_id in slide:
+            mask |= self.photo_masks[photo_id]
+        return mask
+
+    def slide_masks(self, slides):
+        """
+        Calcule les bitsets et les tailles d'une liste de diapositives.
+
+        :param slides: Liste de tuples d'identifiants de photos.
+        :return: Tuple (masques, tailles).
+        """
+        masks = [self.slide_mask(slide) for slide in slides]
+        return masks, [mask.bit_count() for mask in masks]
+
+    def score(self, slide1, slide2):
+        """
+        Score d'intérêt entre deux diapositives données par leurs identifiants de photos.
+        """
+        return interest(self.slide_mask(slide1), self.slide_mask(slide2))
+
+
+def interest(mask1, mask2):
+    """
+    Calcule min(communs, seulement dans 1, seulement dans 2) à partir de deux bitsets.
+
+    :param mask1: Bitset des tags de la première diapositive.
+    :param mask2: Bitset des tags de la seconde diapositive.
+    :return: Score d'intérêt.
+    """
+    common = (mask1 & mask2).bit_count()
+    return min(common, mask1.bit_count() - common, mask2.bit_count() - common)
+
+
+def interest_sized(mask1, size1, mask2, size2):
+    """
+    Variante de ``interest`` quand la taille des deux bitsets est déjà connue :
+    un seul popcount par paire.
+    """
+    common = (mask1 & mask2).bit_count()
+    return min(common, size1 - common, size2 - common)
+
+
+def build_engine(photos):
+    """
+    Construit un moteur à partir d'un PhotoSet (voir SlideshowIO), d'une liste de photos
+    (id, orientation, tags) ou de dictionnaires {'orientation': ..., 'tags': ...}.
+
+    :param photos: Photos.
+    :return: TagEngine.
+    """
+    if hasattr(photos, "offsets"):
+        return engine_from_photo_set(photos)
+    engine = TagEngine()
+    for photo in photos:
+        if isinstance(photo, dict):
+            engine.add_photo(photo['orientation'], photo['tags'])
+        else:
+            engine.add_photo(photo[1], photo[2])
+    return engine
+
+
+def engine_from_photo_set(photo_set):
+    """
+    Construit un moteur à partir des tableaux CSR d'un PhotoSet, sans repasser par les chaînes.
+
+    :param photo_set: PhotoSet chargé par SlideshowIO.load_photos.
+    :return: TagEngine.
+    """
+    engine = TagEngine()
+    engine.tag_ids = photo_set.tag_ids
+    engine.orientations = photo_set.orientations()
+    offsets = photo_set.offsets.tolist()
+    tags = photo_set.tags.tolist()
+    masks = engine.photo_masks
+    for start, end in zip(offsets, offsets[1:]):
+        mask = 0
+        for tag_id in tags[start:end]:
+            mask |= 1 << tag_id
+        masks.append(mask)
+    engine.photo_sizes = [mask.bit_count() for mask in masks]
+    return engine
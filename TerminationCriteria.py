@@ -0,0 +1,235 @@
+# Critères d'arrêt combinables pour les résolutions MIP.
+# Une TerminationPolicy est un callback Gurobi : elle lit l'état de la recherche au plus une fois
+# toutes les ``interval`` secondes (un seul cbGet du temps sinon), le transmet à chaque critère et
+# interrompt la résolution dès que l'un d'eux se déclenche. Le critère déclenché, l'instant et
+# l'état correspondant sont conservés dans ``policy.fired``.
+#
+#     policy = TerminationPolicy([GapStagnation(50, 1e-4), TimeBudget(600)])
+#     model.optimize(policy)
+#     print(policy.report(model))
+from gurobipy import GRB
+
+
+class MipState:
+    """
+    État de la recherche relevé dans le callback.
+    """
+    __slots__ = ("runtime", "objbst", "objbnd", "solcnt", "nodecnt", "gap")
+
+    def __init__(self, runtime, objbst, objbnd, solcnt, nodecnt):
+        self.runtime = runtime
+        self.objbst = objbst
+        self.objbnd = objbnd
+        self.solcnt = solcnt
+        self.nodecnt = nodecnt
+        if solcnt > 0 and abs(objbst) > 1e-10:
+            self.gap = abs(objbnd - objbst) / abs(objbst)
+        else:
+            self.gap = GRB.INFINITY
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Criterion:
+    """
+    Critère d'arrêt : ``check`` reçoit un MipState et renvoie True pour arrêter.
+    """
+    __slots__ = ()
+    name = "criterion"
+
+    def reset(self):
+        pass
+
+    def check(self, state):
+        raise NotImplementedError
+
+
+class GapStagnation(Criterion):
+    """
+    Arrêt si le gap n'a pas varié de plus de ``epsilon`` depuis ``patience`` secondes
+    (critère de CustomTerminationCriteria.py).
+    """
+    __slots__ = ("patience", "epsilon", "last_gap", "last_change")
+    name = "gap_stagnation"
+
+    def __init__(self, patience=50, epsilon=1e-4):
+        self.patience = patience
+        self.epsilon = epsilon
+        self.reset()
+
+    def reset(self):
+        self.last_gap = GRB.INFINITY
+        self.last_change = 0.0
+
+    def check(self, state):
+        if state.solcnt == 0:
+            return False
+        if self.last_gap == GRB.INFINITY or abs(self.last_gap - state.gap) > self.epsilon:
+            # Première solution ou changement significatif du gap
+            self.last_gap = state.gap
+            self.last_change = state.runtime
+            return False
+        return state.runtime - self.last_change > self.patience
+
+
+class ObjectiveImprovementRate(Criterion):
+    """
+    Arrêt si la meilleure solution s'est améliorée de moins de ``min_improvement`` (en relatif)
+    sur les ``window`` dernières secondes.
+    """
+    __slots__ = ("window", "min_improvement", "start_time", "start_obj")
+    name = "objective_improvement_rate"
+
+    def __init__(self, window=60, min_improvement=1e-3):
+        self.window = window
+        self.min_improvement = min_improvement
+        self.reset()
+
+    def reset(self):
+        self.start_time = None
+        self.start_obj = None
+
+    def check(self, state):
+        if state.solcnt == 0:
+            return False
+        if self.start_time is None:
+            self.start_time, self.start_obj = state.runtime, state.objbst
+            return False
+        if state.runtime - self.start_time < self.window:
+            return False
+        improvement = abs(state.objbst - self.start_obj) / max(abs(state.objbst), 1e-10)
+        if improvement < self.min_improvement:
+            return True
+        # Nouvelle fenêtre à partir de la solution courante
+        self.start_time, self.start_obj = state.runtime, state.objbst
+        return False
+
+
+class NodeThroughput(Criterion):
+    """
+    Arrêt si moins de ``min_rate`` nœuds par seconde ont été explorés sur les ``window``
+    dernières secondes, après ``warmup`` secondes (la racine peut être longue).
+    """
+    __slots__ = ("min_rate", "window", "warmup", "start_time", "start_nodes")
+    name = "node_throughput"
+
+    def __init__(self, min_rate=10.0, window=30, warmup=30):
+        self.min_rate = min_rate
+        self.window = window
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self):
+        self.start_time = None
+        self.start_nodes = 0.0
+
+    def check(self, state):
+        if state.runtime < self.warmup:
+            return False
+        if self.start_time is None:
+            self.start_time, self.start_nodes = state.runtime, state.nodecnt
+            return False
+        elapsed = state.runtime - self.start_time
+        if elapsed < self.window:
+            return False
+        if (state.nodecnt - self.start_nodes) / elapsed < self.min_rate:
+            return True
+        self.start_time, self.start_nodes = state.runtime, state.nodecnt
+        return False
+
+
+class TimeBudget(Criterion):
+    """
+    Arrêt après ``seconds`` secondes, éventuellement seulement une fois qu'une solution existe.
+    """
+    __slots__ = ("seconds", "require_solution")
+    name = "time_budget"
+
+    def __init__(self, seconds, require_solution=False):
+        self.seconds = seconds
+        self.require_solution = require_solution
+
+    def check(self, state):
+        if self.require_solution and state.solcnt == 0:
+            return False
+        return state.runtime >= self.seconds
+
+
+class TerminationPolicy:
+    """
+    Callback qui combine des critères d'arrêt (le premier déclenché arrête la résolution).
+
+    :param criteria: Liste de Criterion.
+    :param interval: Intervalle minimal (secondes) entre deux relevés complets de l'état.
+    :param verbose: Affiche le critère déclenché.
+    """
+    __slots__ = ("criteria", "interval", "verbose", "last_check", "checks", "fired")
+
+    def __init__(self, criteria, interval=0.1, verbose=False):
+        self.criteria = list(criteria)
+        self.interval = interval
+        self.verbose = verbose
+        self.reset()
+
+    def reset(self):
+        """
+        Réinitialise la politique pour une nouvelle résolution.
+        """
+        self.last_check = -GRB.INFINITY
+        self.checks = 0
+        self.fired = None
+        for criterion in self.criteria:
+            criterion.reset()
+
+    def __call__(self, model, where):
+        if where != GRB.Callback.MIP or self.fired is not None:
+            return
+        runtime = model.cbGet(GRB.Callback.RUNTIME)
+        if runtime - self.last_check < self.interval:
+            return
+        self.last_check = runtime
+        self.checks += 1
+
+        state = MipState(
+            runtime,
+            model.cbGet(GRB.Callback.MIP_OBJBST),
+            model.cbGet(GRB.Callback.MIP_OBJBND),
+            model.cbGet(GRB.Callback.MIP_SOLCNT),
+            model.cbGet(GRB.Callback.MIP_NODCNT),
+        )
+        for criterion in self.criteria:
+            if criterion.check(state):
+                self.fired = {"criterion": criterion.name, **state.as_dict()}
+                if self.verbose:
+                    print(f"Arrêt ({criterion.name}) à {runtime:.2f}s, gap {state.gap:.4%}")
+                model.terminate()
+                return
+
+    def report(self, model=None):
+        """
+        Résumé de la résolution : critère déclenché (None si la résolution s'est terminée
+        d'elle-même), instant, état de la recherche et nombre de relevés.
+        """
+        report = {
+            "criterion": self.fired["criterion"] if self.fired else None,
+            "fired_at": self.fired["runtime"] if self.fired else None,
+            "checks": self.checks,
+        }
+        if self.fired:
+            report.update({key: value for key, value in self.fired.items()
+                           if key not in ("criterion", "runtime")})
+        if model is not None:
+            report.update(status=model.Status, runtime=model.Runtime)
+        return report
+
+
+def optimize(model, criteria, interval=0.1, verbose=False):
+    """
+    Résout ``model`` avec une politique construite sur ``criteria``.
+
+    :return: Rapport de la politique (voir TerminationPolicy.report).
+    """
+    policy = TerminationPolicy(criteria, interval, verbose)
+    model.optimize(policy)
+    return policy.report(model)
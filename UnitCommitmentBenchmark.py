@@ -0,0 +1,173 @@
+# Benchmark of the unit commitment model builders on synthetic fleets:
+# - "tupledict": UnitCommitmentProblem.build_model (tupledicts, per-(g,t) loops, indicators);
+# - "matrix_loops": the original per-(g,t) matrix API script (quicksum objective, loop over t,
+#   indicators), kept here as a reference;
+# - "vectorized_indicators" / "vectorized_bounds": UnitCommitmentProblemMatrixAPI.build_uc_model
+#   with indicator constraints or pmin*commit <= power <= pmax*commit.
+import argparse
+import time
+
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+
+import UnitCommitmentProblem
+import UnitCommitmentProblemMatrixAPI as uc
+from UnitCommitmentProblemMatrixAPI import build_uc_model
+
+LOOP_BUILDERS = ("tupledict", "matrix_loops")
+BUILDERS = LOOP_BUILDERS + ("vectorized_indicators", "vectorized_bounds")
+
+
+def synthetic_fleet(nThermalUnits, seed=0):
+    """
+    Random fleet with the same orders of magnitude as the 3-unit example.
+    """
+    rng = np.random.default_rng(seed)
+    pmin = rng.uniform(1.0, 2.5, nThermalUnits)
+    return {
+        "a": rng.uniform(3.0, 7.0, nThermalUnits),
+        "b": rng.uniform(0.5, 3.0, nThermalUnits),
+        "c": rng.uniform(0.5, 2.0, nThermalUnits),
+        "sup_cost": np.full(nThermalUnits, 2.0),
+        "sdn_cost": np.full(nThermalUnits, 1.0),
+        "pmin": pmin,
+        "pmax": pmin + rng.uniform(2.0, 8.0, nThermalUnits),
+        "init_status": np.zeros(nThermalUnits),
+    }
+
+
+def synthetic_series(nTimeIntervals, fleet, seed=0):
+    """
+    Load and solar series following the 24-hour profiles, scaled to the fleet capacity.
+    """
+    rng = np.random.default_rng(seed)
+    days = -(-nTimeIntervals // 24)
+    scale = 0.6 * fleet["pmax"].sum() / uc.load_forecast.max()
+    load = np.tile(uc.load_forecast, days)[:nTimeIntervals] * scale
+    solar = np.tile(uc.solar_forecast, days)[:nTimeIntervals] * scale
+    return load * rng.uniform(0.95, 1.05, nTimeIntervals), solar
+
+
+def _build_tupledict(env, fleet, load, solar):
+    units = [f"gen{g}" for g in range(len(fleet["a"]))]
+    as_dict = {name: dict(zip(units, values.tolist())) for name, values in fleet.items()}
+    model, _ = UnitCommitmentProblem.build_model(
+        env, units, as_dict["a"], as_dict["b"], as_dict["c"], as_dict["sup_cost"],
+        as_dict["sdn_cost"], as_dict["pmin"], as_dict["pmax"], as_dict["init_status"],
+        load.tolist(), solar.tolist(),
+    )
+    return model
+
+
+def _build_matrix_loops(env, fleet, load, solar):
+    # Original UnitCommitmentProblemMatrixAPI.py formulation, term by term
+    a, b, c = fleet["a"], fleet["b"], fleet["c"]
+    sup_cost, sdn_cost = fleet["sup_cost"], fleet["sdn_cost"]
+    pmin, pmax, init_status = fleet["pmin"], fleet["pmax"], fleet["init_status"]
+    nThermalUnits, nTimeIntervals = len(a), len(load)
+
+    model = gp.Model(env=env)
+    power = model.addMVar((nThermalUnits, nTimeIntervals), lb=0, name="power")
+    startup = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="startup")
+    shutdown = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="shutdown")
+    commit = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="commit")
+
+    pairs = [(g, t) for g in range(nThermalUnits) for t in range(nTimeIntervals)]
+    model.setObjective(
+        gp.quicksum(c[g] * power[g, t] * power[g, t] for g, t in pairs)
+        + gp.quicksum(b[g] * power[g, t] for g, t in pairs)
+        + gp.quicksum(a[g] * commit[g, t] for g, t in pairs)
+        + gp.quicksum(sup_cost[g] * startup[g, t] for g, t in pairs)
+        + gp.quicksum(sdn_cost[g] * shutdown[g, t] for g, t in pairs),
+        GRB.MINIMIZE,
+    )
+    model.addConstr(power.sum(axis=0) + solar == load, name="power_balance")
+    for t in range(nTimeIntervals):
+        previous = init_status if t == 0 else commit[:, t - 1]
+        model.addConstr(commit[:, t] - previous == startup[:, t] - shutdown[:, t], name=f"logical_{t}")
+    model.addConstr(startup + shutdown <= 1, name="no_simultaneous_startup_shutdown")
+    for g, t in pairs:
+        model.addGenConstrIndicator(commit[g, t], True, power[g, t] >= pmin[g])
+        model.addGenConstrIndicator(commit[g, t], True, power[g, t] <= pmax[g])
+        model.addGenConstrIndicator(commit[g, t], False, power[g, t] == 0)
+    return model
+
+
+def _build_vectorized(env, fleet, load, solar, use_indicators):
+    model, _, _ = build_uc_model(
+        env, fleet["a"], fleet["b"], fleet["c"], fleet["sup_cost"], fleet["sdn_cost"],
+        fleet["pmin"], fleet["pmax"], fleet["init_status"], load, solar,
+        use_indicators=use_indicators,
+    )
+    return model
+
+
+def build(name, env, fleet, load, solar):
+    if name == "tupledict":
+        return _build_tupledict(env, fleet, load, solar)
+    if name == "matrix_loops":
+        return _build_matrix_loops(env, fleet, load, solar)
+    return _build_vectorized(env, fleet, load, solar, use_indicators=name == "vectorized_indicators")
+
+
+def benchmark(sizes, builders=BUILDERS, solve=False, time_limit=60, max_loop_size=200_000, seed=0):
+    """
+    Build (and optionally solve) every builder for every (G, T) size.
+
+    :param sizes: List of (number of units, number of periods).
+    :param solve: Also solve each model (limited to ``time_limit`` seconds).
+    :param max_loop_size: Skip the per-(g,t) loop builders when G*T exceeds this value.
+    :return: List of result rows.
+    """
+    rows = []
+    with gp.Env(params={"OutputFlag": 0, "TimeLimit": time_limit}) as env:
+        for nThermalUnits, nTimeIntervals in sizes:
+            fleet = synthetic_fleet(nThermalUnits, seed)
+            load, solar = synthetic_series(nTimeIntervals, fleet, seed)
+            for name in builders:
+                if name in LOOP_BUILDERS and nThermalUnits * nTimeIntervals > max_loop_size:
+                    continue
+                start = time.perf_counter()
+                model = build(name, env, fleet, load, solar)
+                model.update()
+                row = {
+                    "builder": name, "units": nThermalUnits, "periods": nTimeIntervals,
+                    "build_time": time.perf_counter() - start,
+                    "num_vars": model.NumVars, "num_constrs": model.NumConstrs,
+                    "num_gen_constrs": model.NumGenConstrs, "num_nz": model.NumNZs,
+                    "solve_time": None, "objective": None,
+                }
+                if solve:
+                    try:
+                        model.optimize()
+                        row["solve_time"] = model.Runtime
+                        row["objective"] = model.ObjVal if model.SolCount else None
+                    except gp.GurobiError as error:
+                        print(f"{name} G={nThermalUnits} T={nTimeIntervals}: {error}")
+                model.dispose()
+                rows.append(row)
+                print(f"{name:>22} G={nThermalUnits:<5} T={nTimeIntervals:<5} "
+                      f"build {row['build_time']:8.3f}s  "
+                      f"solve {row['solve_time'] if row['solve_time'] is not None else float('nan'):8.3f}s  "
+                      f"vars {row['num_vars']:>9}  constrs {row['num_constrs']:>9}  "
+                      f"gen {row['num_gen_constrs']:>8}  obj {row['objective']}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unit commitment builder benchmark")
+    parser.add_argument("--units", type=int, nargs="+", default=[3, 10, 100, 1000])
+    parser.add_argument("--periods", type=int, nargs="+", default=[24, 168, 8760])
+    parser.add_argument("--builders", nargs="+", default=list(BUILDERS), choices=BUILDERS)
+    parser.add_argument("--solve", action="store_true")
+    parser.add_argument("--time-limit", type=float, default=60)
+    parser.add_argument("--max-loop-size", type=int, default=200_000)
+    args = parser.parse_args()
+
+    sizes = [(g, t) for g in args.units for t in args.periods]
+    benchmark(sizes, args.builders, args.solve, args.time_limit, args.max_loop_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# Unit commitment data from CSV files.
+# - Fleet table: one row per unit, columns `unit` (optional) and a, b, c, sup_cost, sdn_cost,
+#   pmin, pmax, init_status (and optionally ramp).
+# - Time-series table: one row per period, columns `load` and `solar` (other columns ignored).
+# The tables are read in chunks, validated and converted to contiguous float64 arrays in the
+# layout expected by build_uc_model. The parsed arrays are cached as .npy files next to the CSV
+# (same scheme as PortfolioData): later runs map them in memory and skip the CSV parsing.
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from PortfolioData import file_digest, replace_atomically, save_array
+
+FLEET_COLUMNS = ("a", "b", "c", "sup_cost", "sdn_cost", "pmin", "pmax", "init_status")
+OPTIONAL_FLEET_COLUMNS = ("ramp",)
+SERIES_COLUMNS = ("load", "solar")
+
+
+def _read_columns(csv_path, required, optional=(), chunksize=100_000):
+    # Chunked read of the numeric columns, concatenated into one float64 array per column
+    # (pandas is only imported when the CSV has to be parsed, not for cached loads)
+    import pandas as pd
+    header = pd.read_csv(csv_path, nrows=0).columns
+    missing = [name for name in required if name not in header]
+    if missing:
+        raise ValueError(f"{csv_path}: missing columns {', '.join(missing)}")
+    columns = list(required) + [name for name in optional if name in header]
+    chunks = {name: [] for name in columns}
+    labels = []
+    usecols = columns + (["unit"] if "unit" in header else [])
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=chunksize,
+                             dtype={name: np.float64 for name in columns}):
+        for name in columns:
+            chunks[name].append(chunk[name].to_numpy())
+        if "unit" in chunk:
+            labels.extend(chunk["unit"].astype(str))
+    arrays = {name: np.ascontiguousarray(np.concatenate(values)) if values else np.empty(0)
+              for name, values in chunks.items()}
+    return arrays, labels
+
+
+def validate_fleet(units):
+    """
+    Check the fleet arrays: finite values, non-negative costs and limits, pmin <= pmax,
+    binary initial status.
+
+    :raises ValueError: With the first offending units.
+    """
+    sizes = {len(values) for values in units.values()}
+    if len(sizes) != 1:
+        raise ValueError("Fleet columns have different lengths")
+    for name, values in units.items():
+        bad = np.flatnonzero(~np.isfinite(values))
+        if len(bad):
+            raise ValueError(f"Fleet column {name}: missing or infinite value for units {bad[:5].tolist()}")
+    for name in ("a", "b", "c", "sup_cost", "sdn_cost", "pmin", "pmax"):
+        bad = np.flatnonzero(units[name] < 0)
+        if len(bad):
+            raise ValueError(f"Fleet column {name}: negative value for units {bad[:5].tolist()}")
+    bad = np.flatnonzero(units["pmin"] > units["pmax"])
+    if len(bad):
+        raise ValueError(f"pmin > pmax for units {bad[:5].tolist()}")
+    bad = np.flatnonzero((units["init_status"] != 0) & (units["init_status"] != 1))
+    if len(bad):
+        raise ValueError(f"init_status must be 0 or 1, units {bad[:5].tolist()}")
+
+
+def validate_series(series, units=None):
+    """
+    Check the time series: finite and non-negative values and, with the fleet, a net load that
+    never exceeds the total capacity.
+
+    :raises ValueError: With the first offending periods.
+    """
+    for name, values in series.items():
+        bad = np.flatnonzero(~np.isfinite(values) | (values < 0))
+        if len(bad):
+            raise ValueError(f"Series {name}: invalid value for periods {bad[:5].tolist()}")
+    if units is not None:
+        bad = np.flatnonzero(series["load"] - series["solar"] > units["pmax"].sum())
+        if len(bad):
+            raise ValueError(f"Net load above the fleet capacity for periods {bad[:5].tolist()}")
+
+
+def read_fleet(csv_path, chunksize=100_000):
+    """
+    Read and validate the fleet table.
+
+    :return: Tuple (dict of per-unit float64 arrays, list of unit names).
+    """
+    units, labels = _read_columns(csv_path, FLEET_COLUMNS, OPTIONAL_FLEET_COLUMNS, chunksize)
+    validate_fleet(units)
+    return units, labels or [f"gen{g + 1}" for g in range(len(units["a"]))]
+
+
+def read_series(csv_path, chunksize=100_000):
+    """
+    Read and validate the time-series table.
+
+    :return: Dict with the load and solar float64 arrays.
+    """
+    series, _ = _read_columns(csv_path, SERIES_COLUMNS, chunksize=chunksize)
+    validate_series(series)
+    return series
+
+
+def _cache_dir(fleet_path, series_path, cache_root):
+    stem = "-".join(os.path.splitext(os.path.basename(path))[0] for path in (fleet_path, series_path))
+    root = cache_root or os.path.join(os.path.dirname(os.path.abspath(fleet_path)), ".cache")
+    return os.path.join(root, stem)
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _write_meta(cache_dir, meta):
+    replace_atomically(os.path.join(cache_dir, "meta.json"), lambda f: json.dump(meta, f))
+
+
+def _cache_is_fresh(meta, paths, cache_dir):
+    if meta is None:
+        return False
+    touched = False
+    for key, path in paths.items():
+        stamp = _stamp(path)
+        if meta[key]["stamp"] == stamp:
+            continue
+        # Touched but possibly unchanged: compare the content digest
+        if meta[key]["digest"] != file_digest(path):
+            return False
+        meta[key]["stamp"] = stamp
+        touched = True
+    if touched:
+        # Same content: record the new stamp so that later loads skip the digest
+        _write_meta(cache_dir, meta)
+    return True
+
+
+def build_cache(fleet_path, series_path, cache_root=None, chunksize=100_000):
+    """
+    Parse both CSV files, validate them and write the cache (.npy per array, meta.json last).
+
+    :return: Cache directory.
+    """
+    units, labels = read_fleet(fleet_path, chunksize)
+    series = read_series(series_path, chunksize)
+    validate_series(series, units)
+
+    cache_dir = _cache_dir(fleet_path, series_path, cache_root)
+    os.makedirs(cache_dir, exist_ok=True)
+    for name, values in {**units, **series}.items():
+        save_array(os.path.join(cache_dir, f"{name}.npy"), values)
+
+    meta = {
+        "units": labels,
+        "fleet_columns": list(units),
+        "series_columns": list(series),
+        "fleet": {"stamp": _stamp(fleet_path), "digest": file_digest(fleet_path)},
+        "series": {"stamp": _stamp(series_path), "digest": file_digest(series_path)},
+    }
+    _write_meta(cache_dir, meta)
+    return cache_dir
+
+
+def load_uc_data(fleet_path="data/uc-fleet.csv", series_path="data/uc-series.csv",
+                 cache_root=None, mmap=True):
+    """
+    Load the fleet and the time series, from the binary cache when it is up to date.
+
+    :param fleet_path: Fleet CSV file.
+    :param series_path: Time-series CSV file.
+    :param cache_root: Root directory of the caches (``.cache`` next to the fleet file by default).
+    :param mmap: Map the cached arrays in memory instead of reading them.
+    :return: Tuple (units, series, names): dicts of float64 arrays ready for build_uc_model
+        (``units`` keys match its arguments) and the list of unit names.
+    """
+    cache_dir = _cache_dir(fleet_path, series_path, cache_root)
+    try:
+        with open(os.path.join(cache_dir, "meta.json"), "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = None
+    if not _cache_is_fresh(meta, {"fleet": fleet_path, "series": series_path}, cache_dir):
+        build_cache(fleet_path, series_path, cache_root)
+        with open(os.path.join(cache_dir, "meta.json"), "r") as f:
+            meta = json.load(f)
+
+    mode = "r" if mmap else None
+    load = lambda name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode=mode)
+    units = {name: load(name) for name in meta["fleet_columns"]}
+    series = {name: load(name) for name in meta["series_columns"]}
+    return units, series, meta["units"]
+
+
+def write_csv(units, series, fleet_path, series_path, names=None):
+    """
+    Write a fleet and its time series in the CSV layout read by load_uc_data.
+    """
+    import pandas as pd
+    for path in (fleet_path, series_path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    names = names or [f"gen{g + 1}" for g in range(len(units["a"]))]
+    pd.DataFrame({"unit": names, **units}).to_csv(fleet_path, index=False)
+    pd.DataFrame({"period": np.arange(len(series["load"])), **series}).to_csv(series_path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unit commitment CSV data and cache")
+    parser.add_argument("--fleet", default="data/uc-fleet.csv")
+    parser.add_argument("--series", default="data/uc-series.csv")
+    parser.add_argument("--generate", type=int, nargs=2, metavar=("UNITS", "PERIODS"),
+                        help="Write a synthetic fleet and time series first")
+    args = parser.parse_args()
+
+    if args.generate:
+        from UnitCommitmentBenchmark import synthetic_fleet, synthetic_series
+        fleet = synthetic_fleet(args.generate[0])
+        load, solar = synthetic_series(args.generate[1], fleet)
+        write_csv(fleet, {"load": load, "solar": solar}, args.fleet, args.series)
+
+    for attempt in ("load", "reload"):
+        start = time.perf_counter()
+        units, series, names = load_uc_data(args.fleet, args.series)
+        print(f"{attempt}: {len(names)} units x {len(series['load'])} periods "
+              f"in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -39,7 +39,7 @@ thermal_units_dyn_data, init_status = gp.multidict(
 )
 
 
-def show_results():
+def show_results(model, thermal_units_out_power):
     obj_val_s = model.ObjVal
     print(f" OverAll Cost = {round(obj_val_s, 2)}")
     print("\n")
@@ -65,7 +65,11 @@ def show_results():
     print("\n")
 
 
-with gp.Env() as env, gp.Model(env=env) as model:
+def build_model(env, thermal_units, a, b, c, sup_cost, sdn_cost, pmin, pmax, init_status,
+                load_forecast, solar_forecast):
+    nTimeIntervals = len(load_forecast)
+    model = gp.Model(env=env)
+
     # Variables for thermal units
     thermal_units_out_power = model.addVars(
         thermal_units, range(nTimeIntervals), lb=0, name="thermal_units_out_power"
@@ -145,6 +149,17 @@ with gp.Env() as env, gp.Model(env=env) as model:
                 name=f"offline_output_{g}_{t}",
             )
 
-    # Optimize and display results
-    model.optimize()
-    #show_results()
\ No newline at end of file
+    return model, thermal_units_out_power
+
+
+if __name__ == "__main__":
+    with gp.Env() as env:
+        model, thermal_units_out_power = build_model(
+            env, thermal_units, a, b, c, sup_cost, sdn_cost, pmin, pmax, init_status,
+            load_forecast, solar_forecast,
+        )
+
+        # Optimize and display results
+        model.optimize()
+        #show_results(model, thermal_units_out_power)
+        model.dispose()
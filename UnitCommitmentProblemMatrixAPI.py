@@ -48,84 +48,129 @@ c = np.array([c[g] for g in thermal_units])
 sup_cost = np.array([sup_cost[g] for g in thermal_units])
 sdn_cost = np.array([sdn_cost[g] for g in thermal_units])
 
-# Initialize the model
-with gp.Env() as env, gp.Model(env=env) as model:
+def build_uc_model(env, a, b, c, sup_cost, sdn_cost, pmin, pmax, init_status,
+                   load_forecast, solar_forecast, ramp=None, init_power=None, use_indicators=False):
+    """
+    Build the unit commitment model from NumPy arrays.
+
+    The data that changes from one solve to the next only appears in right-hand sides:
+    the net load (load - solar) in the power balance, the initial commitment status in the
+    first logical constraint and, with ramp limits, the initial power output.
+    Output limits are linear constraints on commit by default; use_indicators=True adds
+    them as 3*G*T indicator constraints instead.
+    Returns (model, variables, constraints) where variables and constraints are dicts.
+    """
+    import scipy.sparse as sp  # deferred: only needed when a model is built
+
+    nThermalUnits = len(a)
+    nTimeIntervals = len(load_forecast)
+    model = gp.Model(env=env)
+
     # Variables
     power = model.addMVar((nThermalUnits, nTimeIntervals), lb=0, name="power")
     startup = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="startup")
     shutdown = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="shutdown")
     commit = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="commit")
 
-    # Objective function
-    quadratic_cost = gp.quicksum(
-        c[g] * power[g, t] * power[g, t] for g in range(nThermalUnits) for t in range(nTimeIntervals)
-    )
-    linear_cost = gp.quicksum(
-        b[g] * power[g, t] for g in range(nThermalUnits) for t in range(nTimeIntervals)
-    )
-    fixed_cost = gp.quicksum(
-        a[g] * commit[g, t] for g in range(nThermalUnits) for t in range(nTimeIntervals)
-    )
-    startup_cost = gp.quicksum(
-        sup_cost[g] * startup[g, t] for g in range(nThermalUnits) for t in range(nTimeIntervals)
-    )
-    shutdown_cost = gp.quicksum(
-        sdn_cost[g] * shutdown[g, t] for g in range(nThermalUnits) for t in range(nTimeIntervals)
-    )
+    # The (unit, period) matrices are flattened unit by unit: Gurobi builds 1-D matrix
+    # expressions much faster than elementwise 2-D ones
+    power_flat, commit_flat = power.reshape(-1), commit.reshape(-1)
+    startup_flat, shutdown_flat = startup.reshape(-1), shutdown.reshape(-1)
+    per_period = lambda values: np.repeat(values, nTimeIntervals)
+
+    # Objective function: diagonal quadratic term, linear terms as per-period coefficient arrays
+    quadratic_cost = power_flat @ sp.diags(per_period(c)) @ power_flat
+    linear_cost = per_period(b) @ power_flat
+    fixed_cost = per_period(a) @ commit_flat
+    startup_cost = per_period(sup_cost) @ startup_flat
+    shutdown_cost = per_period(sdn_cost) @ shutdown_flat
     model.setObjective(quadratic_cost + linear_cost + fixed_cost + startup_cost + shutdown_cost, GRB.MINIMIZE)
 
-    # Power balance
-    model.addConstr(
-        power.sum(axis=0) + solar_forecast == load_forecast,
+    # Power balance (net load on the right-hand side)
+    balance = model.addConstr(
+        power.sum(axis=0) == load_forecast - solar_forecast,
         name="power_balance"
     )
 
-    # Logical constraints
-    for t in range(nTimeIntervals):
-        if t == 0:
-            model.addConstr(
-                commit[:, t] - init_status == startup[:, t] - shutdown[:, t],
-                name=f"logical_initial_{t}",
-            )
-        else:
-            model.addConstr(
-                commit[:, t] - commit[:, t - 1] == startup[:, t] - shutdown[:, t],
-                name=f"logical_{t}",
-            )
+    # Logical constraints (initial status on the right-hand side for t = 0, shifted slices after)
+    initial = model.addConstr(
+        commit[:, 0] - startup[:, 0] + shutdown[:, 0] == init_status,
+        name="logical_initial",
+    )
+    current = commit[:, 1:].reshape(-1)
+    previous = commit[:, :-1].reshape(-1)
+    model.addConstr(
+        current - previous == startup[:, 1:].reshape(-1) - shutdown[:, 1:].reshape(-1),
+        name="logical",
+    )
     model.addConstr(
-        startup + shutdown <= 1,
+        startup_flat + shutdown_flat <= 1,
         name="no_simultaneous_startup_shutdown",
     )
 
-    # Indicator constraints for physical limits
-    for g in range(nThermalUnits):
-        for t in range(nTimeIntervals):
-            model.addGenConstrIndicator(
-                commit[g, t],
-                True,
-                power[g, t] >= pmin[g],
-                name=f"min_power_{g}_{t}",
-            )
-            model.addGenConstrIndicator(
-                commit[g, t],
-                True,
-                power[g, t] <= pmax[g],
-                name=f"max_power_{g}_{t}",
-            )
-            model.addGenConstrIndicator(
-                commit[g, t],
-                False,
-                power[g, t] == 0,
-                name=f"zero_power_{g}_{t}",
-            )
-
-    # Optimize the model
-    model.optimize()
-
-    # Display results
-    #if model.Status == GRB.OPTIMAL:
-        #print(f"Optimal cost: {model.ObjVal:.2f}")
-        #print("Power output:")
-        #print(power.X)
-        #print("Commitment status:")
-        #print(commit.X)
\ No newline at end of file
+    if use_indicators:
+        # Indicator constraints for physical limits
+        for g in range(nThermalUnits):
+            for t in range(nTimeIntervals):
+                model.addGenConstrIndicator(
+                    commit[g, t],
+                    True,
+                    power[g, t] >= pmin[g],
+                    name=f"min_power_{g}_{t}",
+                )
+                model.addGenConstrIndicator(
+                    commit[g, t],
+                    True,
+                    power[g, t] <= pmax[g],
+                    name=f"max_power_{g}_{t}",
+                )
+                model.addGenConstrIndicator(
+                    commit[g, t],
+                    False,
+                    power[g, t] == 0,
+                    name=f"zero_power_{g}_{t}",
+                )
+    else:
+        # Same limits as linear constraints: pmin*commit <= power <= pmax*commit
+        model.addConstr(power_flat >= per_period(pmin) * commit_flat, name="min_power")
+        model.addConstr(power_flat <= per_period(pmax) * commit_flat, name="max_power")
+
+    variables = {"power": power, "startup": startup, "shutdown": shutdown, "commit": commit}
+    constraints = {"power_balance": balance, "logical_initial": initial}
+
+    # Optional ramp limits, the first one measured from the power output before the horizon
+    if ramp is not None:
+        if init_power is None:
+            init_power = np.zeros(nThermalUnits)
+        ramp_limit = np.repeat(ramp, nTimeIntervals - 1)
+        step = power[:, 1:].reshape(-1) - power[:, :-1].reshape(-1)
+        model.addConstr(step <= ramp_limit, name="ramp_up")
+        model.addConstr(-step <= ramp_limit, name="ramp_down")
+        constraints["ramp_up_initial"] = model.addConstr(
+            power[:, 0] <= init_power + ramp, name="ramp_up_initial"
+        )
+        constraints["ramp_down_initial"] = model.addConstr(
+            power[:, 0] >= init_power - ramp, name="ramp_down_initial"
+        )
+
+    return model, variables, constraints
+
+if __name__ == "__main__":
+    # Initialize the model
+    with gp.Env() as env:
+        model, variables, constraints = build_uc_model(
+            env, a, b, c, sup_cost, sdn_cost, pmin, pmax, init_status, load_forecast, solar_forecast
+        )
+        power, commit = variables["power"], variables["commit"]
+
+        # Optimize the model
+        model.optimize()
+
+        # Display results
+        #if model.Status == GRB.OPTIMAL:
+            #print(f"Optimal cost: {model.ObjVal:.2f}")
+            #print("Power output:")
+            #print(power.X)
+            #print("Commitment status:")
+            #print(commit.X)
+        model.dispose()
@@ -0,0 +1,168 @@
+# Unit commitment over long horizons with a rolling window.
+# One window model (e.g. 48h look-ahead) is built once with build_uc_model. Each step only
+# rewrites right-hand sides: the net load of the window, the initial commitment status and
+# the initial power output (ramp limits) carried over from the previous committed period.
+# The window is then warm-started from the previous solution shifted by the commit length,
+# and only the first hours (e.g. 24h) of each solve are kept.
+import argparse
+import time
+
+import numpy as np
+
+from GurobiEnv import shared_env
+import UnitCommitmentProblemMatrixAPI as uc
+from UnitCommitmentProblemMatrixAPI import build_uc_model
+
+
+def _window(series, start, length):
+    # Window of the series, padded with its last value past the end of the horizon
+    chunk = series[start:start + length]
+    if len(chunk) < length:
+        chunk = np.concatenate([chunk, np.full(length - len(chunk), series[-1])])
+    return chunk
+
+
+def _shift(values, steps):
+    # Previous window solution shifted left by `steps`, last column repeated
+    shifted = np.empty_like(values)
+    shifted[:, :-steps] = values[:, steps:]
+    shifted[:, -steps:] = values[:, -1:]
+    return shifted
+
+
+def rolling_horizon(units, load_forecast, solar_forecast, lookahead=48, commit_length=24,
+                    env=None, ramp=None, verbose=True, callback=None):
+    """
+    Solve the unit commitment problem over a long horizon with overlapping windows.
+
+    :param units: Dict of per-unit arrays: a, b, c, sup_cost, sdn_cost, pmin, pmax, init_status.
+    :param load_forecast: Load series over the whole horizon.
+    :param solar_forecast: Solar series over the whole horizon.
+    :param lookahead: Number of periods in each window model.
+    :param commit_length: Number of periods kept from each window.
+    :param env: Gurobi environment (the shared quiet one of the process if None, see GurobiEnv).
+    :param ramp: Optional per-unit ramp limits, the power state is carried across windows.
+    :param callback: Optional callback passed to every window solve (e.g. a TelemetryRecorder).
+    :return: Dict with power, commit, startup and shutdown arrays (units x horizon), the total
+        cost of the committed schedule, the one-time model build time and the runtime of each
+        window.
+    """
+    if env is None:
+        env = shared_env({"OutputFlag": 0})
+
+    load_forecast = np.asarray(load_forecast, dtype=float)
+    solar_forecast = np.asarray(solar_forecast, dtype=float)
+    horizon = len(load_forecast)
+    nThermalUnits = len(units["a"])
+    commit_length = min(commit_length, lookahead)
+
+    init_status = np.asarray(units["init_status"], dtype=float)
+    init_power = np.zeros(nThermalUnits)
+    net_load = load_forecast - solar_forecast
+
+    build_start = time.perf_counter()
+    model, variables, constraints = build_uc_model(
+        env, units["a"], units["b"], units["c"], units["sup_cost"], units["sdn_cost"],
+        units["pmin"], units["pmax"], init_status,
+        _window(load_forecast, 0, lookahead), _window(solar_forecast, 0, lookahead),
+        ramp=ramp, init_power=init_power,
+    )
+    model.update()
+    build_time = time.perf_counter() - build_start
+
+    schedule = {name: np.zeros((nThermalUnits, horizon)) for name in variables}
+    runtimes = []
+    with model:
+        for start in range(0, horizon, commit_length):
+            # Only the right-hand sides change between windows
+            constraints["power_balance"].RHS = _window(net_load, start, lookahead)
+            constraints["logical_initial"].RHS = init_status
+            if ramp is not None:
+                constraints["ramp_up_initial"].RHS = init_power + ramp
+                constraints["ramp_down_initial"].RHS = init_power - ramp
+
+            model.optimize(callback)
+            runtimes.append(model.Runtime)
+            if model.SolCount == 0:
+                raise RuntimeError(f"No solution for the window starting at {start} (status {model.Status})")
+
+            kept = min(commit_length, horizon - start)
+            solution = {name: var.X for name, var in variables.items()}
+            for name, values in solution.items():
+                schedule[name][:, start:start + kept] = values[:, :kept]
+
+            # Carry the state of the last committed period into the next window
+            init_status = np.round(solution["commit"][:, kept - 1])
+            init_power = solution["power"][:, kept - 1]
+
+            # Warm start the next window from this one, shifted by the commit length
+            if kept < lookahead:
+                for name, var in variables.items():
+                    var.Start = _shift(solution[name], kept)
+
+            if verbose:
+                print(f"window {start:>6}-{start + lookahead:<6} runtime {model.Runtime:.3f}s")
+
+    return {
+        **schedule,
+        "cost": schedule_cost(units, schedule),
+        "build_time": build_time,
+        "runtimes": runtimes,
+    }
+
+
+def schedule_cost(units, schedule):
+    """
+    Total cost of a schedule, with the same terms as the model objective.
+    """
+    power, commit = schedule["power"], schedule["commit"]
+    return float(
+        (units["c"][:, None] * power ** 2).sum()
+        + (units["b"][:, None] * power).sum()
+        + (units["a"][:, None] * commit).sum()
+        + (units["sup_cost"][:, None] * schedule["startup"]).sum()
+        + (units["sdn_cost"][:, None] * schedule["shutdown"]).sum()
+    )
+
+
+def default_units():
+    # The three generators of UnitCommitmentProblemMatrixAPI.py
+    return {name: getattr(uc, name) for name in
+            ("a", "b", "c", "sup_cost", "sdn_cost", "pmin", "pmax", "init_status")}
+
+
+def repeat_forecast(days, seed=0, noise=0.1):
+    """
+    Multi-day series built from the 24-hour forecasts, with seeded multiplicative noise.
+    """
+    rng = np.random.default_rng(seed)
+    load = np.tile(uc.load_forecast, days) * rng.uniform(1 - noise, 1 + noise, 24 * days)
+    solar = np.tile(uc.solar_forecast, days) * rng.uniform(1 - noise, 1 + noise, 24 * days)
+    return load, solar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-horizon unit commitment")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--lookahead", type=int, default=48)
+    parser.add_argument("--commit", type=int, default=24)
+    parser.add_argument("--fleet", default=None, help="Fleet CSV (see UnitCommitmentData)")
+    parser.add_argument("--series", default=None, help="Time-series CSV, used with --fleet")
+    args = parser.parse_args()
+
+    if args.fleet:
+        from UnitCommitmentData import load_uc_data
+        units, series, _ = load_uc_data(args.fleet, args.series)
+        load, solar = series["load"], series["solar"]
+    else:
+        units = default_units()
+        load, solar = repeat_forecast(args.days)
+    start = time.perf_counter()
+    result = rolling_horizon(units, load, solar, args.lookahead, args.commit, ramp=units.get("ramp"))
+    print(f"Total cost: {result['cost']:.2f}")
+    print(f"{len(result['runtimes'])} windows solved in {time.perf_counter() - start:.2f}s "
+          f"(model built once in {result['build_time']:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# Unit commitment under load and solar uncertainty.
+# Scenarios are sampled locally from the base forecasts with a seeded multiplicative noise model.
+# Two modes:
+# - "extensive": two-stage extensive form, the commitment (commit/startup/shutdown) is shared by
+#   all scenarios and each scenario has its own power dispatch;
+# - "independent": one model per scenario (wait-and-see). Each worker process builds the model
+#   once with build_uc_model and only swaps the net load of the power balance between solves.
+# Both modes return the cost of every scenario so the distributions can be compared.
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+import gurobipy as gp
+from gurobipy import GRB
+
+from GurobiEnv import shared_env
+import UnitCommitmentProblemMatrixAPI as uc
+from UnitCommitmentProblemMatrixAPI import build_uc_model
+from UnitCommitmentRolling import default_units
+
+PERCENTILES = (5, 50, 95)
+
+
+def sample_scenarios(num_scenarios, load_forecast, solar_forecast, seed=0,
+                     load_noise=0.05, solar_noise=0.3):
+    """
+    Sample load and solar scenarios around the base forecasts.
+
+    Load is scaled by a uniform factor in [1 - load_noise, 1 + load_noise] per period; solar by
+    a per-scenario level (cloud cover) times a per-period factor, both in [1 - solar_noise, 1 + solar_noise].
+
+    :return: Tuple (loads, solars), arrays of shape (scenarios x periods).
+    """
+    rng = np.random.default_rng(seed)
+    load_forecast = np.asarray(load_forecast, dtype=float)
+    solar_forecast = np.asarray(solar_forecast, dtype=float)
+    shape = (num_scenarios, len(load_forecast))
+    loads = load_forecast * rng.uniform(1 - load_noise, 1 + load_noise, shape)
+    level = rng.uniform(1 - solar_noise, 1 + solar_noise, (num_scenarios, 1))
+    solars = solar_forecast * level * rng.uniform(1 - solar_noise, 1 + solar_noise, shape)
+    # The sun cannot cover more than the load
+    return loads, np.clip(solars, 0, loads)
+
+
+def scenario_costs(units, power, commit, startup, shutdown):
+    """
+    Cost of each scenario: commitment costs (shared or not) plus the dispatch cost.
+
+    :param power: Power output, array of shape (scenarios x units x periods).
+    :param commit: Commitment, (units x periods) if shared or (scenarios x units x periods).
+    :return: Array of costs, one per scenario.
+    """
+    dispatch = ((units["c"][:, None] * power ** 2) + (units["b"][:, None] * power)).sum(axis=(-2, -1))
+    fixed = ((units["a"][:, None] * commit)
+             + (units["sup_cost"][:, None] * startup)
+             + (units["sdn_cost"][:, None] * shutdown)).sum(axis=(-2, -1))
+    return dispatch + fixed
+
+
+def summarize(costs):
+    """
+    Statistics of a cost distribution.
+    """
+    costs = np.asarray(costs, dtype=float)
+    finite = costs[np.isfinite(costs)]
+    summary = {"scenarios": len(costs), "solved": len(finite)}
+    if len(finite):
+        summary.update(mean=float(finite.mean()), std=float(finite.std()),
+                       min=float(finite.min()), max=float(finite.max()))
+        summary.update({f"p{q}": float(value) for q, value in zip(PERCENTILES, np.percentile(finite, PERCENTILES))})
+    return summary
+
+
+def solve_extensive_form(units, loads, solars, env=None, probabilities=None, verbose=True):
+    """
+    Two-stage extensive form: shared commitment decisions, one dispatch per scenario.
+
+    :param units: Dict of per-unit arrays (see UnitCommitmentRolling.default_units).
+    :param loads: Load scenarios (scenarios x periods).
+    :param solars: Solar scenarios (scenarios x periods).
+    :param probabilities: Scenario probabilities (uniform by default).
+    :return: Dict with the shared commitment, the dispatch of each scenario, the cost of each
+        scenario, the expected cost (objective) and the build and solve times.
+    """
+    if env is None:
+        env = shared_env({"OutputFlag": int(verbose)})
+
+    loads = np.asarray(loads, dtype=float)
+    solars = np.asarray(solars, dtype=float)
+    nScenarios, nTimeIntervals = loads.shape
+    nThermalUnits = len(units["a"])
+    if probabilities is None:
+        probabilities = np.full(nScenarios, 1 / nScenarios)
+    per_period = lambda values: np.repeat(values, nTimeIntervals)
+
+    start = time.perf_counter()
+    model = gp.Model("uc_extensive", env=env)
+
+    # First stage: commitment shared by all scenarios
+    startup = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="startup")
+    shutdown = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="shutdown")
+    commit = model.addMVar((nThermalUnits, nTimeIntervals), vtype=GRB.BINARY, name="commit")
+    commit_flat = commit.reshape(-1)
+    startup_flat, shutdown_flat = startup.reshape(-1), shutdown.reshape(-1)
+
+    model.addConstr(
+        commit[:, 0] - startup[:, 0] + shutdown[:, 0] == units["init_status"], name="logical_initial"
+    )
+    model.addConstr(
+        commit[:, 1:].reshape(-1) - commit[:, :-1].reshape(-1)
+        == startup[:, 1:].reshape(-1) - shutdown[:, 1:].reshape(-1),
+        name="logical",
+    )
+    model.addConstr(startup_flat + shutdown_flat <= 1, name="no_simultaneous_startup_shutdown")
+    objective = (per_period(units["a"]) @ commit_flat
+                 + per_period(units["sup_cost"]) @ startup_flat
+                 + per_period(units["sdn_cost"]) @ shutdown_flat)
+
+    # Second stage: one dispatch per scenario, same structure, only the net load changes
+    power = model.addMVar((nScenarios, nThermalUnits * nTimeIntervals), lb=0, name="power")
+    quadratic = sp.diags(per_period(units["c"]))
+    linear = per_period(units["b"])
+    pmin, pmax = per_period(units["pmin"]), per_period(units["pmax"])
+    for s in range(nScenarios):
+        dispatch = power[s]
+        model.addConstr(
+            dispatch.reshape(nThermalUnits, nTimeIntervals).sum(axis=0) == loads[s] - solars[s],
+            name=f"power_balance_{s}",
+        )
+        model.addConstr(dispatch >= pmin * commit_flat, name=f"min_power_{s}")
+        model.addConstr(dispatch <= pmax * commit_flat, name=f"max_power_{s}")
+        objective += probabilities[s] * (dispatch @ quadratic @ dispatch + linear @ dispatch)
+    model.setObjective(objective, GRB.MINIMIZE)
+    model.update()
+    build_time = time.perf_counter() - start
+
+    with model:
+        model.optimize()
+        result = {"status": model.Status, "build_time": build_time, "solve_time": model.Runtime,
+                  "objective": model.ObjVal if model.SolCount else np.nan}
+        if model.SolCount == 0:
+            result["costs"] = np.full(nScenarios, np.nan)
+            return result
+        schedule = {"commit": commit.X, "startup": startup.X, "shutdown": shutdown.X}
+        dispatch = power.X.reshape(nScenarios, nThermalUnits, nTimeIntervals)
+
+    result.update(schedule)
+    result["power"] = dispatch
+    result["costs"] = scenario_costs(units, dispatch, **schedule)
+    return result
+
+
+def _solve_scenarios(units, loads, solars, env_params):
+    # One model per process: only the right-hand side of the power balance changes
+    params = {"OutputFlag": 0}
+    params.update(env_params or {})
+    rows = []
+    with gp.Env(params=params) as env:
+        model, variables, constraints = build_uc_model(
+            env, units["a"], units["b"], units["c"], units["sup_cost"], units["sdn_cost"],
+            units["pmin"], units["pmax"], units["init_status"], loads[0], solars[0],
+        )
+        with model:
+            for load, solar in zip(loads, solars):
+                constraints["power_balance"].RHS = load - solar
+                model.optimize()
+                row = {"status": model.Status, "runtime": model.Runtime, "cost": np.nan,
+                       "commit": None}
+                if model.SolCount:
+                    solution = {name: var.X for name, var in variables.items()}
+                    row.update(cost=model.ObjVal, commit=np.round(solution["commit"]))
+                    # The neighbouring scenario usually keeps the same commitment
+                    for name, var in variables.items():
+                        var.Start = solution[name]
+                rows.append(row)
+    return rows
+
+
+def solve_independent(units, loads, solars, workers=1, env_params=None):
+    """
+    Solve each scenario on its own (wait-and-see), the scenarios being split over processes.
+
+    :param workers: Number of processes; each one builds a single model for its contiguous
+        chunk of scenarios.
+    :param env_params: Gurobi environment parameters of each worker.
+    :return: Dict with the cost, status and runtime of each scenario and the number of
+        scenarios whose optimal commitment differs from the most frequent one.
+    """
+    loads = np.asarray(loads, dtype=float)
+    solars = np.asarray(solars, dtype=float)
+    chunks = [chunk for chunk in np.array_split(np.arange(len(loads)), max(workers, 1)) if len(chunk)]
+    if len(chunks) <= 1:
+        rows = _solve_scenarios(units, loads, solars, env_params)
+    else:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            futures = [pool.submit(_solve_scenarios, units, loads[chunk], solars[chunk], env_params)
+                       for chunk in chunks]
+            rows = [row for future in futures for row in future.result()]
+
+    commitments = [row["commit"].tobytes() for row in rows if row["commit"] is not None]
+    most_frequent = max(set(commitments), key=commitments.count) if commitments else None
+    return {
+        "costs": np.array([row["cost"] for row in rows]),
+        "status": np.array([row["status"] for row in rows]),
+        "runtimes": np.array([row["runtime"] for row in rows]),
+        "distinct_commitments": len(set(commitments)),
+        "off_mode": sum(key != most_frequent for key in commitments),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stochastic unit commitment over sampled scenarios")
+    parser.add_argument("--scenarios", type=int, default=100)
+    parser.add_argument("--mode", choices=["extensive", "independent", "both"], default="both")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--periods", type=int, default=None,
+                        help="Only keep the first periods of the forecast")
+    args = parser.parse_args()
+
+    units = default_units()
+    load, solar = uc.load_forecast[:args.periods], uc.solar_forecast[:args.periods]
+    loads, solars = sample_scenarios(args.scenarios, load, solar, args.seed)
+
+    if args.mode in ("independent", "both"):
+        start = time.perf_counter()
+        result = solve_independent(units, loads, solars, args.workers)
+        print(f"independent: {time.perf_counter() - start:.2f}s, "
+              f"{result['distinct_commitments']} distinct commitments")
+        print(summarize(result["costs"]))
+    if args.mode in ("extensive", "both"):
+        start = time.perf_counter()
+        result = solve_extensive_form(units, loads, solars, verbose=False)
+        print(f"extensive form: {time.perf_counter() - start:.2f}s, expected cost {result['objective']:.2f}")
+        print(summarize(result["costs"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,17 @@
+from SlideshowIO import load_photos, read_solution
+from TagEngine import build_engine, interest, interest_sized
+
 # Fonction pour lire les données à partir d'un fichier texte
 def read_input_file(file_path):
     """
-    Lit les données d'un fichier texte pour créer une liste de photos.
-    Chaque photo est représentée comme un dictionnaire contenant son ID, son orientation, et ses tags.
+    Lit les données d'un fichier texte (éventuellement .gz/.bz2) ligne par ligne.
+    Les photos sont stockées en tableaux compacts : orientation sur un octet et tags
+    convertis en identifiants entiers au format CSR (voir SlideshowIO.PhotoSet).
 
     :param file_path: Chemin vers le fichier d'entrée.
-    :return: Liste de photos, chaque photo étant un dictionnaire.
+    :return: PhotoSet.
     """
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-
-    # Nombre de photos dans le fichier
-    n_photos = int(lines[0].strip())
-    photos = []
-
-    # Lecture de chaque photo (ID, orientation, et tags)
-    for i in range(1, n_photos + 1):
-        parts = lines[i].strip().split()
-        orientation = parts[0]  # Orientation : 'H' ou 'V'
-        tags = set(parts[2:])  # Ensemble des tags associés à la photo
-        photos.append({'id': i - 1, 'orientation': orientation, 'tags': tags})
-
-    return photos
+    return load_photos(file_path)
 
 def read_solution_file(file_path):
     """
@@ -30,18 +20,7 @@ def read_solution_file(file_path):
     :param file_path: Chemin vers le fichier de solution.
     :return: Liste des diapositives.
     """
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-
-    # Lire le nombre de diapositives
-    num_slides = int(lines[0].strip())
-    slides = []
-
-    # Lire chaque diapositive
-    for line in lines[1:num_slides + 1]:
-        slides.append(tuple(map(int, line.strip().split())))
-
-    return slides
+    return read_solution(file_path)
 
 
 def verify_solution(photos, slides):
@@ -53,58 +32,283 @@ def verify_solution(photos, slides):
     :return: Tuple (is_valid, total_score).
     """
     used_photos = set()
-    tags_by_slide = []
 
-    # Construire les tags pour chaque diapositive
+    # Vérifier qu'aucune photo n'est utilisée deux fois
     for slide in slides:
-        slide_tags = set()
         for photo_id in slide:
             if photo_id in used_photos:
                 print(f"Erreur : La photo {photo_id} est utilisée plus d'une fois.")
                 return False, 0
             used_photos.add(photo_id)
-            slide_tags.update(photos[photo_id]['tags'])
-        tags_by_slide.append(slide_tags)
 
     # Vérifier que toutes les photos utilisées sont valides
     if len(used_photos) > len(photos):
         print("Erreur : Plus de photos utilisées que disponible.")
         return False, 0
 
+    # Construire le bitset de chaque diapositive avec le moteur de tags
+    engine = build_engine(photos)
+    masks, sizes = engine.slide_masks(slides)
+
     # Calculer le score total
     total_score = 0
-    for i in range(len(tags_by_slide) - 1):
-        score = transition_score(tags_by_slide[i], tags_by_slide[i + 1])
-        total_score += score
+    for i in range(len(masks) - 1):
+        total_score += interest_sized(masks[i], sizes[i], masks[i + 1], sizes[i + 1])
 
     return True, total_score
 
 
-def transition_score(tags1, tags2):
+def transition_score(mask1, mask2):
     """
-    Calcule le score d'intérêt entre deux ensembles de tags.
+    Calcule le score d'intérêt entre deux diapositives représentées par leurs bitsets de tags.
 
-    :param tags1: Ensemble de tags de la première diapositive.
-    :param tags2: Ensemble de tags de la seconde diapositive.
+    :param mask1: Bitset des tags de la première diapositive (voir TagEngine).
+    :param mask2: Bitset des tags de la seconde diapositive.
     :return: Score d'intérêt.
     """
-    common_tags = tags1 & tags2
-    only_in_1 = tags1 - tags2
-    only_in_2 = tags2 - tags1
-    return min(len(common_tags), len(only_in_1), len(only_in_2))
+    return interest(mask1, mask2)
+
+
+class IncrementalVerifier:
+    """
+    Vérificateur avec état pour la recherche locale : la solution est chargée une fois, le score
+    de chaque transition est conservé, et chaque mouvement (échange, inversion de segment,
+    déplacement, ré-appariement de verticales) ne recalcule que les transitions touchées.
+    La validité (photo utilisée plusieurs fois, règles d'orientation) est aussi tenue à jour
+    de façon incrémentale.
+
+    Les méthodes ``delta_*`` évaluent un mouvement sans l'appliquer ; les méthodes du même nom
+    sans préfixe l'appliquent et renvoient la variation du score.
+    """
+
+    def __init__(self, photos, slides):
+        """
+        :param photos: PhotoSet, liste de photos ou TagEngine déjà construit.
+        :param slides: Liste des diapositives (tuples d'identifiants de photos).
+        """
+        self.engine = photos if hasattr(photos, "photo_masks") else build_engine(photos)
+        self.slides = [tuple(slide) for slide in slides]
+        self.usage = [0] * self.engine.num_photos
+        self.duplicates = 0  # Nombre d'utilisations en trop, toutes photos confondues
+        self.bad_slides = 0  # Diapositives qui ne respectent pas les règles d'orientation
+        self.masks = []
+        self.sizes = []
+        for slide in self.slides:
+            self._add_usage(slide)
+            self.bad_slides += not self._slide_ok(slide)
+            mask = self.engine.slide_mask(slide) if self._ids_ok(slide) else 0
+            self.masks.append(mask)
+            self.sizes.append(mask.bit_count())
+        self.transitions = [self._pair(p, p + 1) for p in range(len(self.slides) - 1)]
+        self.total = sum(self.transitions)
+
+    @property
+    def is_valid(self):
+        return self.duplicates == 0 and self.bad_slides == 0
+
+    def _ids_ok(self, slide):
+        return all(0 <= photo_id < self.engine.num_photos for photo_id in slide)
+
+    def _slide_ok(self, slide):
+        # Une photo H seule, ou deux photos V distinctes
+        if not self._ids_ok(slide):
+            return False
+        orientations = self.engine.orientations
+        if len(slide) == 1:
+            return orientations[slide[0]] == 'H'
+        return (len(slide) == 2 and slide[0] != slide[1]
+                and orientations[slide[0]] == 'V' and orientations[slide[1]] == 'V')
+
+    def _add_usage(self, slide):
+        for photo_id in slide:
+            if 0 <= photo_id < len(self.usage):
+                self.duplicates += self.usage[photo_id] > 0
+                self.usage[photo_id] += 1
+
+    def _remove_usage(self, slide):
+        for photo_id in slide:
+            if 0 <= photo_id < len(self.usage):
+                self.usage[photo_id] -= 1
+                self.duplicates -= self.usage[photo_id] > 0
+
+    def _pair(self, p, q):
+        # Score entre les diapositives en positions p et q de la séquence courante
+        return interest_sized(self.masks[p], self.sizes[p], self.masks[q], self.sizes[q])
+
+    def _delta(self, old_transitions, new_transitions, new_at):
+        # Variation du score : nouvelles transitions (positions après le mouvement, new_at
+        # donnant la position actuelle de la diapositive qui s'y trouvera) moins les anciennes
+        last = len(self.slides) - 1
+        delta = 0
+        for t in new_transitions:
+            if 0 <= t < last:
+                delta += self._pair(new_at(t), new_at(t + 1))
+        for t in old_transitions:
+            if 0 <= t < last:
+                delta -= self.transitions[t]
+        return delta
+
+    def _refresh(self, transitions):
+        last = len(self.slides) - 1
+        for t in transitions:
+            if 0 <= t < last:
+                self.transitions[t] = self._pair(t, t + 1)
+
+    def delta_swap(self, i, j):
+        """
+        Variation du score si l'on échange les diapositives en positions i et j.
+        """
+        if i == j:
+            return 0
+        affected = {i - 1, i, j - 1, j}
+        return self._delta(affected, affected, lambda p: j if p == i else i if p == j else p)
+
+    def swap(self, i, j):
+        """
+        Échange les diapositives en positions i et j.
+
+        :return: Variation du score.
+        """
+        delta = self.delta_swap(i, j)
+        for values in (self.slides, self.masks, self.sizes):
+            values[i], values[j] = values[j], values[i]
+        self._refresh({i - 1, i, j - 1, j})
+        self.total += delta
+        return delta
+
+    def delta_reverse(self, i, j):
+        """
+        Variation du score si l'on inverse le segment de positions i à j (inclus).
+        Le score étant symétrique, seules les deux transitions aux bords changent.
+        """
+        if i > j:
+            i, j = j, i
+        return self._delta({i - 1, j}, {i - 1, j}, lambda p: i + j - p if i <= p <= j else p)
+
+    def reverse(self, i, j):
+        """
+        Inverse le segment de positions i à j (inclus).
+
+        :return: Variation du score.
+        """
+        if i > j:
+            i, j = j, i
+        delta = self.delta_reverse(i, j)
+        for values in (self.slides, self.masks, self.sizes):
+            values[i:j + 1] = values[i:j + 1][::-1]
+        self.transitions[i:j] = self.transitions[i:j][::-1]
+        self._refresh({i - 1, j})
+        self.total += delta
+        return delta
+
+    def _move_transitions(self, i, j):
+        # Transitions détruites (positions actuelles) et créées (positions après le mouvement)
+        if i < j:
+            return {i - 1, i, j}, {i - 1, j - 1, j}
+        return {j - 1, i - 1, i}, {j - 1, j, i}
+
+    def delta_move(self, i, j):
+        """
+        Variation du score si l'on retire la diapositive en position i pour la placer en position j.
+        """
+        if i == j:
+            return 0
+        old, new = self._move_transitions(i, j)
+        if i < j:
+            new_at = lambda p: i if p == j else p + 1 if i <= p < j else p
+        else:
+            new_at = lambda p: i if p == j else p - 1 if j < p <= i else p
+        return self._delta(old, new, new_at)
+
+    def move(self, i, j):
+        """
+        Retire la diapositive en position i et la place en position j.
+
+        :return: Variation du score.
+        """
+        if i == j:
+            return 0
+        delta = self.delta_move(i, j)
+        for values in (self.slides, self.masks, self.sizes):
+            values.insert(j, values.pop(i))
+        # Même nombre de transitions : on en retire une et on en insère une
+        del self.transitions[i if i < len(self.transitions) else -1]
+        self.transitions.insert(min(j, len(self.transitions)), 0)
+        self._refresh(self._move_transitions(i, j)[1])
+        self.total += delta
+        return delta
+
+    def _repaired(self, i, j, a, b):
+        # Diapositives i et j après échange de la photo a de i avec la photo b de j
+        slide_i, slide_j = list(self.slides[i]), list(self.slides[j])
+        slide_i[a], slide_j[b] = slide_j[b], slide_i[a]
+        return tuple(slide_i), tuple(slide_j)
+
+    def delta_repair(self, i, j, a=0, b=0):
+        """
+        Variation du score si l'on échange la photo ``a`` de la diapositive i avec la photo ``b``
+        de la diapositive j (ré-appariement de deux paires verticales).
+        """
+        new_i, new_j = self._repaired(i, j, a, b)
+        saved = self.masks[i], self.sizes[i], self.masks[j], self.sizes[j]
+        self._set_slide_mask(i, new_i)
+        self._set_slide_mask(j, new_j)
+        affected = {i - 1, i, j - 1, j}
+        delta = self._delta(affected, affected, lambda p: p)
+        self.masks[i], self.sizes[i], self.masks[j], self.sizes[j] = saved
+        return delta
+
+    def repair(self, i, j, a=0, b=0):
+        """
+        Échange la photo ``a`` de la diapositive i avec la photo ``b`` de la diapositive j.
+
+        :return: Variation du score.
+        """
+        new_i, new_j = self._repaired(i, j, a, b)
+        return self.replace({i: new_i, j: new_j})
+
+    def replace(self, changes):
+        """
+        Remplace le contenu de diapositives, par exemple {position: (id1, id2)}.
+
+        :param changes: Dictionnaire {position: nouvelle diapositive}.
+        :return: Variation du score.
+        """
+        affected = set()
+        for p in changes:
+            affected.update((p - 1, p))
+        old = sum(self.transitions[t] for t in affected if 0 <= t < len(self.transitions))
+        for p, slide in changes.items():
+            slide = tuple(slide)
+            self._remove_usage(self.slides[p])
+            self.bad_slides -= not self._slide_ok(self.slides[p])
+            self.slides[p] = slide
+            self._add_usage(slide)
+            self.bad_slides += not self._slide_ok(slide)
+            self._set_slide_mask(p, slide)
+        self._refresh(affected)
+        delta = sum(self.transitions[t] for t in affected if 0 <= t < len(self.transitions)) - old
+        self.total += delta
+        return delta
+
+    def _set_slide_mask(self, p, slide):
+        mask = self.engine.slide_mask(slide) if self._ids_ok(slide) else 0
+        self.masks[p] = mask
+        self.sizes[p] = mask.bit_count()
 
 
-# Lecture des photos depuis le fichier d'entrée
-photos = read_input_file("data/PetPics-20.txt")  # Remplacez par le fichier d'entrée utilisé
+if __name__ == "__main__":
+    # Lecture des photos depuis le fichier d'entrée
+    photos = read_input_file("data/PetPics-20.txt")  # Remplacez par le fichier d'entrée utilisé
 
-# Lecture de la solution depuis le fichier slideshow.sol
-solution_slides = read_solution_file("slideshow.sol")
+    # Lecture de la solution depuis le fichier slideshow.sol
+    solution_slides = read_solution_file("slideshow.sol")
 
-# Vérifier la solution
-is_valid, total_score = verify_solution(photos, solution_slides)
+    # Vérifier la solution
+    is_valid, total_score = verify_solution(photos, solution_slides)
 
-# Afficher les résultats de la vérification
-if is_valid:
-    print(f"La solution est valide. Score total : {total_score}")
-else:
-    print("La solution est invalide.")
\ No newline at end of file
+    # Afficher les résultats de la vérification
+    if is_valid:
+        print(f"La solution est valide. Score total : {total_score}")
+    else:
+        print("La solution est invalide.")
\ No newline at end of file
@@ -0,0 +1,243 @@
+# Vérification et score d'un lot de solutions du diaporama.
+# L'instance est lue une seule fois ; ses tableaux compacts (orientation, décalages et tags au
+# format CSR, voir SlideshowIO.PhotoSet) sont copiés dans des blocs de mémoire partagée que les
+# processus du pool ouvrent par leur nom : ni relecture ni sérialisation de l'instance par
+# worker. Chaque worker lit un fichier de solution, vérifie les règles (photos existantes,
+# utilisées au plus une fois, une photo H seule ou deux photos V par diapositive) et calcule le
+# score en numpy : les tags de chaque diapositive sont dédoublonnés par un tri de clés
+# (diapositive, tag), et les tags communs à deux diapositives consécutives sont ceux dont la
+# clé se retrouve décalée d'une diapositive. Les fichiers sont ensuite classés par score, les
+# solutions invalides en dernier avec la raison du rejet.
+#
+#     python VerifSolBatch.py data/PetPics-20.txt solutions/*.sol --workers 4
+import argparse
+import csv
+import itertools
+import lzma
+import multiprocessing as mp
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from SlideshowIO import load_photos, read_solution
+
+COLUMNS = ["rank", "file", "valid", "score", "num_slides", "reason", "time"]
+SHARED_ARRAYS = ("orientation", "offsets", "tags")
+
+# Photos du processus courant (vues sur la mémoire partagée) et blocs ouverts
+_photos = None
+_blocks = []
+
+
+def _attach(name):
+    try:
+        # Python >= 3.13 : le bloc appartient au processus principal, qui seul le supprime
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedPhotos:
+    """
+    Copie des tableaux d'un PhotoSet dans des blocs de mémoire partagée.
+
+    ``spec`` décrit les blocs (nom, type, forme) et suffit à un autre processus pour
+    retrouver les tableaux avec ``attach_photos``. Les blocs sont supprimés à la fermeture.
+    """
+
+    def __init__(self, photo_set):
+        self.blocks = []
+        self.spec = {"num_tags": photo_set.num_tags}
+        for field in SHARED_ARRAYS:
+            array = getattr(photo_set, field)
+            block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            self.blocks.append(block)
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+            self.spec[field] = (block.name, array.dtype.str, array.shape)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_photos(spec):
+    """
+    Vues numpy sur les tableaux partagés décrits par ``spec``.
+
+    :return: Tuple (dictionnaire des tableaux et de num_tags, blocs à garder ouverts).
+    """
+    photos, blocks = {"num_tags": spec["num_tags"]}, []
+    for field in SHARED_ARRAYS:
+        name, dtype, shape = spec[field]
+        block = _attach(name)
+        blocks.append(block)
+        photos[field] = np.ndarray(shape, dtype, buffer=block.buf)
+    return photos, blocks
+
+
+def _init_worker(spec):
+    global _photos, _blocks
+    _photos, _blocks = attach_photos(spec)
+
+
+def check_slides(lengths, photo_ids, orientation):
+    """
+    Vérifie les règles du diaporama.
+
+    :param lengths: Nombre de photos de chaque diapositive.
+    :param photo_ids: Identifiants des photos, diapositive après diapositive.
+    :param orientation: Orientation des photos (codes ASCII 'H' / 'V').
+    :return: Raison du rejet, ou None si la solution est valide.
+    """
+    bad = np.flatnonzero((lengths < 1) | (lengths > 2))
+    if len(bad):
+        return f"diapositive {bad[0]} : {lengths[bad[0]]} photos"
+    outside = np.flatnonzero((photo_ids < 0) | (photo_ids >= len(orientation)))
+    if len(outside):
+        return f"photo {photo_ids[outside[0]]} inexistante"
+    used = np.bincount(photo_ids, minlength=len(orientation))
+    if (used > 1).any():
+        duplicate = np.argmax(used > 1)
+        return f"photo {duplicate} utilisée {used[duplicate]} fois"
+
+    starts = np.cumsum(lengths) - lengths
+    horizontal = orientation[photo_ids] == ord("H")
+    single = lengths == 1
+    bad = np.flatnonzero(single & ~horizontal[starts])
+    if len(bad):
+        return f"diapositive {bad[0]} : photo verticale seule"
+    pairs = starts[~single]
+    bad = np.flatnonzero(horizontal[pairs] | horizontal[pairs + 1])
+    if len(bad):
+        return f"diapositive {np.flatnonzero(~single)[bad[0]]} : paire avec une photo horizontale"
+    return None
+
+
+def transition_scores(lengths, photo_ids, offsets, tags, num_tags):
+    """
+    Score d'intérêt de chaque transition, calculé en bloc.
+
+    :return: Tableau des scores des len(lengths) - 1 transitions.
+    """
+    num_slides = len(lengths)
+    if num_slides < 2:
+        return np.zeros(0, dtype=np.int64)
+    # Positions dans ``tags`` de tous les tags de toutes les photos utilisées
+    counts = offsets[photo_ids + 1] - offsets[photo_ids]
+    first = np.cumsum(counts) - counts
+    positions = np.repeat(offsets[photo_ids] - first, counts) + np.arange(counts.sum())
+    slides = np.repeat(np.repeat(np.arange(num_slides, dtype=np.int64), lengths), counts)
+    # Clés (diapositive, tag) triées et sans doublon : tags de l'union de chaque diapositive
+    keys = np.unique(slides * num_tags + tags[positions])
+    sizes = np.bincount(keys // num_tags, minlength=num_slides)
+    # Un tag commun aux diapositives s et s + 1 donne la même clé que s + 1 décalée de -num_tags
+    common_keys = np.intersect1d(keys[keys < (num_slides - 1) * num_tags],
+                                 keys[keys >= num_tags] - num_tags, assume_unique=True)
+    common = np.bincount(common_keys // num_tags, minlength=num_slides - 1)
+    return np.minimum(common, np.minimum(sizes[:-1] - common, sizes[1:] - common))
+
+
+def verify_file(path, photos=None):
+    """
+    Vérifie et note un fichier de solution.
+
+    :param photos: Tableaux de l'instance (par défaut ceux attachés par le worker).
+    :return: Dictionnaire : fichier, validité, score, nombre de diapositives, raison, temps.
+    """
+    photos = _photos if photos is None else photos
+    start = time.perf_counter()
+    row = {"file": path, "valid": False, "score": None, "num_slides": None, "reason": None}
+    try:
+        slides = read_solution(path)
+    except (OSError, ValueError, EOFError, lzma.LZMAError, zlib.error) as error:
+        # Fichier absent, mal formé ou archive corrompue : seul ce fichier est rejeté
+        row.update(reason=f"illisible : {error}", time=time.perf_counter() - start)
+        return row
+
+    lengths = np.fromiter(map(len, slides), dtype=np.int64, count=len(slides))
+    photo_ids = np.fromiter(itertools.chain.from_iterable(slides), dtype=np.int64, count=lengths.sum())
+    row["num_slides"] = len(slides)
+    row["reason"] = check_slides(lengths, photo_ids, photos["orientation"])
+    if row["reason"] is None:
+        scores = transition_scores(lengths, photo_ids, photos["offsets"], photos["tags"], photos["num_tags"])
+        row.update(valid=True, score=int(scores.sum()))
+    row["time"] = time.perf_counter() - start
+    return row
+
+
+def rank(rows):
+    """
+    Classe les résultats : solutions valides par score décroissant, puis les invalides.
+    """
+    rows = sorted(rows, key=lambda row: (not row["valid"], -(row["score"] or 0), row["file"]))
+    for position, row in enumerate(rows, 1):
+        row["rank"] = position if row["valid"] else None
+    return rows
+
+
+def verify_batch(instance_path, solution_paths, workers=None):
+    """
+    Vérifie et note un lot de solutions pour une instance.
+
+    :param workers: Nombre de processus (None : nombre de cœurs ; 0 : dans le processus courant).
+    :return: Liste classée de dictionnaires (voir COLUMNS).
+    """
+    photo_set = load_photos(instance_path)
+    solution_paths = list(solution_paths)
+    if workers is None:
+        workers = min(len(solution_paths), os.cpu_count() or 1)
+    if workers == 0:
+        photos = {field: getattr(photo_set, field) for field in SHARED_ARRAYS}
+        photos["num_tags"] = photo_set.num_tags
+        return rank([verify_file(path, photos) for path in solution_paths])
+
+    with SharedPhotos(photo_set) as shared:
+        del photo_set
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            rows = list(pool.map(verify_file, solution_paths))
+    return rank(rows)
+
+
+def print_table(rows):
+    print(f"{'rang':>4}  {'score':>8}  {'diapos':>7}  fichier")
+    for row in rows:
+        position = row["rank"] if row["valid"] else "-"
+        score = row["score"] if row["valid"] else "invalide"
+        slides = row["num_slides"] if row["num_slides"] is not None else "-"
+        line = f"{position:>4}  {score:>8}  {slides:>7}  {row['file']}"
+        print(line if row["valid"] else f"{line}  ({row['reason']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérification et classement d'un lot de solutions")
+    parser.add_argument("instance", help="Fichier d'entrée (photos)")
+    parser.add_argument("solutions", nargs="+", help="Fichiers de solution")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Nombre de processus (0 : dans le processus courant)")
+    parser.add_argument("--csv", default=None, help="Écrit aussi le classement en CSV")
+    args = parser.parse_args()
+
+    rows = verify_batch(args.instance, args.solutions, args.workers)
+    print_table(rows)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
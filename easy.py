@@ -1,9 +1,24 @@
+import time
+
+start = time.perf_counter()
 import gurobipy as gp
+import_time = time.perf_counter() - start
+
+from GurobiEnv import measure_startup
 
 parameters = {
     "OutputFlag": 0
 }
 
-with gp.Env(params=parameters) as env, gp.Model(env=env) as m:
-    m.optimize()
-print(gp.GRB.VERSION_MAJOR)
\ No newline at end of file
+if __name__ == "__main__":
+    # Démarrage à froid : premier Env du processus (licence) et modèle vide
+    start = time.perf_counter()
+    with gp.Env(params=parameters) as env, gp.Model(env=env) as m:
+        m.optimize()
+    print(gp.GRB.VERSION_MAJOR)
+    print(f"import gurobipy : {import_time:.4f}s, premier Env + modèle vide : {time.perf_counter() - start:.4f}s")
+
+    # Démarrage à chaud : Env ouvert à chaque résolution ou Env partagé (voir GurobiEnv)
+    timings = measure_startup(repeat=20, params=parameters)
+    print(f"par résolution, nouvel Env : {timings['fresh_env'] * 1000:.2f} ms, "
+          f"Env partagé : {timings['shared_env'] * 1000:.2f} ms")